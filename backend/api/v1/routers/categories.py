@@ -1,34 +1,64 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from typing import List, Union
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 
+from core.cache import render_json, response_cache
+from core.category_counts import PUBLISHED, TOTAL, ZERO_COUNTS
+from core.feeds import category_tag, feed_cache
+from core.conditional import conditional_response
 from core.database import get_database
 from core.dependencies import admin_required
-from schemas.blog import CategoryCreate, CategoryUpdate, CategoryResponse, MessageResponse
+from schemas.blog import (
+    CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithCountsResponse, MessageResponse
+)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[CategoryResponse])
-async def get_categories():
-    """Get all categories (public endpoint)"""
+@router.get("/", response_model=List[Union[CategoryWithCountsResponse, CategoryResponse]])
+async def get_categories(request: Request, with_counts: bool = Query(False)):
+    """Get all categories (public endpoint)
+
+    With `with_counts=true` each category includes its total and published
+    post counts, read from counters kept on the category documents.
+    """
+    cache_key = response_cache.make_key(request)
+    cached = response_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
     db = get_database()
     categories = await db.categories.find({}).sort("name", 1).to_list(length=None)
     
-    return [
-        CategoryResponse(
+    if not with_counts:
+        return response_cache.store(cache_key, [
+            CategoryResponse(
+                id=str(category["_id"]),
+                name=category["name"],
+                description=category.get("description"),
+                created_at=category["created_at"]
+            )
+            for category in categories
+        ], {"categories"}, request=request)
+    
+    # Counts change with every post write, which invalidates "posts:list"
+    return response_cache.store(cache_key, [
+        CategoryWithCountsResponse(
             id=str(category["_id"]),
             name=category["name"],
             description=category.get("description"),
-            created_at=category["created_at"]
+            created_at=category["created_at"],
+            post_count=category.get(TOTAL, 0),
+            published_count=category.get(PUBLISHED, 0)
         )
         for category in categories
-    ]
+    ], {"categories", "posts:list"}, request=request)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-async def get_category(category_id: str):
+async def get_category(category_id: str, request: Request):
     """Get single category (public endpoint)"""
     if not ObjectId.is_valid(category_id):
         raise HTTPException(status_code=400, detail="Invalid category ID")
@@ -39,12 +69,14 @@ async def get_category(category_id: str):
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    return CategoryResponse(
+    response = CategoryResponse(
         id=str(category["_id"]),
         name=category["name"],
         description=category.get("description"),
         created_at=category["created_at"]
     )
+    
+    return conditional_response(request, render_json(response))
 
 
 @router.post("/", response_model=CategoryResponse)
@@ -63,11 +95,17 @@ async def create_category(
     category_dict = {
         "name": category_data.name,
         "description": category_data.description,
-        "created_at": datetime.utcnow()
+        "created_at": datetime.utcnow(),
+        **ZERO_COUNTS
     }
     
-    result = await db.categories.insert_one(category_dict)
+    try:
+        result = await db.categories.insert_one(category_dict)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent create; the unique index caught it
+        raise HTTPException(status_code=400, detail="Category name already exists")
     category_dict["_id"] = result.inserted_id
+    response_cache.invalidate("categories")
     
     return CategoryResponse(
         id=str(category_dict["_id"]),
@@ -106,18 +144,32 @@ async def update_category(
         update_data[field] = value
     
     if update_data:
-        await db.categories.update_one(
-            {"_id": ObjectId(category_id)},
-            {"$set": update_data}
-        )
+        # Lets incremental exports pick up renamed categories
+        update_data["updated_at"] = datetime.utcnow()
+        try:
+            await db.categories.update_one(
+                {"_id": ObjectId(category_id)},
+                {"$set": update_data}
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Category name already exists")
         
-        # Update category name in posts if name changed
+        # Update category name in posts if name changed; bumping updated_at
+        # changes their ETag / Last-Modified so clients drop the old name
         if "name" in update_data:
             await db.posts.update_many(
                 {"category_id": ObjectId(category_id)},
-                {"$set": {"category_name": update_data["name"]}}
+                {"$set": {"category_name": update_data["name"], "updated_at": update_data["updated_at"]}}
             )
     
+    response_cache.invalidate("categories", f"category:{category_id}")
+    if "name" in update_data:
+        # Listings and post pages show the category name
+        post_ids = await db.posts.distinct("_id", {"category_id": ObjectId(category_id)})
+        response_cache.invalidate("posts:list", *(f"post:{post_id}" for post_id in post_ids))
+        # Feed items list their category name
+        feed_cache.clear()
+    
     # Get updated category
     updated_category = await db.categories.find_one({"_id": ObjectId(category_id)})
     
@@ -140,8 +192,14 @@ async def delete_category(
     
     db = get_database()
     
-    # Check if category is used in posts
-    posts_with_category = await db.posts.count_documents({"category_id": ObjectId(category_id)})
+    category = await db.categories.find_one({"_id": ObjectId(category_id)}, {TOTAL: 1})
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    
+    # Check if category is used in posts (counter kept up to date by post writes)
+    posts_with_category = category.get(TOTAL)
+    if posts_with_category is None:
+        posts_with_category = await db.posts.count_documents({"category_id": ObjectId(category_id)})
     if posts_with_category > 0:
         raise HTTPException(
             status_code=400, 
@@ -153,4 +211,7 @@ async def delete_category(
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
     
+    response_cache.invalidate("categories", f"category:{category_id}")
+    feed_cache.invalidate(category_tag(category_id))
+    
     return {"message": "Category deleted successfully"}
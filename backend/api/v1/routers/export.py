@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from core.database import get_database
+from core.dependencies import admin_required
+from core.export import (
+    MEDIA_TYPES, export_filename, make_compressor, resolve_collections, stream_export
+)
+
+router = APIRouter()
+
+
+@router.get("")
+async def export_data(
+    collections: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    compression: str = Query("none", pattern="^(none|gzip|zstd)$"),
+    current_user: dict = Depends(admin_required)
+):
+    """Stream posts, categories and tags as NDJSON (admin only)
+
+    Each line is `{"collection": ..., "document": ...}` in relaxed Extended
+    JSON. Pass `since` to export only documents created or updated since
+    then; the `X-Export-Started-At` header is the `since` for the next run.
+    """
+    try:
+        names = resolve_collections(collections.split(",") if collections else None)
+        make_compressor(compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    started_at = datetime.utcnow()
+    filename = export_filename(compression, started_at)
+
+    return StreamingResponse(
+        stream_export(get_database(), names, since, compression),
+        media_type=MEDIA_TYPES[compression],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Started-At": started_at.isoformat() + "Z"
+        }
+    )
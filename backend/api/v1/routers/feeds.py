@@ -0,0 +1,122 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from bson import ObjectId
+
+from core.config import settings
+from core.database import get_database
+from core.feeds import (
+    FEED_TAG, MEDIA_TYPES, SITEMAP_TAG, category_tag, feed_cache, last_modified, latest_posts,
+    render_feed, render_sitemap_index, render_sitemap_shard, shard_tag, site_url, tag_tag
+)
+
+router = APIRouter()
+
+FORMAT_PATTERN = "^(rss|atom)$"
+
+
+async def serve_cached(
+    request: Request,
+    tags: Iterable[str],
+    media_type: str,
+    build: Callable[[], Awaitable[Tuple[bytes, Optional[datetime]]]]
+) -> Response:
+    """Serve rendered XML from the feed cache, rendering it on a miss"""
+    cache_key = feed_cache.make_key(request)
+    cached = feed_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+
+    body, modified = await build()
+    return feed_cache.store(
+        cache_key, body, tags, request=request, last_modified=modified, media_type=media_type
+    )
+
+
+async def serve_feed(
+    request: Request,
+    output_format: str,
+    tags: Iterable[str],
+    describe: Callable[[], Awaitable[Tuple[str, str, dict]]]
+) -> Response:
+    """Serve a cached feed; on a miss `describe` returns (title, link, post filter)"""
+    async def build():
+        title, link, query = await describe()
+        posts = await latest_posts(get_database(), query)
+        feed_url = site_url(request.url.path)
+        return render_feed(output_format, title, link, feed_url, posts), last_modified(posts)
+
+    return await serve_cached(request, tags, MEDIA_TYPES[output_format], build)
+
+
+async def describe_site() -> Tuple[str, str, dict]:
+    return settings.SITE_TITLE, site_url(), {}
+
+
+@router.get("/feed.xml", response_class=Response)
+async def get_feed(request: Request, output_format: str = Query("rss", alias="format", pattern=FORMAT_PATTERN)):
+    """Latest published posts as RSS, or Atom with `format=atom` (public endpoint)"""
+    return await serve_feed(request, output_format, {FEED_TAG}, describe_site)
+
+
+@router.get("/atom.xml", response_class=Response)
+async def get_atom_feed(request: Request):
+    """Latest published posts as Atom (public endpoint)"""
+    return await serve_feed(request, "atom", {FEED_TAG}, describe_site)
+
+
+@router.get("/feeds/category/{category_id}.xml", response_class=Response)
+async def get_category_feed(
+    category_id: str,
+    request: Request,
+    output_format: str = Query("rss", alias="format", pattern=FORMAT_PATTERN)
+):
+    """Latest published posts in a category (public endpoint)"""
+    if not ObjectId.is_valid(category_id):
+        raise HTTPException(status_code=400, detail="Invalid category ID")
+
+    async def describe():
+        category = await get_database().categories.find_one({"_id": ObjectId(category_id)}, {"name": 1})
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        title = f"{settings.SITE_TITLE} - {category['name']}"
+        return title, site_url(f"/category/{category_id}"), {"category_id": category["_id"]}
+
+    return await serve_feed(request, output_format, {category_tag(category_id)}, describe)
+
+
+@router.get("/feeds/tag/{tag}.xml", response_class=Response)
+async def get_tag_feed(
+    tag: str,
+    request: Request,
+    output_format: str = Query("rss", alias="format", pattern=FORMAT_PATTERN)
+):
+    """Latest published posts with a tag (public endpoint)"""
+    async def describe():
+        if not await get_database().tags.find_one({"name": tag}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Tag not found")
+        return f"{settings.SITE_TITLE} - #{tag}", site_url(f"/tag/{tag}"), {"tags": tag}
+
+    return await serve_feed(request, output_format, {tag_tag(tag)}, describe)
+
+
+@router.get("/sitemap.xml", response_class=Response)
+async def get_sitemap(request: Request):
+    """Sitemap index listing the post shards (public endpoint)"""
+    async def build():
+        return await render_sitemap_index(get_database()), None
+
+    return await serve_cached(request, {SITEMAP_TAG}, MEDIA_TYPES["sitemap"], build)
+
+
+@router.get("/sitemaps/posts-{shard}.xml", response_class=Response)
+async def get_sitemap_shard(shard: int, request: Request):
+    """One shard of published post URLs (public endpoint)"""
+    async def build():
+        rendered = await render_sitemap_shard(get_database(), shard) if shard >= 0 else None
+        if rendered is None:
+            raise HTTPException(status_code=404, detail="Sitemap not found")
+        return rendered
+
+    return await serve_cached(request, {shard_tag(shard)}, MEDIA_TYPES["sitemap"], build)
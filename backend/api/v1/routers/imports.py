@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+
+from core.cache import response_cache
+from core.counts import post_counts
+from core.database import get_database
+from core.feeds import feed_cache
+from core.dependencies import admin_required
+from core.importer import ImportFormatError, import_rows, iter_rows
+from schemas.blog import ImportResult
+
+router = APIRouter()
+
+# Cached responses that depend on each imported collection
+INVALIDATED_TAGS = {
+    "categories": ("categories",),
+    "tags": ("tags",),
+    "posts": ("posts:list", "tags:popular")
+}
+
+
+@router.post("/{collection}", response_model=ImportResult)
+async def import_data(
+    request: Request,
+    collection: str = Path(..., pattern="^(categories|tags|posts)$"),
+    current_user: dict = Depends(admin_required)
+):
+    """Bulk import categories, tags or posts from NDJSON or a JSON array (admin only)
+
+    Rows use the create schemas; posts may also carry `category_name`,
+    `created_at`, `updated_at` and `view_count`. Categories and tags that
+    already exist are reported as `exists`. Invalid rows are reported per
+    row and do not stop the import.
+    """
+    db = get_database()
+    try:
+        summary = await import_rows(db, collection, iter_rows(request.stream()))
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if summary["created"]:
+        response_cache.invalidate(*INVALIDATED_TAGS[collection])
+        if collection == "posts":
+            post_counts.invalidate()
+            feed_cache.clear()
+
+    return summary
@@ -1,31 +1,193 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
+import asyncio
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from typing import Dict, List, Optional
 from bson import ObjectId
 from datetime import datetime
 
+from core.cache import render_json, response_cache
+from core.conditional import conditional_response, is_not_modified, make_etag, not_modified_response
 from core.database import get_database
+from core.counts import is_approximable, post_counts
 from core.dependencies import admin_required
+from core.pagination import fetch_facet_page, fetch_keyset_page
+from core.post_fields import CARD_FIELDS, FIELD_SOURCES, FULL_FIELDS, post_list_fields, serialize_category
+from core.rendering import make_excerpt, rendered_fields
+from core import category_counts, feeds, tag_stats
+from core.related import related_index
+from core.search import highlight, regex_query, search_index
+from core.serialization import ORJSONResponse
+from core.view_counter import view_counter
 from models.blog import PostModel
 from schemas.blog import (
-    PostCreate, PostUpdate, PostResponse, PostListResponse, MessageResponse
+    PostCreate, PostUpdate, PostResponse, PostListResponse, PostSearchResult, MessageResponse
 )
 
 router = APIRouter()
 
 
+def resolve_list_fields(view: str, fields: Optional[str]) -> List[str]:
+    """Work out which list fields to return from the view and fields parameters"""
+    if not fields:
+        return list(FULL_FIELDS if view == "full" else CARD_FIELDS)
+    
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(selected) - set(FULL_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id"] + selected))
+
+
+def list_projection(fields: List[str]) -> dict:
+    """Projection reading the card fields plus anything else requested"""
+    return {FIELD_SOURCES.get(name, name): 1 for name in set(CARD_FIELDS) | set(fields)}
+
+
+def select_fields(items: List[PostListResponse], fields: List[str]) -> List[dict]:
+    """Trim hydrated list items down to the requested fields"""
+    include = set(fields)
+    return [item.model_dump(include=include) for item in items]
+
+
+def post_etag(post: dict, *variant) -> str:
+    """Strong ETag for a post document, changing whenever it is updated"""
+    return make_etag(post["_id"], post["updated_at"].isoformat(), *variant)
+
+
+async def get_categories_for_posts(db, posts: List[dict]) -> Dict[ObjectId, dict]:
+    """Fetch the categories referenced by a page of posts in a single query"""
+    category_ids = list({post["category_id"] for post in posts if post.get("category_id")})
+    if not category_ids:
+        return {}
+    
+    category_docs = await db.categories.find(
+        {"_id": {"$in": category_ids}}
+    ).to_list(length=len(category_ids))
+    return {category_doc["_id"]: serialize_category(category_doc) for category_doc in category_docs}
+
+
+async def build_post_list_items(db, posts: List[dict]) -> List[PostListResponse]:
+    """Hydrate a page of post documents into list responses"""
+    categories = await get_categories_for_posts(db, posts)
+    
+    # Documents come from our own collection; skip re-validating them
+    return [
+        PostListResponse.model_construct(**post_list_fields(post, categories.get(post.get("category_id"))))
+        for post in posts
+    ]
+
+
+async def get_category_details(db, category_id: Optional[ObjectId]) -> Optional[dict]:
+    """Category summary for a post, or None"""
+    if not category_id:
+        return None
+    category_doc = await db.categories.find_one({"_id": category_id})
+    return serialize_category(category_doc) if category_doc else None
+
+
+async def get_tag_details(db, names: List[str]) -> List[dict]:
+    """Tag documents for a post's tag names"""
+    if not names:
+        return []
+    tag_docs = await db.tags.find({"name": {"$in": names}}).to_list(length=None)
+    return [{"id": str(tag["_id"]), "name": tag["name"], "created_at": tag["created_at"]} for tag in tag_docs]
+
+
+async def build_post_response(db, post: dict, views: int, include_html: bool = False) -> PostResponse:
+    """Hydrate a post document with its category and tag details"""
+    category, tag_details = await asyncio.gather(
+        get_category_details(db, post.get("category_id")),
+        get_tag_details(db, post.get("tags"))
+    )
+    
+    # Documents come from our own collection; skip re-validating them
+
+    return PostResponse.model_construct(
+        id=str(post["_id"]),
+        title=post["title"],
+        content=post.get("content"),
+        content_html=post.get("content_html") if include_html else None,
+        summary=post.get("summary"),
+        category_id=str(post["category_id"]) if post.get("category_id") else None,
+        category=category,
+        tags=post.get("tags", []),
+        tag_details=tag_details,
+        featured_image=post.get("featured_image"),
+        is_published=post["is_published"],
+        created_at=post["created_at"],
+        updated_at=post["updated_at"],
+        views=views
+    )
+
+
+async def fetch_posts_page(
+    db,
+    query: dict,
+    size: int,
+    skip: int,
+    cursor: Optional[str],
+    projection: dict,
+    exact_total: bool
+):
+    """Fetch a page of posts and its total, returning (posts, total, exact, next, prev).
+
+    Unfiltered and category-only totals come from the count cache unless
+    `exact_total` is set, read concurrently with the page; other totals
+    are counted in the same $facet round trip as the page. Cursor pages
+    count concurrently instead, because the keyset filter cannot go
+    inside $facet without a scan.
+    """
+    if not exact_total and is_approximable(query):
+        total, (posts, next_cursor, prev_cursor) = await asyncio.gather(
+            post_counts.count(db.posts, query),
+            fetch_keyset_page(db.posts, query, size, cursor=cursor, skip=skip, projection=projection)
+        )
+        return posts, total, False, next_cursor, prev_cursor
+    
+    if cursor is None:
+        posts, total, next_cursor, prev_cursor = await fetch_facet_page(
+            db.posts, query, size, skip=skip, projection=projection
+        )
+        return posts, total, True, next_cursor, prev_cursor
+    
+    (posts, next_cursor, prev_cursor), total = await asyncio.gather(
+        fetch_keyset_page(db.posts, query, size, cursor=cursor, projection=projection),
+        db.posts.count_documents(query)
+    )
+    return posts, total, True, next_cursor, prev_cursor
+
+
 @router.get("/public", response_model=dict)
 async def get_public_posts(
+    request: Request,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     category: Optional[str] = Query(None),
     tags: Optional[List[str]] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("card", pattern="^(card|full)$"),
+    fields: Optional[str] = Query(None),
+    exact_total: bool = Query(False)
 ):
-    """Get published posts with pagination (public endpoint)"""
+    """Get published posts with pagination (public endpoint)
+
+    Pass `cursor` (from `next_cursor`/`prev_cursor`) for keyset pagination;
+    `page` is ignored when a cursor is given. Items use the compact card
+    view unless `view=full` or a comma-separated `fields` list is given.
+    Unfiltered and category-only totals may lag briefly (`total_exact` is
+    false); pass `exact_total=true` to count them.
+    """
+    cache_key = response_cache.make_key(request)
+    cached = response_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
     db = get_database()
     
     # Calculate skip value (page is 1-based in frontend)
     skip = (page - 1) * size
+    selected_fields = resolve_list_fields(view, fields)
     
     # Build query for published posts only
     query = {"is_published": True}
@@ -39,217 +201,264 @@ async def get_public_posts(
     if tags:
         query["tags"] = {"$in": tags}
     if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"content": {"$regex": search, "$options": "i"}},
-            {"summary": {"$regex": search, "$options": "i"}}
-        ]
+        # Resolve matches from the in-memory index instead of a regex scan
+        if await search_index.ensure_ready(db):
+            query["_id"] = {"$in": [ObjectId(doc_id) for doc_id, _ in search_index.search(search)]}
+        else:
+            query.update(regex_query(search))
     
-    # Get total count for pagination
-    total = await db.posts.count_documents(query)
+    # Get the page and its total count
+    posts, total, total_exact, next_cursor, prev_cursor = await fetch_posts_page(
+        db, query, size, skip, cursor, list_projection(selected_fields), exact_total
+    )
     
-    # Get posts with pagination and populate category/tag details
-    posts = await db.posts.find(query).sort("created_at", -1).skip(skip).limit(size).to_list(length=size)
+    # Populate category details with one batched lookup
+    items = await build_post_list_items(db, posts)
     
-    items = []
-    for post in posts:
-        # Get category details
-        category = None
-        if post.get("category_id"):
-            category_doc = await db.categories.find_one({"_id": post["category_id"]})
-            if category_doc:
-                category = {
-                    "id": str(category_doc["_id"]),
-                    "name": category_doc["name"],
-                    "description": category_doc.get("description")
-                }
+    cache_tags = {"posts:list"} | {f"category:{item.category_id}" for item in items if item.category_id}
+    return response_cache.store(cache_key, {
+        "items": select_fields(items, selected_fields),
+        "total": total,
+        "total_exact": total_exact,
+        "page": None if cursor else page,
+        "size": size,
+        "pages": (total + size - 1) // size,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    }, cache_tags, request=request)
+
+
+@router.get("/search", response_model=dict)
+async def search_posts(
+    q: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100)
+):
+    """Full-text search over published posts ranked by relevance (public endpoint)"""
+    db = get_database()
+    skip = (page - 1) * size
+    # Matched posts are read with their text, for highlights
+    projection = {**list_projection(CARD_FIELDS), "content": 1}
+    
+    if await search_index.ensure_ready(db):
+        matches = search_index.search(q)
+        total = len(matches)
+        page_matches = matches[skip:skip + size]
         
-        items.append(PostListResponse(
-            id=str(post["_id"]),
-            title=post["title"],
-            summary=post.get("summary"),
-            content=post.get("content"),
-            category_id=str(post["category_id"]) if post.get("category_id") else None,
-            category=category,
-            tags=post.get("tags", []),
-            featured_image=post.get("featured_image"),
-            is_published=post["is_published"],
-            created_at=post["created_at"],
-            views=post.get("view_count", 0)
+        # Fetch the page of matches and restore ranking order
+        post_ids = [ObjectId(doc_id) for doc_id, _ in page_matches]
+        posts = await db.posts.find(
+            {"_id": {"$in": post_ids}, "is_published": True}, projection
+        ).to_list(length=len(post_ids))
+        posts_by_id = {str(post["_id"]): post for post in posts}
+        ranked = [(posts_by_id[doc_id], score) for doc_id, score in page_matches if doc_id in posts_by_id]
+    else:
+        # The index failed to build: unranked substring matches, newest first
+        query = {"is_published": True, **regex_query(q)}
+        total, posts = await asyncio.gather(
+            db.posts.count_documents(query),
+            db.posts.find(query, projection).sort("created_at", -1).skip(skip).limit(size).to_list(length=size)
+        )
+        ranked = [(post, 0.0) for post in posts]
+    
+    highlights = {post["_id"]: highlight(post, q) for post, _ in ranked}
+    for post, _ in ranked:
+        post.pop("content", None)
+    
+    list_items = await build_post_list_items(db, [post for post, _ in ranked])
+    items = []
+    for item, (post, score) in zip(list_items, ranked):
+        items.append(PostSearchResult.model_construct(
+            **item.model_dump(),
+            score=score,
+            highlighted_title=highlights[post["_id"]]["title"],
+            snippet=highlights[post["_id"]]["snippet"]
         ))
     
-    return {
+    # Serialize directly; the items are already response models
+    return ORJSONResponse({
         "items": items,
         "total": total,
         "page": page,
         "size": size,
         "pages": (total + size - 1) // size
-    }
+    })
 
 
 @router.get("/public/{post_id}", response_model=PostResponse)
-async def get_public_post(post_id: str):
-    """Get single published post (public endpoint)"""
+async def get_public_post(
+    post_id: str,
+    request: Request,
+    output_format: str = Query("markdown", alias="format", pattern="^(markdown|html)$")
+):
+    """Get single published post (public endpoint)
+
+    With `format=html` the body is returned as pre-rendered, sanitized
+    `content_html` instead of markdown `content`.
+    """
     if not ObjectId.is_valid(post_id):
         raise HTTPException(status_code=400, detail="Invalid post ID")
     
+    cache_key = response_cache.make_key(request)
+    cached = response_cache.get(cache_key, request)
+    if cached is not None:
+        # Cached posts still count the view; the shown count may lag by the cache TTL
+        view_counter.increment(post_id)
+        return cached
+    
     db = get_database()
-    post = await db.posts.find_one({"_id": ObjectId(post_id), "is_published": True})
+    # Only read the representation being served
+    excluded = "content" if output_format == "html" else "content_html"
+    post = await db.posts.find_one({"_id": ObjectId(post_id), "is_published": True}, {excluded: 0})
     
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Increment view count
-    await db.posts.update_one(
-        {"_id": ObjectId(post_id)},
-        {"$inc": {"view_count": 1}}
-    )
-    post["view_count"] = post.get("view_count", 0) + 1
+    # Buffer the view; it is written to the database in batches
+    post["view_count"] = post.get("view_count", 0) + view_counter.increment(post["_id"])
+    
+    # Answer revalidation before building the response
+    etag = post_etag(post, output_format)
+    if is_not_modified(request, etag, post["updated_at"]):
+        return not_modified_response(etag, post["updated_at"])
+    
+    if output_format == "html" and "content_html" not in post:
+        # Posts written before pre-rendering: render once and store it
+        source = await db.posts.find_one({"_id": post["_id"]}, {"content": 1})
+        rendered = rendered_fields(source["content"])
+        await db.posts.update_one({"_id": post["_id"]}, {"$set": rendered})
+        post["content_html"] = rendered["content_html"]
     
-    # Get category details
-    category = None
+    response = await build_post_response(db, post, post["view_count"], include_html=True)
+    
+    cache_tags = {f"post:{post_id}"} | {f"tag:{name}" for name in post.get("tags", [])}
     if post.get("category_id"):
-        category_doc = await db.categories.find_one({"_id": post["category_id"]})
-        if category_doc:
-            category = {
-                "id": str(category_doc["_id"]),
-                "name": category_doc["name"],
-                "description": category_doc.get("description")
-            }
-    
-    # Get tag details
-    tag_details = []
-    if post.get("tags"):
-        tag_docs = await db.tags.find({"name": {"$in": post["tags"]}}).to_list(length=None)
-        tag_details = [
-            {
-                "id": str(tag["_id"]),
-                "name": tag["name"],
-                "created_at": tag["created_at"]
-            }
-            for tag in tag_docs
-        ]
-    
-    return PostResponse(
-        id=str(post["_id"]),
-        title=post["title"],
-        content=post["content"],
-        summary=post.get("summary"),
-        category_id=str(post["category_id"]) if post.get("category_id") else None,
-        category=category,
-        tags=post.get("tags", []),
-        tag_details=tag_details,
-        featured_image=post.get("featured_image"),
-        is_published=post["is_published"],
-        created_at=post["created_at"],
-        updated_at=post["updated_at"],
-        views=post["view_count"]
+        cache_tags.add(f"category:{post['category_id']}")
+    return response_cache.store(
+        cache_key, response, cache_tags,
+        request=request, etag=etag, last_modified=post["updated_at"]
     )
 
 
+@router.get("/public/{post_id}/related", response_model=List[PostListResponse])
+async def get_related_posts(
+    post_id: str,
+    request: Request,
+    limit: int = Query(5, ge=1, le=20)
+):
+    """Get the published posts most similar to a post (public endpoint)
+
+    Neighbors (text TF-IDF plus shared tags) are precomputed, so the lookup
+    is a dict access followed by one query for the cards. The list is empty
+    until the index has been built after startup.
+    """
+    if not ObjectId.is_valid(post_id):
+        raise HTTPException(status_code=400, detail="Invalid post ID")
+    
+    cache_key = response_cache.make_key(request)
+    cached = response_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
+    db = get_database()
+    if not await related_index.ensure_ready(db):
+        # Still building in the background; not cached, so the real list follows
+        return []
+    if post_id not in related_index:
+        raise HTTPException(status_code=404, detail="Post not found")
+    
+    neighbor_ids = [doc_id for doc_id, _ in related_index.related(post_id, limit)]
+    posts = await db.posts.find(
+        {"_id": {"$in": [ObjectId(doc_id) for doc_id in neighbor_ids]}, "is_published": True},
+        list_projection(CARD_FIELDS)
+    ).to_list(length=len(neighbor_ids))
+    posts_by_id = {str(post["_id"]): post for post in posts}
+    ranked = [posts_by_id[doc_id] for doc_id in neighbor_ids if doc_id in posts_by_id]
+    
+    items = select_fields(await build_post_list_items(db, ranked), list(CARD_FIELDS))
+    # Any post write can change the neighbors, and every write invalidates "posts:list"
+    return response_cache.store(cache_key, items, {"posts:list", f"post:{post_id}"}, request=request)
+
+
 @router.get("/", response_model=dict)
 async def get_posts(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("card", pattern="^(card|full)$"),
+    fields: Optional[str] = Query(None),
+    exact_total: bool = Query(False),
     current_user: dict = Depends(admin_required)
 ):
-    """Get all posts with pagination (admin only)"""
+    """Get all posts with pagination (admin only)
+
+    The total is the collection's estimated count unless `exact_total=true`.
+    """
     db = get_database()
     
     # Calculate skip value
     skip = (page - 1) * size
+    selected_fields = resolve_list_fields(view, fields)
     
-    # Get total count
-    total = await db.posts.count_documents({})
-    
-    # Get posts with pagination and populate category details
-    posts = await db.posts.find({}).sort("created_at", -1).skip(skip).limit(size).to_list(length=size)
+    # Get the page and its total count
+    posts, total, total_exact, next_cursor, prev_cursor = await fetch_posts_page(
+        db, {}, size, skip, cursor, list_projection(selected_fields), exact_total
+    )
     
-    items = []
-    for post in posts:
-        # Get category details
-        category = None
-        if post.get("category_id"):
-            category_doc = await db.categories.find_one({"_id": post["category_id"]})
-            if category_doc:
-                category = {
-                    "id": str(category_doc["_id"]),
-                    "name": category_doc["name"],
-                    "description": category_doc.get("description")
-                }
-        
-        items.append(PostListResponse(
-            id=str(post["_id"]),
-            title=post["title"],
-            summary=post.get("summary"),
-            content=post.get("content"),
-            category_id=str(post["category_id"]) if post.get("category_id") else None,
-            category=category,
-            tags=post.get("tags", []),
-            featured_image=post.get("featured_image"),
-            is_published=post["is_published"],
-            created_at=post["created_at"],
-            views=post.get("view_count", 0)
-        ))
+    # Populate category details with one batched lookup
+    items = await build_post_list_items(db, posts)
     
-    return {
-        "items": items,
+    return ORJSONResponse({
+        "items": select_fields(items, selected_fields),
         "total": total,
-        "page": page,
+        "total_exact": total_exact,
+        "page": None if cursor else page,
         "size": size,
-        "pages": (total + size - 1) // size
-    }
+        "pages": (total + size - 1) // size,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    })
 
 
 @router.get("/admin", response_model=List[PostListResponse])
 async def get_admin_posts(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("card", pattern="^(card|full)$"),
     current_user: dict = Depends(admin_required)
 ):
-    """Get all posts for admin (including unpublished)"""
+    """Get all posts for admin (including unpublished)
+
+    Keyset cursors for the neighbouring pages are returned in the
+    `X-Next-Cursor` and `X-Prev-Cursor` headers. `content` is only
+    included with `view=full`.
+    """
     db = get_database()
     
-    posts = await db.posts.find({}).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
-    
-    result = []
-    for post in posts:
-        # Get category details
-        category = None
-        if post.get("category_id"):
-            category_doc = await db.categories.find_one({"_id": post["category_id"]})
-            if category_doc:
-                category = {
-                    "id": str(category_doc["_id"]),
-                    "name": category_doc["name"],
-                    "description": category_doc.get("description")
-                }
-        
-        result.append(PostListResponse(
-            id=str(post["_id"]),
-            title=post["title"],
-            summary=post.get("summary"),
-            content=post.get("content"),
-            category_id=str(post["category_id"]) if post.get("category_id") else None,
-            category=category,
-            tags=post.get("tags", []),
-            featured_image=post.get("featured_image"),
-            is_published=post["is_published"],
-            created_at=post["created_at"],
-            views=post.get("view_count", 0)
-        ))
-    
-    return result
+    projection = list_projection(resolve_list_fields(view, None))
+    posts, next_cursor, prev_cursor = await fetch_keyset_page(
+        db.posts, {}, limit, cursor=cursor, skip=skip, projection=projection
+    )
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        headers["X-Prev-Cursor"] = prev_cursor
+    
+    # Populate category details with one batched lookup
+    items = await build_post_list_items(db, posts)
+    return ORJSONResponse(items, headers=headers)
 
 
 @router.get("/{post_id}", response_model=PostResponse)
-async def get_post(post_id: str):
+async def get_post(post_id: str, request: Request):
     """Get single post (public endpoint)"""
     if not ObjectId.is_valid(post_id):
         raise HTTPException(status_code=400, detail="Invalid post ID")
     
     db = get_database()
-    post = await db.posts.find_one({"_id": ObjectId(post_id)})
+    post = await db.posts.find_one({"_id": ObjectId(post_id)}, {"content_html": 0})
     
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -258,51 +467,19 @@ async def get_post(post_id: str):
     if not post.get("is_published", False):
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Increment view count
-    await db.posts.update_one(
-        {"_id": ObjectId(post_id)},
-        {"$inc": {"view_count": 1}}
-    )
-    post["view_count"] = post.get("view_count", 0) + 1
+    # Buffer the view; it is written to the database in batches
+    post["view_count"] = post.get("view_count", 0) + view_counter.increment(post["_id"])
     
-    # Get category details
-    category = None
-    if post.get("category_id"):
-        category_doc = await db.categories.find_one({"_id": post["category_id"]})
-        if category_doc:
-            category = {
-                "id": str(category_doc["_id"]),
-                "name": category_doc["name"],
-                "description": category_doc.get("description")
-            }
-    
-    # Get tag details
-    tag_details = []
-    if post.get("tags"):
-        tag_docs = await db.tags.find({"name": {"$in": post["tags"]}}).to_list(length=None)
-        tag_details = [
-            {
-                "id": str(tag["_id"]),
-                "name": tag["name"],
-                "created_at": tag["created_at"]
-            }
-            for tag in tag_docs
-        ]
-    
-    return PostResponse(
-        id=str(post["_id"]),
-        title=post["title"],
-        content=post["content"],
-        summary=post.get("summary"),
-        category_id=str(post["category_id"]) if post.get("category_id") else None,
-        category=category,
-        tags=post.get("tags", []),
-        tag_details=tag_details,
-        featured_image=post.get("featured_image"),
-        is_published=post["is_published"],
-        created_at=post["created_at"],
-        updated_at=post["updated_at"],
-        views=post["view_count"]
+    # Answer revalidation before building the response
+    etag = post_etag(post)
+    if is_not_modified(request, etag, post["updated_at"]):
+        return not_modified_response(etag, post["updated_at"])
+    
+    response = await build_post_response(db, post, post["view_count"])
+    
+    return conditional_response(
+        request, render_json(response),
+        etag=etag, last_modified=post["updated_at"]
     )
 
 
@@ -313,50 +490,13 @@ async def get_admin_post(post_id: str, current_user: dict = Depends(admin_requir
         raise HTTPException(status_code=400, detail="Invalid post ID")
     
     db = get_database()
-    post = await db.posts.find_one({"_id": ObjectId(post_id)})
+    post = await db.posts.find_one({"_id": ObjectId(post_id)}, {"content_html": 0})
     
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Get category details
-    category = None
-    if post.get("category_id"):
-        category_doc = await db.categories.find_one({"_id": post["category_id"]})
-        if category_doc:
-            category = {
-                "id": str(category_doc["_id"]),
-                "name": category_doc["name"],
-                "description": category_doc.get("description")
-            }
-    
-    # Get tag details
-    tag_details = []
-    if post.get("tags"):
-        tag_docs = await db.tags.find({"name": {"$in": post["tags"]}}).to_list(length=None)
-        tag_details = [
-            {
-                "id": str(tag["_id"]),
-                "name": tag["name"],
-                "created_at": tag["created_at"]
-            }
-            for tag in tag_docs
-        ]
-    
-    return PostResponse(
-        id=str(post["_id"]),
-        title=post["title"],
-        content=post["content"],
-        summary=post.get("summary"),
-        category_id=str(post["category_id"]) if post.get("category_id") else None,
-        category=category,
-        tags=post.get("tags", []),
-        tag_details=tag_details,
-        featured_image=post.get("featured_image"),
-        is_published=post["is_published"],
-        created_at=post["created_at"],
-        updated_at=post["updated_at"],
-        views=post.get("view_count", 0)
-    )
+    views = post.get("view_count", 0) + view_counter.unflushed(post["_id"])
+    return await build_post_response(db, post, views)
 
 
 @router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
@@ -376,6 +516,8 @@ async def create_post(post_data: PostCreate, current_user: dict = Depends(admin_
         "title": post_data.title,
         "content": post_data.content,
         "summary": post_data.summary,
+        "excerpt": make_excerpt(post_data.content),
+        **rendered_fields(post_data.content),
         "category_id": ObjectId(post_data.category_id) if post_data.category_id and ObjectId.is_valid(post_data.category_id) else None,
         "category_name": category_name,
         "tags": post_data.tags,
@@ -388,46 +530,15 @@ async def create_post(post_data: PostCreate, current_user: dict = Depends(admin_
     
     result = await db.posts.insert_one(post_dict)
     post_dict["_id"] = result.inserted_id
-    
-    # Get category details
-    category = None
-    if post_dict["category_id"]:
-        category_doc = await db.categories.find_one({"_id": post_dict["category_id"]})
-        if category_doc:
-            category = {
-                "id": str(category_doc["_id"]),
-                "name": category_doc["name"],
-                "description": category_doc.get("description")
-            }
-    
-    # Get tag details
-    tag_details = []
-    if post_dict["tags"]:
-        tag_docs = await db.tags.find({"name": {"$in": post_dict["tags"]}}).to_list(length=None)
-        tag_details = [
-            {
-                "id": str(tag["_id"]),
-                "name": tag["name"],
-                "created_at": tag["created_at"]
-            }
-            for tag in tag_docs
-        ]
-    
-    return PostResponse(
-        id=str(post_dict["_id"]),
-        title=post_dict["title"],
-        content=post_dict["content"],
-        summary=post_dict["summary"],
-        category_id=str(post_dict["category_id"]) if post_dict["category_id"] else None,
-        category=category,
-        tags=post_dict["tags"],
-        tag_details=tag_details,
-        featured_image=post_dict["featured_image"],
-        is_published=post_dict["is_published"],
-        created_at=post_dict["created_at"],
-        updated_at=post_dict["updated_at"],
-        views=post_dict["view_count"]
-    )
+    await tag_stats.apply_post_change(db, None, post_dict)
+    await category_counts.apply_post_change(db, None, post_dict)
+    await feeds.invalidate_post_change(db, None, post_dict)
+    search_index.index_post(post_dict)
+    related_index.index_post(post_dict)
+    response_cache.invalidate("posts:list", "tags:popular")
+    post_counts.invalidate()
+    
+    return await build_post_response(db, post_dict, post_dict["view_count"])
 
 
 @router.put("/{post_id}", response_model=PostResponse)
@@ -460,6 +571,11 @@ async def update_post(
                     update_data["category_name"] = category["name"]
         elif field == "is_published":
             update_data["is_published"] = value
+        elif field == "content" and value is not None:
+            update_data["content"] = value
+            update_data["excerpt"] = make_excerpt(value)
+            # Only re-render when the markdown actually changed
+            update_data.update(rendered_fields(value, existing_post.get("content_hash")))
         else:
             update_data[field] = value
     
@@ -470,46 +586,16 @@ async def update_post(
     
     # Get updated post
     updated_post = await db.posts.find_one({"_id": ObjectId(post_id)})
-    
-    # Get category details
-    category = None
-    if updated_post.get("category_id"):
-        category_doc = await db.categories.find_one({"_id": updated_post["category_id"]})
-        if category_doc:
-            category = {
-                "id": str(category_doc["_id"]),
-                "name": category_doc["name"],
-                "description": category_doc.get("description")
-            }
-    
-    # Get tag details
-    tag_details = []
-    if updated_post.get("tags"):
-        tag_docs = await db.tags.find({"name": {"$in": updated_post["tags"]}}).to_list(length=None)
-        tag_details = [
-            {
-                "id": str(tag["_id"]),
-                "name": tag["name"],
-                "created_at": tag["created_at"]
-            }
-            for tag in tag_docs
-        ]
-    
-    return PostResponse(
-        id=str(updated_post["_id"]),
-        title=updated_post["title"],
-        content=updated_post["content"],
-        summary=updated_post.get("summary"),
-        category_id=str(updated_post["category_id"]) if updated_post.get("category_id") else None,
-        category=category,
-        tags=updated_post.get("tags", []),
-        tag_details=tag_details,
-        featured_image=updated_post.get("featured_image"),
-        is_published=updated_post["is_published"],
-        created_at=updated_post["created_at"],
-        updated_at=updated_post["updated_at"],
-        views=updated_post.get("view_count", 0)
-    )
+    await tag_stats.apply_post_change(db, existing_post, updated_post)
+    await category_counts.apply_post_change(db, existing_post, updated_post)
+    await feeds.invalidate_post_change(db, existing_post, updated_post)
+    search_index.index_post(updated_post)
+    related_index.index_post(updated_post)
+    response_cache.invalidate(f"post:{post_id}", "posts:list", "tags:popular")
+    post_counts.invalidate()
+    
+    views = updated_post.get("view_count", 0) + view_counter.unflushed(updated_post["_id"])
+    return await build_post_response(db, updated_post, views)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -520,9 +606,20 @@ async def delete_post(post_id: str, current_user: dict = Depends(admin_required)
     
     db = get_database()
     
-    result = await db.posts.delete_one({"_id": ObjectId(post_id)})
+    deleted_post = await db.posts.find_one_and_delete(
+        {"_id": ObjectId(post_id)}, projection={"tags": 1, "is_published": 1, "category_id": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted_post:
         raise HTTPException(status_code=404, detail="Post not found")
     
+    await tag_stats.apply_post_change(db, deleted_post, None)
+    await category_counts.apply_post_change(db, deleted_post, None)
+    await feeds.invalidate_post_change(db, deleted_post, None)
+    
+    search_index.remove_post(post_id)
+    related_index.remove_post(post_id)
+    response_cache.invalidate(f"post:{post_id}", "posts:list", "tags:popular")
+    post_counts.invalidate()
+    
     return  # 204는 본문 없이 반환
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+
+from core.cache import response_cache
+from core.dependencies import admin_required
+from core.feeds import feed_cache
+from core.images import image_processor
+from schemas.blog import MessageResponse
+
+router = APIRouter()
+
+
+@router.get("/cache", response_model=dict)
+async def get_cache_stats(current_user: dict = Depends(admin_required)):
+    """Get response cache statistics (admin only)"""
+    return response_cache.stats()
+
+
+@router.delete("/cache", response_model=MessageResponse)
+async def clear_cache(current_user: dict = Depends(admin_required)):
+    """Drop every cached response, feed and sitemap (admin only)"""
+    response_cache.clear()
+    feed_cache.clear()
+    return {"message": "Cache cleared successfully"}
+
+
+@router.get("/images", response_model=dict)
+async def get_image_stats(current_user: dict = Depends(admin_required)):
+    """Get image processing queue and timing statistics (admin only)"""
+    return image_processor.stats()
@@ -1,51 +1,56 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from typing import List
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 
+from core.cache import render_json, response_cache
+from core.conditional import conditional_response
 from core.database import get_database
 from core.dependencies import admin_required
+from core.feeds import feed_cache
+from core.related import PROJECTION as RELATED_PROJECTION, related_index
+from core.tag_stats import popular_tags, refresh_tag
 from schemas.blog import TagCreate, TagResponse, MessageResponse
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TagResponse])
-async def get_tags():
+async def get_tags(request: Request):
     """Get all tags (public endpoint)"""
+    cache_key = response_cache.make_key(request)
+    cached = response_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
     db = get_database()
     tags = await db.tags.find({}).sort("name", 1).to_list(length=None)
     
-    return [
+    return response_cache.store(cache_key, [
         TagResponse(
             id=str(tag["_id"]),
             name=tag["name"],
             created_at=tag["created_at"]
         )
         for tag in tags
-    ]
+    ], {"tags"}, request=request)
 
 
 @router.get("/popular", response_model=List[dict])
-async def get_popular_tags():
+async def get_popular_tags(request: Request):
     """Get popular tags with post counts (public endpoint)"""
+    cache_key = response_cache.make_key(request)
+    cached = response_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
     db = get_database()
     
-    # Aggregate tags from published posts
-    pipeline = [
-        {"$match": {"is_published": True}},
-        {"$unwind": "$tags"},
-        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 20}
-    ]
-    
-    result = await db.posts.aggregate(pipeline).to_list(length=20)
-    
-    return [
-        {"name": item["_id"], "count": item["count"]}
-        for item in result
-    ]
+    # Counts are maintained on post writes; this is an indexed read
+    result = await popular_tags(db, limit=20)
+    
+    return response_cache.store(cache_key, result, {"tags:popular"}, request=request)
 
 
 @router.post("/", response_model=TagResponse)
@@ -63,8 +68,13 @@ async def create_tag(tag_data: TagCreate, current_user: dict = Depends(admin_req
         "created_at": datetime.utcnow()
     }
     
-    result = await db.tags.insert_one(tag_dict)
+    try:
+        result = await db.tags.insert_one(tag_dict)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent create; the unique index caught it
+        raise HTTPException(status_code=400, detail="Tag name already exists")
     tag_dict["_id"] = result.inserted_id
+    response_cache.invalidate("tags", f"tag:{tag_dict['name']}")
     
     return TagResponse(
         id=str(tag_dict["_id"]),
@@ -86,20 +96,29 @@ async def delete_tag(tag_id: str, current_user: dict = Depends(admin_required)):
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     
-    # Remove tag from all posts
+    # Remove tag from all posts, bumping updated_at so their validators change
+    tagged = await db.posts.distinct("_id", {"tags": tag["name"]})
     await db.posts.update_many(
         {"tags": tag["name"]},
-        {"$pull": {"tags": tag["name"]}}
+        {"$pull": {"tags": tag["name"]}, "$set": {"updated_at": datetime.utcnow()}}
     )
+    # Related posts vectors include tags (search does not index them)
+    async for post in db.posts.find({"_id": {"$in": tagged}}, RELATED_PROJECTION):
+        related_index.index_post(post)
     
     # Delete tag
     result = await db.tags.delete_one({"_id": ObjectId(tag_id)})
+    # Recount rather than delete: posts written since the $pull may still carry the tag
+    await refresh_tag(db, tag["name"])
+    response_cache.invalidate("tags", "tags:popular", "posts:list", f"tag:{tag['name']}")
+    # Feed items list their tags
+    feed_cache.clear()
     
     return {"message": "Tag deleted successfully"}
 
 
 @router.get("/{tag_id}", response_model=TagResponse)
-async def get_tag(tag_id: str):
+async def get_tag(tag_id: str, request: Request):
     """Get single tag (public endpoint)"""
     if not ObjectId.is_valid(tag_id):
         raise HTTPException(status_code=400, detail="Invalid tag ID")
@@ -110,8 +129,10 @@ async def get_tag(tag_id: str):
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     
-    return TagResponse(
+    response = TagResponse(
         id=str(tag["_id"]),
         name=tag["name"],
         created_at=tag["created_at"]
     )
+    
+    return conditional_response(request, render_json(response))
@@ -1,15 +1,33 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, List
+import asyncio
+import hashlib
+import json
+import logging
 import os
-import uuid
-from PIL import Image
-import aiofiles
+import shutil
+import tempfile
 
 from core.config import settings
+from core.database import get_database
 from core.dependencies import admin_required
+from core.images import (
+    ImageQueueFull, build_variants, image_processor, remove_variants, variant_files, variant_formats,
+    variants_name, with_urls
+)
+from core.serialization import dumps
+from core.uploads import (
+    MAX_FILES_PER_REQUEST, UploadTooLarge, add_reference, commit, discard, incoming_dir, release_reference,
+    stream_to_temp, upload_slots
+)
 from schemas.blog import MessageResponse
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Variants being generated for first uploads, by content hash
+_processing: Dict[str, asyncio.Future] = {}
 
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 ALLOWED_VIDEO_EXTENSIONS = {".mp4", ".webm", ".ogg"}
@@ -26,46 +44,85 @@ def is_allowed_file(filename: str) -> bool:
     return ext in ALLOWED_IMAGE_EXTENSIONS or ext in ALLOWED_VIDEO_EXTENSIONS
 
 
-def generate_filename(original_filename: str) -> str:
-    """Generate unique filename"""
+def content_filename(content_hash: str, original_filename: str) -> str:
+    """Name stored content by its hash, keeping the uploaded extension"""
     ext = get_file_extension(original_filename)
-    return f"{uuid.uuid4()}{ext}"
+    return f"{content_hash}{ext}"
 
 
-async def resize_image(file_path: str, max_width: int = 1200, max_height: int = 800):
-    """Resize image if it's too large"""
-    try:
-        with Image.open(file_path) as img:
-            # Convert RGBA to RGB if necessary
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-            
-            # Calculate new size
-            ratio = min(max_width / img.width, max_height / img.height)
-            if ratio < 1:
-                new_width = int(img.width * ratio)
-                new_height = int(img.height * ratio)
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                img.save(file_path, "JPEG", quality=85, optimize=True)
-    except Exception as e:
-        # If image processing fails, just keep the original
-        pass
+async def pending_variants(content_hash: str) -> dict:
+    """Variants of content another request in this process is still processing.
 
+    Raises the HTTPException that request failed with.
+    """
+    future = _processing.get(content_hash)
+    if future is None:
+        return {}
+    return await asyncio.shield(future)
 
-@router.post("/image", response_model=dict)
-async def upload_image(
-    file: UploadFile = File(...),
-    current_user: dict = Depends(admin_required)
-):
-    """Upload image file (admin only)"""
-    
-    # Check file size
-    if file.size > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes"
+
+async def drop_reference(db, filename: str):
+    """Release one reference, removing the variants along with the last one"""
+    if await release_reference(db, filename) == 0:
+        remove_variants(filename)
+
+
+async def create_variants(file_path: str, filename: str) -> dict:
+    """Generate responsive variants of an image in the image worker pool.
+
+    Variant files and a sidecar map are stored next to the original. The
+    upload goes through without variants when the queue is full, the job
+    times out or Pillow fails, so a slow image never holds up the request.
+    """
+    work_dir = tempfile.mkdtemp(dir=incoming_dir())
+    try:
+        variants = await image_processor.submit(
+            build_variants, file_path, work_dir, os.path.splitext(filename)[0],
+            settings.IMAGE_VARIANT_WIDTHS, variant_formats(), settings.IMAGE_VARIANT_QUALITY,
+            settings.IMAGE_PLACEHOLDER_WIDTH,
+            on_abandon=lambda: shutil.rmtree(work_dir, ignore_errors=True)
         )
+    except asyncio.TimeoutError:
+        # The worker still owns work_dir; on_abandon removes it
+        logger.warning("No variants for %s: timed out", filename)
+        return {}
+    except ImageQueueFull as e:
+        logger.warning("No variants for %s: %s", filename, e)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return {}
+    except Exception:
+        # If image processing fails, just keep the original
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return {}
     
+    try:
+        if variants is None:
+            return {}
+        for name in variant_files(variants):
+            commit(os.path.join(work_dir, name), name)
+        sidecar = os.path.join(work_dir, variants_name(filename))
+        with open(sidecar, "w") as f:
+            json.dump(variants, f)
+        commit(sidecar, variants_name(filename))
+        return with_urls(variants)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+async def save_upload(file: UploadFile) -> dict:
+    """Stream an upload into UPLOAD_DIR and describe it, within the global upload limit"""
+    async with upload_slots():
+        return await store_upload(file)
+
+
+async def store_upload(file: UploadFile) -> dict:
+    """Stream an upload into UPLOAD_DIR and describe it.
+
+    The file is copied in chunks to a temp file (rejected with 413 once it
+    passes MAX_FILE_SIZE) while its SHA-256 is computed, and stored under
+    that hash. Content that is already stored only gains a reference and
+    is returned as is; new images get their responsive variants.
+    """
     # Check file extension
     if not is_allowed_file(file.filename):
         raise HTTPException(
@@ -74,106 +131,154 @@ async def upload_image(
                    ", ".join(ALLOWED_IMAGE_EXTENSIONS | ALLOWED_VIDEO_EXTENSIONS)
         )
     
-    # Generate unique filename
-    filename = generate_filename(file.filename)
-    file_path = os.path.join(settings.UPLOAD_DIR, filename)
+    temp_path = None
+    digest = hashlib.sha256()
+    try:
+        temp_path, size = await stream_to_temp(file, settings.MAX_FILE_SIZE, digest)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception:
+        # Clean up file if something went wrong
+        discard(temp_path)
+        raise HTTPException(status_code=500, detail="Failed to save file")
+    
+    content_hash = digest.hexdigest()
+    db = get_database()
+    record = await add_reference(db, content_hash, content_filename(content_hash, file.filename), size)
+    filename = record["filename"] if record else content_filename(content_hash, file.filename)
+    final_path = os.path.join(settings.UPLOAD_DIR, filename)
     
-    # Save file
+    # Same bytes already stored, or being stored by a concurrent upload: reuse them without re-processing
+    if record is not None and (content_hash in _processing or os.path.exists(final_path)):
+        discard(temp_path)
+        variants = record.get("variants")
+        if variants is None:
+            try:
+                variants = await pending_variants(content_hash)
+            except HTTPException:
+                # The first upload of these bytes failed, so nothing is stored for this one either
+                await drop_reference(db, filename)
+                raise
+        return upload_result(filename, file.filename, size, variants, deduplicated=True)
+    
+    future = asyncio.get_running_loop().create_future()
+    _processing.setdefault(content_hash, future)
+    variants = {}
     try:
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # Resize image if it's an image file
-        ext = get_file_extension(filename)
-        if ext in ALLOWED_IMAGE_EXTENSIONS:
-            await resize_image(file_path)
+        try:
+            commit(temp_path, filename)
+        except Exception:
+            discard(temp_path)
+            raise HTTPException(status_code=500, detail="Failed to save file")
         
-        # Return file URL
-        file_url = f"/uploads/{filename}"
+        # Responsive variants for images; the original is stored untouched
+        if get_file_extension(filename) in ALLOWED_IMAGE_EXTENSIONS:
+            variants = await create_variants(final_path, filename)
+        await db.uploads.update_one({"_id": content_hash}, {"$set": {"variants": variants}})
+    except BaseException as e:
+        # Duplicate uploads waiting on this one fail with it
+        future.set_exception(e if isinstance(e, HTTPException) else HTTPException(
+            status_code=500, detail="Failed to save file"
+        ))
+        # Marks the exception retrieved when nobody is waiting
+        future.exception()
+        if isinstance(e, Exception):
+            await drop_reference(db, filename)
+        raise
+    else:
+        future.set_result(variants)
+    finally:
+        if _processing.get(content_hash) is future:
+            del _processing[content_hash]
+    
+    return upload_result(filename, file.filename, size, variants, deduplicated=False)
+
+
+def upload_result(filename: str, original_filename: str, size: int, variants: dict, deduplicated: bool) -> dict:
+    """Upload response for a stored file"""
+    return {
+        "filename": filename,
+        "url": f"/uploads/{filename}",
+        "original_filename": original_filename,
+        "size": size,
+        "variants": variants,
+        "deduplicated": deduplicated
+    }
+
+
+@router.post("/image", response_model=dict)
+async def upload_image(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(admin_required)
+):
+    """Upload image file (admin only)"""
+    return await save_upload(file)
+
+
+async def upload_one(file: UploadFile, slots: asyncio.Semaphore) -> dict:
+    """Result entry for one file of a multi-file upload; failures stay local to the file"""
+    # Check file extension
+    if not is_allowed_file(file.filename):
         return {
-            "filename": filename,
-            "url": file_url,
-            "original_filename": file.filename,
-            "size": len(content)
+            "filename": file.filename,
+            "success": False,
+            "error": "File type not allowed"
         }
-        
-    except Exception as e:
-        # Clean up file if something went wrong
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail="Failed to save file")
+    
+    async with slots:
+        try:
+            return {**await save_upload(file), "success": True}
+        except HTTPException as e:
+            return {
+                "filename": file.filename,
+                "success": False,
+                "error": e.detail
+            }
 
 
 @router.post("/multiple", response_model=List[dict])
 async def upload_multiple_files(
     files: List[UploadFile] = File(...),
+    stream: bool = Query(False, description="Stream one NDJSON line per file as it finishes"),
     current_user: dict = Depends(admin_required)
 ):
-    """Upload multiple files (admin only)"""
+    """Upload multiple files (admin only)
+    
+    Files are saved concurrently, UPLOAD_REQUEST_CONCURRENCY at a time per
+    request and UPLOAD_CONCURRENCY across the process. Results come back
+    in input order, or with `stream=true` as NDJSON lines tagged with the
+    file's `index`, in completion order.
+    """
     
-    if len(files) > 10:  # Limit to 10 files
-        raise HTTPException(status_code=400, detail="Too many files. Maximum 10 files allowed")
+    if len(files) > MAX_FILES_PER_REQUEST:
+        raise HTTPException(
+            status_code=400, detail=f"Too many files. Maximum {MAX_FILES_PER_REQUEST} files allowed"
+        )
     
-    results = []
+    slots = asyncio.Semaphore(settings.UPLOAD_REQUEST_CONCURRENCY)
+    tasks = [asyncio.create_task(upload_one(file, slots)) for file in files]
     
-    for file in files:
-        try:
-            # Check file size
-            if file.size > settings.MAX_FILE_SIZE:
-                results.append({
-                    "filename": file.filename,
-                    "success": False,
-                    "error": f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes"
-                })
-                continue
-            
-            # Check file extension
-            if not is_allowed_file(file.filename):
-                results.append({
-                    "filename": file.filename,
-                    "success": False,
-                    "error": "File type not allowed"
-                })
-                continue
-            
-            # Generate unique filename
-            filename = generate_filename(file.filename)
-            file_path = os.path.join(settings.UPLOAD_DIR, filename)
-            
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
-            
-            # Resize image if it's an image file
-            ext = get_file_extension(filename)
-            if ext in ALLOWED_IMAGE_EXTENSIONS:
-                await resize_image(file_path)
-            
-            # Add to results
-            file_url = f"/uploads/{filename}"
-            results.append({
-                "filename": filename,
-                "url": file_url,
-                "original_filename": file.filename,
-                "size": len(content),
-                "success": True
-            })
-            
-        except Exception as e:
-            results.append({
-                "filename": file.filename,
-                "success": False,
-                "error": "Failed to save file"
-            })
+    if not stream:
+        return await asyncio.gather(*tasks)
+    
+    async def progress():
+        indexes = {task: index for index, task in enumerate(tasks)}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=indexes.get):
+                yield dumps({"index": indexes[task], **task.result()}) + b"\n"
     
-    return results
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
 
 
 @router.delete("/{filename}", response_model=MessageResponse)
 async def delete_file(filename: str, current_user: dict = Depends(admin_required)):
-    """Delete uploaded file (admin only)"""
+    """Delete uploaded file (admin only)
+    
+    Content uploaded more than once loses one reference; the bytes and
+    variants are removed with the last one.
+    """
     
     file_path = os.path.join(settings.UPLOAD_DIR, filename)
     
@@ -181,7 +286,13 @@ async def delete_file(filename: str, current_user: dict = Depends(admin_required
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
-        os.remove(file_path)
+        remaining = await release_reference(get_database(), filename)
+        if remaining is None:
+            # Stored before content addressing: not reference counted
+            os.remove(file_path)
+            remove_variants(filename)
+        elif remaining == 0:
+            remove_variants(filename)
         return {"message": "File deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to delete file")
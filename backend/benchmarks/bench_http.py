@@ -0,0 +1,338 @@
+"""End-to-end HTTP benchmarks for the public read paths and uploads.
+
+By default the app runs in-process over the ASGI transport against a
+mongomock database seeded with the deterministic synthetic dataset;
+--mongo-url seeds a local mongod instead (the database is dropped first),
+and --base-url benchmarks an already running server with its own data.
+Each scenario reports throughput and p50/p95/p99 latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_http [--posts 2000] [--requests 200] [--concurrency 8]
+        [--scenarios posts_public post_detail ...] [--no-cache] [--json out.json]
+        [--mongo-url mongodb://localhost:27017] [--base-url http://127.0.0.1:8000]
+        [--baseline previous.json --max-regression 0.2]
+"""
+import argparse
+import asyncio
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from PIL import Image
+
+from benchmarks.dataset import EN_WORDS, KO_WORDS, DatasetGenerator, DatasetSpec, write_to_db
+
+API = "/api/v1"
+
+
+@dataclass
+class BenchContext:
+    post_ids: List[str]
+    category_names: List[str]
+    tag_names: List[str]
+    admin_headers: Dict[str, str]
+    image: bytes
+    pages: int = 1
+    search_terms: List[str] = field(default_factory=lambda: KO_WORDS + EN_WORDS)
+
+
+@dataclass
+class RequestSpec:
+    method: str
+    url: str
+    params: Optional[dict] = None
+    headers: Optional[dict] = None
+    files: Optional[list] = None
+
+
+def _zipf_choice(rng: random.Random, names: List[str]) -> str:
+    # Popular names first, as returned by the generator and list endpoints
+    weights = [1.0 / rank for rank in range(1, len(names) + 1)]
+    return rng.choices(names, weights)[0]
+
+
+SCENARIOS: Dict[str, Callable[[BenchContext, random.Random], RequestSpec]] = {
+    "posts_public": lambda ctx, rng: RequestSpec(
+        "GET", f"{API}/posts/public", {"page": rng.randint(1, min(ctx.pages, 20))}
+    ),
+    "posts_public_search": lambda ctx, rng: RequestSpec(
+        "GET", f"{API}/posts/public", {"search": rng.choice(ctx.search_terms)}
+    ),
+    "posts_public_tags": lambda ctx, rng: RequestSpec(
+        "GET", f"{API}/posts/public", {"tags": _zipf_choice(rng, ctx.tag_names)}
+    ),
+    "posts_public_category": lambda ctx, rng: RequestSpec(
+        "GET", f"{API}/posts/public", {"category": _zipf_choice(rng, ctx.category_names)}
+    ),
+    "post_detail": lambda ctx, rng: RequestSpec("GET", f"{API}/posts/public/{rng.choice(ctx.post_ids)}"),
+    "post_related": lambda ctx, rng: RequestSpec("GET", f"{API}/posts/public/{rng.choice(ctx.post_ids)}/related"),
+    "categories": lambda ctx, rng: RequestSpec("GET", f"{API}/categories/"),
+    "tags": lambda ctx, rng: RequestSpec("GET", f"{API}/tags/"),
+    "tags_popular": lambda ctx, rng: RequestSpec("GET", f"{API}/tags/popular"),
+    "feed": lambda ctx, rng: RequestSpec("GET", "/feed.xml"),
+    "sitemap_shard": lambda ctx, rng: RequestSpec("GET", "/sitemaps/posts-0.xml"),
+    "upload_image": lambda ctx, rng: RequestSpec(
+        "POST", f"{API}/upload/image", headers=ctx.admin_headers,
+        files=[("file", ("bench.png", unique_image(ctx, rng), "image/png"))]
+    ),
+    "upload_duplicate": lambda ctx, rng: RequestSpec(
+        "POST", f"{API}/upload/image", headers=ctx.admin_headers,
+        files=[("file", ("bench.png", ctx.image, "image/png"))]
+    ),
+    "upload_multiple": lambda ctx, rng: RequestSpec(
+        "POST", f"{API}/upload/multiple", headers=ctx.admin_headers,
+        files=[("files", (f"bench{i}.png", unique_image(ctx, rng), "image/png")) for i in range(3)]
+    ),
+}
+
+
+def make_image(width: int = 1600, height: int = 1200) -> bytes:
+    """A PNG large enough to be resized by the upload route"""
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def unique_image(ctx, rng) -> bytes:
+    """The bench image with random trailing bytes, so uploads are not deduplicated"""
+    return ctx.image + rng.randbytes(16)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    ctx: BenchContext,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int
+) -> dict:
+    """Send `requests` requests from `concurrency` workers and summarize latency"""
+    build = SCENARIOS[name]
+    rng = random.Random(f"{seed}:{name}")
+    specs = [build(ctx, rng) for _ in range(warmup + requests)]
+    latencies: List[float] = []
+    errors = 0
+    queue = iter(enumerate(specs))
+
+    async def worker():
+        nonlocal errors
+        for index, spec in queue:
+            started = time.perf_counter()
+            response = await client.request(
+                spec.method, spec.url, params=spec.params, headers=spec.headers, files=spec.files
+            )
+            elapsed = time.perf_counter() - started
+            if index < warmup:
+                continue
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "throughput_rps": len(latencies) / duration if duration else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0
+    }
+
+
+async def setup_in_process(args):
+    """Seed a database, point the app at it and return (client, context, cleanup)"""
+    from core import database as database_module
+    from core.cache import response_cache
+    from core.config import settings
+    from core.indexes import ensure_indexes
+    from core.related import related_index
+    from core.search import search_index
+    from core.security import create_access_token
+    from core.view_counter import view_counter
+    from main import app
+
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongo = AsyncIOMotorClient(args.mongo_url)
+        await mongo.drop_database(args.database)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        mongo = AsyncMongoMockClient()
+    db = mongo[args.database]
+    database_module.db.client = mongo
+    database_module.db.database = db
+
+    generator = DatasetGenerator(DatasetSpec(posts=args.posts, seed=args.seed))
+    started = time.perf_counter()
+    await write_to_db(db, generator, batch_size=1000)
+    await ensure_indexes(db)
+    await search_index.rebuild(db)
+    await related_index.rebuild(db)
+    print(f"Seeded {args.posts} posts in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    if args.no_cache:
+        response_cache.max_entries = 0
+    upload_dir = tempfile.TemporaryDirectory(prefix="bench-uploads-")
+    settings.UPLOAD_DIR = upload_dir.name
+    view_counter.start()
+
+    published = await db.posts.find({"is_published": True}, {"_id": 1}).to_list(length=None)
+    token = create_access_token({"sub": settings.ADMIN_USERNAME, "role": "admin"})
+    ctx = BenchContext(
+        post_ids=[str(post["_id"]) for post in published],
+        category_names=generator.category_names,
+        tag_names=generator.tag_names,
+        admin_headers={"Authorization": f"Bearer {token}"},
+        image=make_image(),
+        pages=max(1, len(published) // 10)
+    )
+    client = httpx.AsyncClient(app=app, base_url="http://bench")
+
+    async def cleanup():
+        await client.aclose()
+        await view_counter.stop()
+        upload_dir.cleanup()
+        if args.mongo_url:
+            await mongo.drop_database(args.database)
+            mongo.close()
+
+    return client, ctx, cleanup
+
+
+async def setup_remote(args):
+    """Discover ids from a running server and return (client, context, cleanup)"""
+    client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    login = await client.post(f"{API}/auth/login", json={"username": args.username, "password": args.password})
+    login.raise_for_status()
+
+    listing = (await client.get(f"{API}/posts/public", params={"size": 100})).json()
+    categories = (await client.get(f"{API}/categories/")).json()
+    popular = (await client.get(f"{API}/tags/popular")).json()
+    ctx = BenchContext(
+        post_ids=[post["id"] for post in listing["items"]],
+        category_names=[category["name"] for category in categories] or ["-"],
+        tag_names=[tag["name"] for tag in popular] or ["-"],
+        admin_headers={"Authorization": f"Bearer {login.json()['access_token']}"},
+        image=make_image(),
+        pages=max(1, listing["total"] // 10)
+    )
+    return client, ctx, client.aclose
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Scenarios whose p95 or throughput regressed by more than max_regression"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']:.1f} -> {current['throughput_rps']:.1f} req/s"
+            )
+    return regressions
+
+
+async def run(args) -> dict:
+    setup = setup_remote if args.base_url else setup_in_process
+    client, ctx, cleanup = await setup(args)
+    try:
+        results = {}
+        for name in args.scenarios:
+            results[name] = await run_scenario(
+                client, name, ctx, args.requests, args.concurrency, args.warmup, args.seed
+            )
+    finally:
+        await cleanup()
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "target": args.base_url or ("mongod" if args.mongo_url else "mongomock"),
+            "posts": None if args.base_url else args.posts,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "response_cache": not args.no_cache,
+            "python": platform.python_version()
+        },
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache (in-process only)")
+    parser.add_argument("--mongo-url", help="Seed and use a local mongod instead of mongomock")
+    parser.add_argument("--database", default="blog_bench")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--baseline", help="Previous --json output to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    print(f"{'scenario':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, result in report["results"].items():
+        print(
+            f"{name:<24} "
+            f"{result['throughput_rps']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} "
+            f"{result['errors']:>7}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
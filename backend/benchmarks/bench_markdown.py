@@ -0,0 +1,108 @@
+"""Compare render-on-write with render-on-read for post HTML.
+
+Render-on-read converts markdown on every request; render-on-write
+renders once when the post is saved and reads return the stored HTML.
+
+Usage (from backend/):
+    python -m benchmarks.bench_markdown [--reads 20] [--sizes 10000 50000 100000] [--json out.json]
+"""
+import argparse
+import json
+import time
+
+from core.rendering import content_hash, render_markdown, rendered_fields
+
+SECTION = """## 섹션 {n}
+
+FastAPI와 MongoDB로 블로그를 만드는 과정을 정리합니다. **비동기** 처리와 `Motor` 드라이버,
+그리고 [공식 문서](https://fastapi.tiangolo.com)를 참고했습니다.
+
+- 항목 하나
+- 항목 둘
+- 항목 셋
+
+```python
+async def handler(request):
+    return await service.process(request)
+```
+
+| 이름 | 값 |
+|------|----|
+| size | {n} |
+
+"""
+
+
+def make_markdown(size: int) -> str:
+    """Build realistic markdown of roughly `size` characters"""
+    parts = []
+    total = 0
+    n = 0
+    while total < size:
+        section = SECTION.format(n=n)
+        parts.append(section)
+        total += len(section)
+        n += 1
+    return "".join(parts)
+
+
+def timed(fn, repeat: int) -> float:
+    """Average seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_size(size: int, reads: int) -> dict:
+    content = make_markdown(size)
+    stored = rendered_fields(content)
+
+    # Render on read: every request converts the markdown
+    read_render = timed(lambda: render_markdown(content), reads)
+
+    # Render on write: one render when saved, then reads serve stored HTML
+    write_cost = timed(lambda: rendered_fields(content), 3)
+    read_stored = timed(lambda: stored["content_html"], reads)
+    # An unchanged save only pays for the hash comparison
+    unchanged_save = timed(lambda: rendered_fields(content, content_hash(content)), reads)
+
+    return {
+        "size_chars": len(content),
+        "reads": reads,
+        "render_on_read_ms_per_read": read_render * 1000,
+        "render_on_write_ms_per_write": write_cost * 1000,
+        "render_on_write_ms_per_read": read_stored * 1000,
+        "unchanged_save_ms": unchanged_save * 1000,
+        "total_render_on_read_ms": read_render * reads * 1000,
+        "total_render_on_write_ms": (write_cost + read_stored * reads) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = [bench_size(size, args.reads) for size in args.sizes]
+
+    print(f"{'chars':>9} {'read-render ms':>15} {'write ms':>10} {'stored read ms':>15} {'total read':>12} {'total write':>12}")
+    for result in results:
+        print(
+            f"{result['size_chars']:>9} "
+            f"{result['render_on_read_ms_per_read']:>15.3f} "
+            f"{result['render_on_write_ms_per_write']:>10.3f} "
+            f"{result['render_on_write_ms_per_read']:>15.5f} "
+            f"{result['total_render_on_read_ms']:>12.1f} "
+            f"{result['total_render_on_write_ms']:>12.1f}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare per-item cost of the old and new list response serialization.
+
+"before" validates each item into PostListResponse and serializes the
+page through jsonable_encoder + json.dumps, as FastAPI's default
+JSONResponse does. "after" builds items with model_construct (the data
+comes from our own collection) and writes bytes with orjson.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--pages 10 100] [--repeat 200] [--json out.json]
+"""
+import argparse
+import json
+import time
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from api.v1.routers.posts import select_fields
+from benchmarks.dataset import DatasetGenerator, DatasetSpec
+from core.post_fields import CARD_FIELDS, post_list_fields
+from core.rendering import make_excerpt
+from core.serialization import dumps
+from schemas.blog import PostListResponse
+
+
+def make_documents(count: int) -> list:
+    """Post documents as read with the card projection, plus their categories"""
+    generator = DatasetGenerator(DatasetSpec(posts=count))
+    categories = {name: ObjectId() for name in generator.category_names}
+    documents = []
+    for row in generator.posts():
+        category_id = categories[row["category_name"]]
+        document = {key: row[key] for key in ("title", "summary", "tags", "featured_image", "is_published", "created_at")}
+        document.update(
+            _id=ObjectId(),
+            excerpt=make_excerpt(row["content"]),
+            category_id=category_id,
+            view_count=row["view_count"]
+        )
+        category = {"id": str(category_id), "name": row["category_name"], "description": None}
+        documents.append((document, category))
+    return documents
+
+
+def page_payload(items: list) -> dict:
+    return {"items": items, "total": 1000, "page": 1, "size": len(items), "pages": 100}
+
+
+def before(documents: list) -> bytes:
+    items = [PostListResponse(**post_list_fields(document, category)) for document, category in documents]
+    payload = page_payload(select_fields(items, list(CARD_FIELDS)))
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def after(documents: list) -> bytes:
+    items = [PostListResponse.model_construct(**post_list_fields(document, category)) for document, category in documents]
+    return dumps(page_payload(select_fields(items, list(CARD_FIELDS))))
+
+
+def timed(fn, repeat: int) -> float:
+    """Average seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_page(size: int, repeat: int) -> dict:
+    documents = make_documents(size)
+    # Both paths must produce the same JSON
+    assert json.loads(before(documents)) == json.loads(after(documents))
+
+    before_s = timed(lambda: before(documents), repeat)
+    after_s = timed(lambda: after(documents), repeat)
+    return {
+        "page_size": size,
+        "repeat": repeat,
+        "before_us_per_item": before_s / size * 1e6,
+        "after_us_per_item": after_s / size * 1e6,
+        "before_ms_per_page": before_s * 1000,
+        "after_ms_per_page": after_s * 1000,
+        "speedup": before_s / after_s if after_s else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = [bench_page(size, args.repeat) for size in args.pages]
+
+    print(f"{'items':>6} {'before us/item':>15} {'after us/item':>14} {'before ms/page':>15} {'after ms/page':>14} {'speedup':>8}")
+    for result in results:
+        print(
+            f"{result['page_size']:>6} "
+            f"{result['before_us_per_item']:>15.2f} "
+            f"{result['after_us_per_item']:>14.2f} "
+            f"{result['before_ms_per_page']:>15.3f} "
+            f"{result['after_ms_per_page']:>14.3f} "
+            f"{result['speedup']:>7.1f}x"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
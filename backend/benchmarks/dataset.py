@@ -0,0 +1,307 @@
+"""Deterministic synthetic blog data for seeding and benchmarks.
+
+Posts mix Korean and English markdown (headings, lists, code, links,
+tables), tags and categories follow Zipf distributions, and view counts
+are log-normal so a few posts get most of the traffic. Every post is
+derived from (seed, index) alone, so the same seed always yields the
+same dataset regardless of batch size or concurrency.
+"""
+import asyncio
+import bisect
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+from typing import Awaitable, Callable, Iterable, Iterator, List, Optional
+
+from pymongo import UpdateOne
+
+from core.rendering import make_excerpt, rendered_fields
+from core.category_counts import rebuild_category_counts
+from core.tag_stats import rebuild_tag_stats
+
+CATEGORY_NAMES = [
+    "기술", "일상", "리뷰", "튜토리얼", "뉴스", "Engineering", "Career", "Data",
+    "DevOps", "Frontend", "Backend", "회고", "독서", "여행", "Design", "Security"
+]
+
+TAG_STEMS = [
+    "Python", "FastAPI", "MongoDB", "React", "TypeScript", "JavaScript", "Docker", "Kubernetes",
+    "AWS", "Linux", "Git", "CSS", "HTML", "Node.js", "Go", "Rust", "Java", "Spring", "Redis",
+    "PostgreSQL", "GraphQL", "Testing", "CI", "Performance", "Security", "ML", "LLM",
+    "웹개발", "프론트엔드", "백엔드", "풀스택", "데이터베이스", "알고리즘", "자료구조", "회고",
+    "독서", "여행", "커리어", "면접", "아키텍처", "클라우드", "보안", "성능", "리팩터링"
+]
+
+KO_WORDS = [
+    "개발", "서버", "데이터", "성능", "구조", "설계", "배포", "테스트", "코드", "요청", "응답",
+    "캐시", "인덱스", "쿼리", "사용자", "서비스", "문제", "해결", "경험", "정리", "방법", "이번",
+    "프로젝트", "팀", "기능", "버전", "환경", "설정", "로그", "모니터링", "비동기", "동시성"
+]
+KO_ENDINGS = ["합니다", "했습니다", "입니다", "할 수 있습니다", "되었습니다", "보겠습니다"]
+
+EN_WORDS = [
+    "the", "server", "request", "latency", "cache", "index", "query", "deploy", "build", "test",
+    "user", "service", "design", "data", "stream", "async", "worker", "queue", "memory", "thread",
+    "we", "it", "this", "our", "with", "for", "and", "when", "faster", "simple", "reliable"
+]
+
+CODE_SNIPPETS = [
+    ("python", "async def handler(request):\n    data = await service.load(request.id)\n    return {\"items\": data}"),
+    ("javascript", "const res = await fetch(`/api/v1/posts?page=${page}`);\nconst { items } = await res.json();"),
+    ("bash", "docker compose up -d\ncurl -s http://localhost:8000/health"),
+    ("sql", "SELECT id, title FROM posts\nWHERE published = true\nORDER BY created_at DESC\nLIMIT 10;"),
+]
+
+
+@dataclass
+class DatasetSpec:
+    posts: int = 10_000
+    categories: int = 12
+    tags: int = 200
+    seed: int = 42
+    published_ratio: float = 0.9
+    korean_ratio: float = 0.7
+    start: datetime = datetime(2019, 1, 1)
+    end: datetime = datetime(2025, 1, 1)
+    tag_exponent: float = 1.1
+    category_exponent: float = 1.0
+
+
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    """Cumulative Zipf weights for ranks 1..n"""
+    return list(accumulate(1.0 / rank ** exponent for rank in range(1, n + 1)))
+
+
+class DatasetGenerator:
+    """Generates categories, tags and posts for a DatasetSpec"""
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self.category_names = [self._name(CATEGORY_NAMES, i) for i in range(spec.categories)]
+        self.tag_names = [self._name(TAG_STEMS, i) for i in range(spec.tags)]
+        self.category_weights = zipf_cum_weights(spec.categories, spec.category_exponent)
+        self.tag_weights = zipf_cum_weights(spec.tags, spec.tag_exponent)
+        self.span_seconds = int((spec.end - spec.start).total_seconds())
+
+    @staticmethod
+    def _name(pool: List[str], i: int) -> str:
+        # Unique names beyond the pool size: "Python", ..., "Python 2", ...
+        base = pool[i % len(pool)]
+        return base if i < len(pool) else f"{base} {i // len(pool) + 1}"
+
+    def categories(self) -> List[dict]:
+        """Category import rows, most popular first"""
+        return [
+            {"name": name, "description": f"{name} 관련 포스트 / Posts about {name}"}
+            for name in self.category_names
+        ]
+
+    def tags(self) -> List[dict]:
+        """Tag import rows, most popular first"""
+        return [{"name": name} for name in self.tag_names]
+
+    def _zipf_pick(self, rng: random.Random, names: List[str], cum_weights: List[float]) -> str:
+        return names[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+    def _sentence(self, rng: random.Random, korean: bool) -> str:
+        if korean:
+            words = " ".join(rng.choice(KO_WORDS) for _ in range(rng.randint(4, 10)))
+            return f"{words} {rng.choice(KO_ENDINGS)}."
+        words = " ".join(rng.choice(EN_WORDS) for _ in range(rng.randint(6, 16)))
+        return words[0].upper() + words[1:] + "."
+
+    def _paragraph(self, rng: random.Random, korean: bool) -> str:
+        return " ".join(self._sentence(rng, korean) for _ in range(rng.randint(2, 6)))
+
+    def _markdown(self, rng: random.Random, title: str, korean: bool, target_length: int) -> str:
+        parts = [f"# {title}", self._paragraph(rng, korean)]
+        length = sum(len(part) for part in parts)
+        section = 1
+        while length < target_length:
+            block = rng.random()
+            if block < 0.15:
+                heading = "섹션" if korean else "Section"
+                text = f"## {heading} {section}"
+                section += 1
+            elif block < 0.3:
+                text = "\n".join(f"- {self._sentence(rng, korean)}" for _ in range(rng.randint(2, 5)))
+            elif block < 0.4:
+                language, code = rng.choice(CODE_SNIPPETS)
+                text = f"```{language}\n{code}\n```"
+            elif block < 0.45:
+                text = "| key | value |\n|-----|-------|\n" + "\n".join(
+                    f"| {rng.choice(EN_WORDS)} | {rng.randint(1, 1000)} |" for _ in range(3)
+                )
+            elif block < 0.5:
+                text = f"{self._sentence(rng, korean)} [link](https://example.com/{rng.randint(1, 10_000)})"
+            else:
+                text = self._paragraph(rng, korean)
+            parts.append(text)
+            length += len(text) + 2
+        return "\n\n".join(parts)
+
+    def post(self, index: int) -> dict:
+        """Post `index` as an import row; depends only on (seed, index)"""
+        rng = random.Random(f"{self.spec.seed}:{index}")
+        korean = rng.random() < self.spec.korean_ratio
+        title_words = KO_WORDS if korean else EN_WORDS
+        title = " ".join(rng.choice(title_words) for _ in range(rng.randint(2, 6))).title() + f" #{index}"
+
+        # Most posts are a few KB; a long tail reaches tens of KB
+        target_length = min(int(rng.lognormvariate(7.6, 0.7)), 60_000)
+        content = self._markdown(rng, title, korean, target_length)
+
+        tag_count = rng.randint(1, min(5, len(self.tag_names)))
+        tags = []
+        while len(tags) < tag_count:
+            tag = self._zipf_pick(rng, self.tag_names, self.tag_weights)
+            if tag not in tags:
+                tags.append(tag)
+
+        created_at = self.spec.start + timedelta(seconds=rng.randrange(self.span_seconds))
+        edited = rng.random() < 0.3
+        updated_at = created_at + timedelta(hours=rng.randint(1, 24 * 90)) if edited else created_at
+        is_published = rng.random() < self.spec.published_ratio
+
+        return {
+            "title": title,
+            "content": content,
+            "summary": self._sentence(rng, korean) if rng.random() < 0.8 else None,
+            "category_name": self._zipf_pick(rng, self.category_names, self.category_weights),
+            "tags": tags,
+            "featured_image": None,
+            "is_published": is_published,
+            "created_at": created_at,
+            "updated_at": min(updated_at, self.spec.end),
+            "view_count": int(rng.lognormvariate(4.0, 1.6)) if is_published else 0
+        }
+
+    def posts(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        for index in range(start, self.spec.posts if stop is None else stop):
+            yield self.post(index)
+
+
+def chunks(items: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most `size` without materializing it"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def run_bounded(jobs: Iterable[Callable[[], Awaitable]], concurrency: int):
+    """Run job factories with at most `concurrency` in flight, failing fast"""
+    pending = set()
+    for job in jobs:
+        if len(pending) >= concurrency:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        pending.add(asyncio.create_task(job()))
+    for task in asyncio.as_completed(pending):
+        await task
+
+
+async def upsert_by_name(collection, rows: List[dict], now: datetime):
+    """Insert rows whose name is not stored yet; existing documents are left as they are"""
+    await collection.bulk_write([
+        UpdateOne({"name": row["name"]}, {"$setOnInsert": {**row, "created_at": now}}, upsert=True)
+        for row in rows
+    ], ordered=False)
+
+
+def post_document(row: dict, categories: dict, render: bool) -> dict:
+    """Convert an import row to a stored post document"""
+    category_id = categories[row["category_name"]]
+    document = {
+        **{key: value for key, value in row.items() if key != "category_name"},
+        "category_id": category_id,
+        "category_name": row["category_name"],
+        "excerpt": make_excerpt(row["content"])
+    }
+    if render:
+        document.update(rendered_fields(row["content"]))
+    return document
+
+
+async def write_to_db(
+    db,
+    generator: DatasetGenerator,
+    batch_size: int = 1000,
+    concurrency: int = 4,
+    render: bool = False,
+    progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """Insert the dataset with unordered insert_many batches; returns posts written.
+
+    Categories and tags are upserted by name, so seeding a database that
+    already has them (no --drop) reuses the existing documents. Without
+    `render`, HTML is rendered lazily on first `format=html` read.
+    """
+    now = datetime.utcnow()
+    await upsert_by_name(db.categories, generator.categories(), now)
+    await upsert_by_name(db.tags, generator.tags(), now)
+    categories = {
+        category["name"]: category["_id"]
+        async for category in db.categories.find({"name": {"$in": generator.category_names}}, {"name": 1})
+    }
+
+    written = 0
+
+    def make_job(rows):
+        async def job():
+            nonlocal written
+            documents = [post_document(row, categories, render) for row in rows]
+            await db.posts.insert_many(documents, ordered=False)
+            written += len(documents)
+            if progress:
+                progress(written)
+        return job
+
+    await run_bounded((make_job(rows) for rows in chunks(generator.posts(), batch_size)), concurrency)
+    await rebuild_tag_stats(db)
+    await rebuild_category_counts(db)
+    return written
+
+
+def ndjson(rows: Iterable[dict]) -> bytes:
+    """Encode rows as an NDJSON import body"""
+    return "".join(
+        json.dumps(row, ensure_ascii=False, default=datetime.isoformat) + "\n" for row in rows
+    ).encode("utf-8")
+
+
+async def write_via_api(
+    client,
+    generator: DatasetGenerator,
+    batch_size: int = 500,
+    concurrency: int = 4,
+    progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """Send the dataset to the bulk import API with bounded concurrency.
+
+    `client` is an authenticated httpx.AsyncClient whose base_url is the API
+    root (e.g. http://127.0.0.1:8000/api/v1). Returns posts created.
+    """
+    for collection, rows in (("categories", generator.categories()), ("tags", generator.tags())):
+        response = await client.post(f"/import/{collection}", content=ndjson(rows))
+        response.raise_for_status()
+
+    created = 0
+
+    def make_job(rows):
+        async def job():
+            nonlocal created
+            response = await client.post("/import/posts", content=ndjson(rows), timeout=None)
+            response.raise_for_status()
+            created += response.json()["created"]
+            if progress:
+                progress(created)
+        return job
+
+    await run_bounded((make_job(rows) for rows in chunks(generator.posts(), batch_size)), concurrency)
+    return created
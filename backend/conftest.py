@@ -6,8 +6,13 @@ from mongomock_motor import AsyncMongoMockClient
 from fastapi.testclient import TestClient
 
 from main import app
+from core.cache import response_cache
+from core.counts import post_counts
+from core.feeds import feed_cache
+from core import database
 from core.database import get_database
 from core.config import settings
+from core.security import create_access_token
 
 
 @pytest.fixture(scope="session")
@@ -18,14 +23,40 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start every test with empty response, feed and count caches."""
+    response_cache.clear()
+    feed_cache.clear()
+    post_counts.invalidate()
+    yield
+    response_cache.clear()
+    feed_cache.clear()
+    post_counts.invalidate()
+
+
 @pytest.fixture
-async def mock_db():
-    """Mock MongoDB database for testing."""
+async def mock_db(monkeypatch):
+    """Mock MongoDB database, returned by get_database() everywhere for the test."""
     client = AsyncMongoMockClient()
     db = client[settings.DATABASE_NAME]
+    monkeypatch.setattr(database.db, "database", db)
     return db
 
 
+@pytest.fixture
+def admin_headers():
+    """Authorization headers with a signed admin token."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'admin', 'role': 'admin'})}"}
+
+
+@pytest.fixture
+async def api_client(mock_db, admin_headers):
+    """Admin client for the app and the mock database behind it."""
+    async with AsyncClient(app=app, base_url="http://test", headers=admin_headers) as ac:
+        yield ac, mock_db
+
+
 @pytest.fixture
 async def app_with_db(mock_db):
     """FastAPI app with mocked database."""
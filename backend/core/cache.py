@@ -0,0 +1,182 @@
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from core.conditional import body_etag, conditional_response
+from core.config import settings
+from core.serialization import dumps
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    media_type: str
+    expires_at: float
+    etag: str
+    last_modified: Optional[datetime] = None
+    tags: Set[str] = field(default_factory=set)
+
+
+def render_json(payload: Any) -> bytes:
+    """Serialize a response payload with the API's default serializer"""
+    return dumps(payload)
+
+
+class ResponseCache:
+    """LRU + TTL cache of serialized responses with tag-based invalidation.
+
+    Entries are keyed by path and normalized query string and carry
+    dependency tags such as "post:<id>" or "categories"; write handlers
+    invalidate by tag.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.tag_index: Dict[str, Set[str]] = defaultdict(set)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(request: Request) -> str:
+        """Build a cache key from the route path and sorted query parameters"""
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def get(self, key: str, request: Optional[Request] = None) -> Optional[Response]:
+        """Return a response for a cached key, or None on a miss.
+
+        When the request is given, conditional headers are honoured and a
+        304 is returned if the client's copy is current.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        if request is None:
+            return Response(content=entry.body, media_type=entry.media_type)
+        return conditional_response(request, entry.body, entry.etag, entry.last_modified, entry.media_type)
+
+    def store(
+        self,
+        key: str,
+        payload: Any,
+        tags: Iterable[str],
+        request: Optional[Request] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+        media_type: str = "application/json"
+    ) -> Response:
+        """Serialize a payload, cache it under the given tags and return it.
+
+        The ETag defaults to a hash of the body. When the request is given,
+        a 304 is returned if the client's copy is current.
+        """
+        body = payload if isinstance(payload, bytes) else render_json(payload)
+        etag = etag or body_etag(body)
+        self.set(key, body, tags, media_type, etag=etag, last_modified=last_modified)
+        if request is None:
+            return Response(content=body, media_type=media_type)
+        return conditional_response(request, body, etag, last_modified, media_type)
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        tags: Iterable[str],
+        media_type: str = "application/json",
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None
+    ):
+        """Cache serialized bytes under the given dependency tags"""
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self._remove(key)
+
+        entry = CacheEntry(
+            body=body,
+            media_type=media_type,
+            expires_at=time.monotonic() + self.ttl,
+            etag=etag or body_etag(body),
+            last_modified=last_modified,
+            tags=set(tags)
+        )
+        self.entries[key] = entry
+        self.size_bytes += len(body)
+        for tag in entry.tags:
+            self.tag_index[tag].add(key)
+
+        while len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, *tags: str):
+        """Drop every entry that depends on any of the given tags"""
+        for tag in tags:
+            for key in self.tag_index.pop(tag, set()):
+                if key in self.entries:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop all entries; statistics are kept"""
+        self.entries.clear()
+        self.tag_index.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key)
+        self.size_bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
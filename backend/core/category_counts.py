@@ -0,0 +1,78 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+# Counters kept on each category document
+TOTAL = "post_count"
+PUBLISHED = "published_count"
+ZERO_COUNTS = {TOTAL: 0, PUBLISHED: 0}
+
+
+def _add(deltas: Dict, post: Optional[dict], sign: int):
+    if not post or not post.get("category_id"):
+        return
+    delta = deltas[post["category_id"]]
+    delta[TOTAL] += sign
+    if post.get("is_published"):
+        delta[PUBLISHED] += sign
+
+
+async def _apply(db, deltas: Dict):
+    operations: List[UpdateOne] = [
+        UpdateOne({"_id": category_id}, {"$inc": {field: value for field, value in delta.items() if value}})
+        for category_id, delta in deltas.items()
+        if any(delta.values())
+    ]
+    if operations:
+        await db.categories.bulk_write(operations, ordered=False)
+
+
+def _deltas() -> Dict:
+    return defaultdict(lambda: {TOTAL: 0, PUBLISHED: 0})
+
+
+async def apply_post_change(db, before: Optional[dict], after: Optional[dict]):
+    """Move a post's counts between categories; pass None for a missing side (create/delete)"""
+    deltas = _deltas()
+    _add(deltas, before, -1)
+    _add(deltas, after, 1)
+    await _apply(db, deltas)
+
+
+async def apply_posts_created(db, posts: Iterable[dict]):
+    """Count a batch of newly inserted posts"""
+    deltas = _deltas()
+    for post in posts:
+        _add(deltas, post, 1)
+    await _apply(db, deltas)
+
+
+async def rebuild_category_counts(db) -> int:
+    """Recompute every category's counters from the posts collection; returns categories updated"""
+    pipeline = [
+        {"$match": {"category_id": {"$ne": None}}},
+        {"$group": {
+            "_id": "$category_id",
+            TOTAL: {"$sum": 1},
+            PUBLISHED: {"$sum": {"$cond": ["$is_published", 1, 0]}}
+        }}
+    ]
+    counts = {item["_id"]: item for item in await db.posts.aggregate(pipeline).to_list(length=None)}
+
+    operations = []
+    async for category in db.categories.find({}, {"_id": 1}):
+        item = counts.get(category["_id"], ZERO_COUNTS)
+        operations.append(UpdateOne(
+            {"_id": category["_id"]},
+            {"$set": {TOTAL: item[TOTAL], PUBLISHED: item[PUBLISHED]}}
+        ))
+    if operations:
+        await db.categories.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def ensure_category_counts(db):
+    """Build the counters once when upgrading categories that have none"""
+    if await db.categories.find_one({TOTAL: {"$exists": False}}, {"_id": 1}):
+        await rebuild_category_counts(db)
@@ -0,0 +1,82 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Clients may reuse a response but must revalidate it first
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from identifying parts such as _id and updated_at"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Build a strong ETag from a serialized response body"""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Mongo returns naive datetimes in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def format_http_date(value: datetime) -> str:
+    """Format a datetime for the Last-Modified header"""
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since when it is absent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        if "*" in candidates:
+            return True
+        # Weak comparison is allowed for GET revalidation
+        return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return _as_utc(last_modified) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    """Headers that let clients revalidate a response"""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Empty 304 response carrying the validators"""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    media_type: str = "application/json"
+) -> Response:
+    """Return 304 when the client's copy is current, otherwise the full body"""
+    etag = etag or body_etag(body)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return Response(content=body, media_type=media_type, headers=validator_headers(etag, last_modified))
@@ -22,6 +22,48 @@ class Settings(BaseSettings):
     # Upload
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
+    # Files saved at once: across the process, and per /upload/multiple request
+    UPLOAD_CONCURRENCY: int = 8
+    UPLOAD_REQUEST_CONCURRENCY: int = 4
+    
+    # Image processing pool (0 workers = one per CPU core)
+    IMAGE_WORKERS: int = 0
+    IMAGE_QUEUE_SIZE: int = 64
+    IMAGE_TIMEOUT_SECONDS: float = 10.0
+    
+    # Responsive image variants (AVIF needs the pillow-avif-plugin package)
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 960, 1280, 1920]
+    IMAGE_VARIANT_FORMATS: List[str] = ["avif", "webp"]
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_PLACEHOLDER_WIDTH: int = 16
+    
+    # View counts (write-behind buffer)
+    VIEW_COUNT_FLUSH_INTERVAL_MS: int = 1000
+    VIEW_COUNT_FLUSH_THRESHOLD: int = 500
+    
+    # Response cache for public read endpoints
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_MAX_BYTES: int = 67108864  # 64MB
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    
+    # Cached approximate totals for unfiltered/category-only post lists
+    POST_COUNT_CACHE_TTL_SECONDS: int = 30
+    
+    # Rows written per bulk_write during imports
+    IMPORT_BATCH_SIZE: int = 1000
+    
+    # Related posts precomputed per published post
+    RELATED_POSTS_K: int = 10
+    
+    # Public site used for links in feeds and sitemaps
+    SITE_URL: str = "http://localhost:3000"
+    SITE_TITLE: str = "Blog"
+    
+    # Feeds and sitemaps (rendered once, dropped on publish events)
+    FEED_SIZE: int = 20
+    FEED_CACHE_MAX_ENTRIES: int = 512
+    FEED_CACHE_TTL_SECONDS: int = 86400
+    SITEMAP_SHARD_SIZE: int = 10000
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,49 @@
+import time
+from typing import Dict, Tuple
+
+from bson import json_util
+
+from core.config import settings
+
+# Queries whose totals may be served approximately from the cache
+APPROXIMATE_FIELDS = {"is_published", "category_id", "category_name"}
+
+
+def is_approximable(query: dict) -> bool:
+    """Whether a query is unfiltered or category-only"""
+    return set(query) <= APPROXIMATE_FIELDS
+
+
+class CountCache:
+    """Short-lived cache of document counts for common list filters.
+
+    Unfiltered collections use estimated_document_count (collection
+    metadata); other counts are computed once and reused until they
+    expire or a write invalidates them.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        self.entries: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+    async def count(self, collection, query: dict) -> int:
+        """Return a possibly cached count of documents matching the query"""
+        if not query:
+            return await collection.estimated_document_count()
+
+        key = (collection.name, json_util.dumps(query, sort_keys=True))
+        entry = self.entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        total = await collection.count_documents(query)
+        self.entries[key] = (now + self.ttl, total)
+        return total
+
+    def invalidate(self):
+        """Forget every cached count"""
+        self.entries.clear()
+
+
+post_counts = CountCache(ttl_seconds=settings.POST_COUNT_CACHE_TTL_SECONDS)
@@ -0,0 +1,195 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+from core.cache import ResponseCache
+from core.config import settings
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+MEDIA_TYPES = {"rss": "application/rss+xml", "atom": "application/atom+xml", "sitemap": "application/xml"}
+
+FEED_FIELDS = {
+    "title": 1, "summary": 1, "excerpt": 1, "content_html": 1, "category_name": 1, "tags": 1,
+    "created_at": 1, "updated_at": 1
+}
+
+# Cache tags: every feed entry depends on "feed" or a category/tag feed tag,
+# the sitemap index on "sitemap" and each shard on "sitemap:<n>"
+FEED_TAG = "feed"
+SITEMAP_TAG = "sitemap"
+
+# Rendered feeds live until a publish event drops them; the TTL is only a backstop
+feed_cache = ResponseCache(
+    max_entries=settings.FEED_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl_seconds=settings.FEED_CACHE_TTL_SECONDS
+)
+
+
+def category_tag(category_id) -> str:
+    return f"feed:category:{category_id}"
+
+
+def tag_tag(name: str) -> str:
+    return f"feed:tag:{name}"
+
+
+def shard_tag(shard: int) -> str:
+    return f"{SITEMAP_TAG}:{shard}"
+
+
+def site_url(path: str = "/") -> str:
+    return settings.SITE_URL.rstrip("/") + path
+
+
+def post_url(post_id) -> str:
+    return site_url(f"/post/{post_id}")
+
+
+def _utc(value: datetime) -> datetime:
+    # Mongo returns naive datetimes in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _w3c(value: datetime) -> str:
+    return _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _text(parent: ET.Element, tag: str, text: Optional[str], attrib: Optional[dict] = None) -> ET.Element:
+    element = ET.SubElement(parent, tag, attrib or {})
+    element.text = text
+    return element
+
+
+def _tostring(root: ET.Element) -> bytes:
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def last_modified(posts: List[dict]) -> Optional[datetime]:
+    """Newest updated_at among the posts, used for Last-Modified"""
+    return max((post["updated_at"] for post in posts), default=None)
+
+
+async def latest_posts(db, query: dict) -> List[dict]:
+    """The newest published posts matching a filter"""
+    return await db.posts.find(
+        {"is_published": True, **query}, FEED_FIELDS
+    ).sort([("created_at", -1), ("_id", -1)]).limit(settings.FEED_SIZE).to_list(length=settings.FEED_SIZE)
+
+
+def render_rss(title: str, link: str, feed_url: str, posts: List[dict]) -> bytes:
+    """RSS 2.0 document for a list of posts"""
+    rss = ET.Element("rss", {"version": "2.0", "xmlns:atom": ATOM_NS})
+    channel = ET.SubElement(rss, "channel")
+    _text(channel, "title", title)
+    _text(channel, "link", link)
+    _text(channel, "description", title)
+    ET.SubElement(channel, "atom:link", {"href": feed_url, "rel": "self", "type": MEDIA_TYPES["rss"]})
+    updated = last_modified(posts)
+    if updated:
+        _text(channel, "lastBuildDate", format_datetime(_utc(updated), usegmt=True))
+
+    for post in posts:
+        item = ET.SubElement(channel, "item")
+        url = post_url(post["_id"])
+        _text(item, "title", post["title"])
+        _text(item, "link", url)
+        _text(item, "guid", url, {"isPermaLink": "true"})
+        _text(item, "pubDate", format_datetime(_utc(post["created_at"]), usegmt=True))
+        _text(item, "description", post.get("summary") or post.get("excerpt") or "")
+        for name in filter(None, [post.get("category_name"), *(post.get("tags") or [])]):
+            _text(item, "category", name)
+    return _tostring(rss)
+
+
+def render_atom(title: str, link: str, feed_url: str, posts: List[dict]) -> bytes:
+    """Atom 1.0 document for a list of posts, with the rendered HTML bodies"""
+    feed = ET.Element("feed", {"xmlns": ATOM_NS})
+    _text(feed, "id", feed_url)
+    _text(feed, "title", title)
+    ET.SubElement(feed, "link", {"href": link})
+    ET.SubElement(feed, "link", {"href": feed_url, "rel": "self"})
+    _text(feed, "updated", _w3c(last_modified(posts) or datetime.utcnow()))
+
+    for post in posts:
+        entry = ET.SubElement(feed, "entry")
+        url = post_url(post["_id"])
+        _text(entry, "id", url)
+        _text(entry, "title", post["title"])
+        ET.SubElement(entry, "link", {"href": url})
+        _text(entry, "published", _w3c(post["created_at"]))
+        _text(entry, "updated", _w3c(post["updated_at"]))
+        _text(entry, "summary", post.get("summary") or post.get("excerpt") or "")
+        if post.get("content_html"):
+            _text(entry, "content", post["content_html"], {"type": "html"})
+        for name in post.get("tags") or []:
+            ET.SubElement(entry, "category", {"term": name})
+    return _tostring(feed)
+
+
+def render_feed(output_format: str, title: str, link: str, feed_url: str, posts: List[dict]) -> bytes:
+    renderer = render_atom if output_format == "atom" else render_rss
+    return renderer(title, link, feed_url, posts)
+
+
+def shard_count(published: int) -> int:
+    """Number of sitemap shards for a published post count (at least one)"""
+    return max(1, -(-published // settings.SITEMAP_SHARD_SIZE))
+
+
+async def render_sitemap_index(db) -> bytes:
+    """Sitemap index pointing at every post shard"""
+    shards = shard_count(await db.posts.count_documents({"is_published": True}))
+    index = ET.Element("sitemapindex", {"xmlns": SITEMAP_NS})
+    for shard in range(shards):
+        sitemap = ET.SubElement(index, "sitemap")
+        _text(sitemap, "loc", site_url(f"/sitemaps/posts-{shard}.xml"))
+    return _tostring(index)
+
+
+async def render_sitemap_shard(db, shard: int) -> Optional[Tuple[bytes, Optional[datetime]]]:
+    """One shard of published post URLs in _id order, or None past the last shard"""
+    size = settings.SITEMAP_SHARD_SIZE
+    posts = await db.posts.find(
+        {"is_published": True}, {"updated_at": 1}
+    ).sort("_id", 1).skip(shard * size).limit(size).to_list(length=size)
+    if not posts and shard > 0:
+        return None
+
+    urlset = ET.Element("urlset", {"xmlns": SITEMAP_NS})
+    for post in posts:
+        url = ET.SubElement(urlset, "url")
+        _text(url, "loc", post_url(post["_id"]))
+        _text(url, "lastmod", _w3c(post["updated_at"]))
+    return _tostring(urlset), last_modified(posts)
+
+
+async def invalidate_post_change(db, before: Optional[dict], after: Optional[dict]):
+    """Drop the feeds and sitemap shards a post write changes; drafts touch nothing.
+
+    Pass None for a missing side (create/delete).
+    """
+    published = [post for post in (before, after) if post and post.get("is_published")]
+    if not published:
+        return
+
+    tags = {FEED_TAG}
+    for post in published:
+        if post.get("category_id"):
+            tags.add(category_tag(post["category_id"]))
+        tags.update(tag_tag(name) for name in post.get("tags") or [])
+
+    first = await db.posts.count_documents(
+        {"is_published": True, "_id": {"$lt": published[0]["_id"]}}
+    ) // settings.SITEMAP_SHARD_SIZE
+    if len(published) == 2:
+        # Still published: only its lastmod changed
+        tags.add(shard_tag(first))
+    else:
+        # Later posts shift by one position and the shard count may change
+        last = shard_count(await db.posts.count_documents({"is_published": True}))
+        tags.update(shard_tag(shard) for shard in range(first, last + 1))
+        tags.add(SITEMAP_TAG)
+    feed_cache.invalidate(*tags)
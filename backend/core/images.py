@@ -0,0 +1,272 @@
+import asyncio
+import base64
+import io
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Deque, List, Optional
+
+from PIL import Image, ImageOps
+
+try:
+    import pillow_avif  # noqa: F401  registers the AVIF codec with Pillow
+except ImportError:  # optional dependency
+    pillow_avif = None
+
+from core.config import settings
+from core.uploads import discard
+
+# Variant formats and their Pillow encoders, in order of preference for <picture>
+VARIANT_FORMATS = {"avif": "AVIF", "webp": "WEBP"}
+AVIF_AVAILABLE = "AVIF" in Image.SAVE
+
+# Recent job durations kept for the percentile metrics
+DURATION_WINDOW = 1000
+
+
+class ImageQueueFull(Exception):
+    """Every slot of the image queue is taken"""
+
+
+def variant_widths(width: int, widths: List[int]) -> List[int]:
+    """Configured widths below the original, plus the original capped at the largest"""
+    return sorted({w for w in widths if w < width} | {min(width, max(widths))})
+
+
+def build_variants(
+    source: str,
+    work_dir: str,
+    stem: str,
+    widths: List[int],
+    formats: List[str],
+    quality: int,
+    placeholder_width: int
+) -> Optional[dict]:
+    """Write resized copies of source to work_dir; None for animations.
+
+    Runs in a worker process. Returns the variants map with bare file
+    names in place of URLs.
+    """
+    with Image.open(source) as opened:
+        if getattr(opened, "is_animated", False):
+            return None
+        img = ImageOps.exif_transpose(opened)
+        # Keep transparency; WebP and AVIF both carry an alpha channel
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+        variants = {"width": img.width, "height": img.height}
+        for target in variant_widths(img.width, widths):
+            height = max(1, round(img.height * target / img.width))
+            resized = img if target == img.width else img.resize((target, height), Image.Resampling.LANCZOS)
+            for image_format in formats:
+                name = f"{stem}-{target}w.{image_format}"
+                resized.save(os.path.join(work_dir, name), VARIANT_FORMATS[image_format], quality=quality)
+                variants.setdefault(image_format, []).append({"width": target, "height": height, "file": name})
+
+        height = max(1, round(img.height * placeholder_width / img.width))
+        placeholder = img.resize((placeholder_width, height), Image.Resampling.BILINEAR)
+        buffer = io.BytesIO()
+        placeholder.save(buffer, "WEBP", quality=30)
+        name = f"{stem}-placeholder.webp"
+        with open(os.path.join(work_dir, name), "wb") as f:
+            f.write(buffer.getvalue())
+        variants["placeholder"] = {
+            "file": name,
+            "data_uri": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+        }
+        return variants
+
+
+def variants_name(filename: str) -> str:
+    """Sidecar file holding an upload's variants map"""
+    return f"{os.path.splitext(filename)[0]}.variants.json"
+
+
+def variant_files(variants: dict) -> List[str]:
+    """Names of every file listed in a variants map"""
+    files = [entry["file"] for image_format in VARIANT_FORMATS for entry in variants.get(image_format, [])]
+    if "placeholder" in variants:
+        files.append(variants["placeholder"]["file"])
+    return files
+
+
+def with_urls(variants: dict, prefix: str = "/uploads/") -> dict:
+    """Variants map as served: file names become URLs and each format gets a srcset"""
+    served = {"width": variants["width"], "height": variants["height"], "srcset": {}}
+    for image_format in VARIANT_FORMATS:
+        if image_format in variants:
+            served[image_format] = [
+                {"width": entry["width"], "height": entry["height"], "url": prefix + entry["file"]}
+                for entry in variants[image_format]
+            ]
+            served["srcset"][image_format] = ", ".join(
+                f"{entry['url']} {entry['width']}w" for entry in served[image_format]
+            )
+    if "placeholder" in variants:
+        served["placeholder"] = {
+            "url": prefix + variants["placeholder"]["file"],
+            "data_uri": variants["placeholder"]["data_uri"]
+        }
+    return served
+
+
+def variant_formats() -> List[str]:
+    """Configured variant formats this Pillow build can encode"""
+    return [f for f in settings.IMAGE_VARIANT_FORMATS if f in VARIANT_FORMATS and (f != "avif" or AVIF_AVAILABLE)]
+
+
+def read_variants(filename: str) -> Optional[dict]:
+    """Stored variants map of an upload (file names, not URLs)"""
+    if not filename or filename != os.path.basename(filename):
+        return None
+    try:
+        with open(os.path.join(settings.UPLOAD_DIR, variants_name(filename))) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def remove_variants(filename: str):
+    """Delete an upload's variant files and sidecar"""
+    variants = read_variants(filename)
+    if variants is None:
+        return
+    for name in variant_files(variants):
+        discard(os.path.join(settings.UPLOAD_DIR, name))
+    discard(os.path.join(settings.UPLOAD_DIR, variants_name(filename)))
+
+
+def load_variants(filename: str) -> Optional[dict]:
+    """Served variants map of an upload, or None if it has none"""
+    variants = read_variants(filename)
+    try:
+        return with_urls(variants) if variants else None
+    except KeyError:
+        return None
+
+
+class ImageProcessor:
+    """Process pool for Pillow work with a bounded queue and per-job timeouts.
+
+    A job holds a queue slot until its worker finishes, even after the
+    caller gave up on it, so stuck jobs lead to fast rejections instead of
+    an ever-growing backlog. Callers keep the original file on rejection,
+    timeout or failure.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout_seconds: float):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.durations: Deque[float] = deque(maxlen=DURATION_WINDOW)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs the event loop and driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def start(self):
+        """Create the pool ahead of the first upload"""
+        self._get_executor()
+
+    def shutdown(self):
+        """Stop the workers, dropping queued jobs"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _finished(self):
+        self.pending -= 1
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        # Done callbacks fire on the pool's management thread
+        try:
+            loop.call_soon_threadsafe(self._finished)
+        except RuntimeError:
+            # The loop has closed, so nothing else is touching the counter
+            self._finished()
+
+    async def submit(
+        self,
+        fn: Callable,
+        *args,
+        timeout: Optional[float] = None,
+        on_abandon: Optional[Callable[[], None]] = None
+    ) -> Any:
+        """Run fn(*args) in a worker and return its result.
+
+        Raises ImageQueueFull when the queue is full and asyncio.TimeoutError
+        after `timeout` seconds; on_abandon runs once a timed-out job
+        eventually finishes, to clean up anything it wrote.
+        """
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise ImageQueueFull(f"Image queue is full ({self.max_queue} jobs)")
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(fn, *args)
+        self.pending += 1
+        self.submitted += 1
+        future.add_done_callback(lambda _: self._release(loop))
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if on_abandon is not None:
+                future.add_done_callback(lambda _: on_abandon())
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        self.durations.append(time.perf_counter() - started)
+        return result
+
+    def stats(self) -> dict:
+        """Queue depth and processing-time metrics"""
+        durations = sorted(self.durations)
+
+        def percentile(pct: float) -> float:
+            if not durations:
+                return 0.0
+            return durations[min(len(durations) - 1, int(pct / 100 * len(durations)))]
+
+        return {
+            "workers": self.workers,
+            "queue_depth": self.pending,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "processing_ms": {
+                "mean": sum(durations) / len(durations) * 1000 if durations else 0.0,
+                "p50": percentile(50) * 1000,
+                "p95": percentile(95) * 1000,
+                "max": durations[-1] * 1000 if durations else 0.0
+            }
+        }
+
+
+image_processor = ImageProcessor(
+    workers=settings.IMAGE_WORKERS,
+    max_queue=settings.IMAGE_QUEUE_SIZE,
+    timeout_seconds=settings.IMAGE_TIMEOUT_SECONDS
+)
@@ -0,0 +1,280 @@
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+
+from core import category_counts, tag_stats
+from core.config import settings
+from core.rendering import make_excerpt, rendered_fields
+from core.related import related_index
+from core.search import search_index
+from schemas.blog import CategoryCreate, PostImport, TagCreate
+
+IMPORT_COLLECTIONS = ("categories", "tags", "posts")
+
+# Category lookups shared across the batches of one import
+CategoryCache = Dict[Tuple[str, Any], Optional[Tuple[ObjectId, str]]]
+
+
+class ImportFormatError(ValueError):
+    """The request body is neither NDJSON nor a JSON array"""
+
+
+async def iter_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield raw rows from an NDJSON stream or a JSON array body.
+
+    NDJSON lines are yielded as bytes while the body is still arriving;
+    a JSON array (first non-blank byte is "[") has to be read in full.
+    """
+    buffer = bytearray()
+    is_array = None
+
+    async for chunk in chunks:
+        buffer += chunk
+        if is_array is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            is_array = stripped[:1] == b"["
+        if is_array:
+            continue
+
+        *lines, rest = buffer.split(b"\n")
+        buffer = bytearray(rest)
+        for line in lines:
+            if line.strip():
+                yield bytes(line)
+
+    if is_array:
+        try:
+            rows = json.loads(bytes(buffer))
+        except ValueError as e:
+            raise ImportFormatError(f"Invalid JSON array: {e}")
+        if not isinstance(rows, list):
+            raise ImportFormatError("Expected a JSON array or NDJSON")
+        for row in rows:
+            yield row
+    elif buffer.strip():
+        yield bytes(buffer)
+
+
+async def iter_batches(rows: AsyncIterator[Any], size: int) -> AsyncIterator[List[Any]]:
+    """Group rows into lists of at most `size`"""
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_row(raw: Any, schema) -> BaseModel:
+    """Decode and validate one row; raises ValueError with a compact message"""
+    if isinstance(raw, bytes):
+        try:
+            raw = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+    try:
+        return schema.model_validate(raw)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in e.errors()
+        ))
+
+
+def bulk_errors(error: BulkWriteError) -> Dict[int, str]:
+    """Map operation index to message for the failed writes of a bulk_write"""
+    return {write_error["index"]: write_error["errmsg"] for write_error in error.details.get("writeErrors", [])}
+
+
+async def import_named_batch(
+    collection, schema, offset: int, batch: List[Any], defaults: Optional[dict] = None
+) -> List[dict]:
+    """Upsert categories or tags by name; existing names are left untouched"""
+    results: List[Optional[dict]] = [None] * len(batch)
+    operations, positions, names = [], [], []
+
+    for position, raw in enumerate(batch):
+        try:
+            item = parse_row(raw, schema)
+        except ValueError as e:
+            results[position] = {"row": offset + position, "status": "error", "error": str(e)}
+            continue
+        document = {**item.model_dump(), "created_at": datetime.utcnow(), **(defaults or {})}
+        operations.append(UpdateOne({"name": item.name}, {"$setOnInsert": document}, upsert=True))
+        positions.append(position)
+        names.append(item.name)
+
+    upserted, failed = {}, {}
+    if operations:
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as e:
+            upserted = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+            failed = bulk_errors(e)
+
+    # One lookup for the ids of names that already existed
+    ids = {}
+    existing = [name for index, name in enumerate(names) if index not in upserted]
+    if existing:
+        documents = await collection.find({"name": {"$in": existing}}, {"name": 1}).to_list(length=None)
+        ids = {document["name"]: document["_id"] for document in documents}
+
+    for index, (position, name) in enumerate(zip(positions, names)):
+        row = offset + position
+        if index in upserted:
+            results[position] = {"row": row, "status": "created", "id": str(upserted[index])}
+        elif name in ids:
+            # Includes duplicate-key races between rows with the same name
+            results[position] = {"row": row, "status": "exists", "id": str(ids[name])}
+        else:
+            results[position] = {"row": row, "status": "error", "error": failed.get(index, "Not written")}
+    return results
+
+
+async def resolve_categories(db, items: List[PostImport], cache: CategoryCache):
+    """Fill the cache with every category the batch references in one query"""
+    ids, names = set(), set()
+    for item in items:
+        if item.category_id:
+            if ObjectId.is_valid(item.category_id) and ("id", str(ObjectId(item.category_id))) not in cache:
+                ids.add(ObjectId(item.category_id))
+        elif item.category_name and ("name", item.category_name) not in cache:
+            names.add(item.category_name)
+    if not ids and not names:
+        return
+
+    documents = await db.categories.find(
+        {"$or": [{"_id": {"$in": list(ids)}}, {"name": {"$in": list(names)}}]}, {"name": 1}
+    ).to_list(length=None)
+    for document in documents:
+        cache[("id", str(document["_id"]))] = (document["_id"], document["name"])
+        cache[("name", document["name"])] = (document["_id"], document["name"])
+    for category_id in ids:
+        cache.setdefault(("id", str(category_id)), None)
+    for name in names:
+        cache.setdefault(("name", name), None)
+
+
+def build_post_document(item: PostImport, category: Optional[Tuple[ObjectId, str]]) -> dict:
+    """Post document as create_post would store it, keeping imported dates"""
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "title": item.title,
+        "content": item.content,
+        "summary": item.summary,
+        "excerpt": make_excerpt(item.content),
+        **rendered_fields(item.content),
+        "category_id": category[0] if category else None,
+        "category_name": category[1] if category else None,
+        "tags": item.tags,
+        "featured_image": item.featured_image,
+        "is_published": item.is_published,
+        "created_at": item.created_at or now,
+        "updated_at": item.updated_at or item.created_at or now,
+        "view_count": item.view_count
+    }
+
+
+def category_for(item: PostImport, cache: CategoryCache) -> Optional[Tuple[ObjectId, str]]:
+    """Resolved category for a row; raises ValueError for unknown references"""
+    if item.category_id:
+        if not ObjectId.is_valid(item.category_id):
+            raise ValueError("Invalid category ID")
+        category = cache.get(("id", str(ObjectId(item.category_id))))
+    elif item.category_name:
+        category = cache.get(("name", item.category_name))
+    else:
+        return None
+    if category is None:
+        raise ValueError("Category not found")
+    return category
+
+
+async def import_post_batch(db, offset: int, batch: List[Any], cache: CategoryCache) -> List[dict]:
+    """Validate, render and insert a batch of posts with one unordered bulk_write"""
+    results: List[Optional[dict]] = [None] * len(batch)
+    parsed = []
+    for position, raw in enumerate(batch):
+        try:
+            parsed.append((position, parse_row(raw, PostImport)))
+        except ValueError as e:
+            results[position] = {"row": offset + position, "status": "error", "error": str(e)}
+
+    await resolve_categories(db, [item for _, item in parsed], cache)
+
+    pending = []
+    for position, item in parsed:
+        try:
+            pending.append((position, item, category_for(item, cache)))
+        except ValueError as e:
+            results[position] = {"row": offset + position, "status": "error", "error": str(e)}
+
+    # Markdown rendering is CPU-bound; keep it off the event loop
+    documents = await run_in_threadpool(
+        lambda: [build_post_document(item, category) for _, item, category in pending]
+    )
+
+    failed = {}
+    if documents:
+        try:
+            await db.posts.bulk_write([InsertOne(document) for document in documents], ordered=False)
+        except BulkWriteError as e:
+            failed = bulk_errors(e)
+
+    inserted = []
+    for index, ((position, _, _), document) in enumerate(zip(pending, documents)):
+        row = offset + position
+        if index in failed:
+            results[position] = {"row": row, "status": "error", "error": failed[index]}
+        else:
+            results[position] = {"row": row, "status": "created", "id": str(document["_id"])}
+            inserted.append(document)
+    await tag_stats.apply_posts_created(db, inserted)
+    await category_counts.apply_posts_created(db, inserted)
+    return results
+
+
+async def import_rows(db, collection_name: str, rows: AsyncIterator[Any], batch_size: Optional[int] = None) -> dict:
+    """Import rows into a collection in batches and summarize per-row results"""
+    if collection_name not in IMPORT_COLLECTIONS:
+        raise ValueError(f"Unknown collection: {collection_name}")
+
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    schemas = {"categories": CategoryCreate, "tags": TagCreate}
+    cache: CategoryCache = {}
+    results: List[dict] = []
+
+    async for batch in iter_batches(rows, batch_size):
+        if collection_name == "posts":
+            results += await import_post_batch(db, len(results), batch, cache)
+        else:
+            results += await import_named_batch(
+                db[collection_name], schemas[collection_name], len(results), batch,
+                defaults=category_counts.ZERO_COUNTS if collection_name == "categories" else None
+            )
+
+    statuses = [result["status"] for result in results]
+    if collection_name == "posts" and "created" in statuses:
+        # One background rebuild instead of indexing every row on the event loop
+        search_index.start_rebuild(db, restart=True)
+        related_index.start_rebuild(db, restart=True)
+    return {
+        "collection": collection_name,
+        "total": len(results),
+        "created": statuses.count("created"),
+        "existing": statuses.count("exists"),
+        "failed": statuses.count("error"),
+        "results": results
+    }
@@ -0,0 +1,103 @@
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Every query shape used by the routers, per collection
+INDEXES: Dict[str, List[IndexModel]] = {
+    "posts": [
+        # Admin lists and keyset pagination over all posts
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at"),
+        # Sitemap shards: published posts in _id order
+        IndexModel([("is_published", ASCENDING), ("_id", ASCENDING)], name="published_id"),
+        # Incremental exports (since=)
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+        # Public lists: is_published filter + newest-first sort
+        IndexModel(
+            [("is_published", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="published_created_at"
+        ),
+        # Public lists filtered by tag, category id or category name
+        IndexModel(
+            [("tags", ASCENDING), ("is_published", ASCENDING), ("created_at", DESCENDING)],
+            name="tags_published_created_at"
+        ),
+        IndexModel(
+            [("category_id", ASCENDING), ("is_published", ASCENDING), ("created_at", DESCENDING)],
+            name="category_id_published_created_at"
+        ),
+        IndexModel(
+            [("category_name", ASCENDING), ("is_published", ASCENDING), ("created_at", DESCENDING)],
+            name="category_name_published_created_at"
+        ),
+    ],
+    "categories": [
+        IndexModel([("name", ASCENDING)], name="name_unique", unique=True),
+    ],
+    "tags": [
+        IndexModel([("name", ASCENDING)], name="name_unique", unique=True),
+    ],
+    # /tags/popular: top tags by published post count
+    "tag_stats": [
+        IndexModel([("count", DESCENDING)], name="count_desc"),
+    ],
+    # Content-addressed uploads, released by file name on delete
+    "uploads": [
+        IndexModel([("filename", ASCENDING)], name="filename_unique", unique=True),
+    ],
+}
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create any missing registry indexes; safe to run on every startup.
+
+    Failures (e.g. duplicate names blocking a unique index) are logged and
+    skipped so the API can still start.
+    """
+    created: Dict[str, List[str]] = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        for model in models:
+            try:
+                name = await collection.create_indexes([model])
+                created.setdefault(collection_name, []).extend(name)
+            except OperationFailure as e:
+                logger.error(
+                    "Could not create index %s on %s: %s",
+                    model.document["name"], collection_name, e
+                )
+    return created
+
+
+async def _index_usage(collection) -> Dict[str, int]:
+    """Operations served per index since the server started, if available"""
+    try:
+        stats = await collection.aggregate([{"$indexStats": {}}]).to_list(length=None)
+    except Exception:
+        return {}
+    return {stat["name"]: stat["accesses"]["ops"] for stat in stats}
+
+
+async def index_report(db) -> Dict[str, dict]:
+    """Compare existing indexes with the registry for every collection.
+
+    Reports registry indexes that are missing, indexes not in the
+    registry, and indexes with no recorded use (needs $indexStats).
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        usage = await _index_usage(collection)
+        expected = [model.document["name"] for model in models]
+
+        report[collection_name] = {
+            "missing": [name for name in expected if name not in existing],
+            "unregistered": sorted(name for name in existing if name != "_id_" and name not in expected),
+            "unused": sorted(name for name, ops in usage.items() if ops == 0 and name != "_id_"),
+            "usage": usage
+        }
+    return report
@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+# Newest first, with _id as a tie-breaker so keyset pages are stable
+POST_SORT = [("created_at", -1), ("_id", -1)]
+
+NEXT = "next"
+PREV = "prev"
+
+
+def encode_cursor(doc: dict, direction: str) -> str:
+    """Encode an opaque cursor pointing just past the given document"""
+    payload = {
+        "c": doc["created_at"].isoformat(),
+        "i": str(doc["_id"]),
+        "d": direction
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId, str]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["c"])
+        doc_id = ObjectId(payload["i"])
+        direction = payload["d"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if direction not in (NEXT, PREV):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return created_at, doc_id, direction
+
+
+def keyset_filter(created_at: datetime, doc_id: ObjectId, direction: str) -> dict:
+    """Build the filter selecting documents after (next) or before (prev) a cursor"""
+    op = "$lt" if direction == NEXT else "$gt"
+    return {
+        "$or": [
+            {"created_at": {op: created_at}},
+            {"created_at": created_at, "_id": {op: doc_id}}
+        ]
+    }
+
+
+def merge_filters(query: dict, extra: dict) -> dict:
+    """Combine two filters without clobbering top-level operators such as $or"""
+    if not query:
+        return extra
+    return {"$and": [query, extra]}
+
+
+def _skip_page(docs: List[dict], size: int, skip: int) -> Tuple[List[dict], Optional[str], Optional[str]]:
+    """Trim a size + 1 fetch to the page and derive its cursors"""
+    has_more = len(docs) > size
+    docs = docs[:size]
+    next_cursor = encode_cursor(docs[-1], NEXT) if docs and has_more else None
+    prev_cursor = encode_cursor(docs[0], PREV) if docs and skip > 0 else None
+    return docs, next_cursor, prev_cursor
+
+
+async def fetch_keyset_page(
+    collection,
+    query: dict,
+    size: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    projection: Optional[dict] = None
+) -> Tuple[List[dict], Optional[str], Optional[str]]:
+    """Fetch one page of documents newest first.
+
+    Uses keyset pagination when a cursor is given and falls back to skip
+    otherwise. Returns the documents along with next and previous cursors.
+    """
+    if cursor is None:
+        docs = await collection.find(query, projection).sort(POST_SORT).skip(skip).limit(size + 1).to_list(length=size + 1)
+        return _skip_page(docs, size, skip)
+
+    created_at, doc_id, direction = decode_cursor(cursor)
+    page_query = merge_filters(query, keyset_filter(created_at, doc_id, direction))
+
+    if direction == NEXT:
+        docs = await collection.find(page_query, projection).sort(POST_SORT).limit(size + 1).to_list(length=size + 1)
+        has_more = len(docs) > size
+        docs = docs[:size]
+        next_cursor = encode_cursor(docs[-1], NEXT) if docs and has_more else None
+        prev_cursor = encode_cursor(docs[0], PREV) if docs else None
+        return docs, next_cursor, prev_cursor
+
+    # Walk backwards in ascending order, then restore newest-first order
+    reverse_sort = [(field, -order) for field, order in POST_SORT]
+    docs = await collection.find(page_query, projection).sort(reverse_sort).limit(size + 1).to_list(length=size + 1)
+    has_more = len(docs) > size
+    docs = list(reversed(docs[:size]))
+    next_cursor = encode_cursor(docs[-1], NEXT) if docs else None
+    prev_cursor = encode_cursor(docs[0], PREV) if docs and has_more else None
+    return docs, next_cursor, prev_cursor
+
+
+async def fetch_facet_page(
+    collection,
+    query: dict,
+    size: int,
+    skip: int = 0,
+    projection: Optional[dict] = None
+) -> Tuple[List[dict], int, Optional[str], Optional[str]]:
+    """Fetch a skip-based page and the exact match count in one round trip.
+
+    The $match and $sort run before $facet so they can still use an index.
+    Returns the documents, the total, and next and previous cursors.
+    """
+    items_pipeline = [{"$skip": skip}, {"$limit": size + 1}]
+    if projection:
+        items_pipeline.append({"$project": projection})
+
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(POST_SORT)},
+        {"$facet": {"items": items_pipeline, "total": [{"$count": "count"}]}}
+    ]
+    result = await collection.aggregate(pipeline).to_list(length=1)
+    facet = result[0] if result else {"items": [], "total": []}
+    total = facet["total"][0]["count"] if facet["total"] else 0
+
+    docs, next_cursor, prev_cursor = _skip_page(facet["items"], size, skip)
+    return docs, total, next_cursor, prev_cursor
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from core.view_counter import view_counter
+
+# Fields returned by list endpoints; the card view omits the markdown body
+CARD_FIELDS = (
+    "id", "title", "summary", "excerpt", "category_id", "category", "tags",
+    "featured_image", "is_published", "created_at", "views"
+)
+FULL_FIELDS = CARD_FIELDS + ("content",)
+
+# List response field -> post document field
+FIELD_SOURCES = {"id": "_id", "category": "category_id", "views": "view_count"}
+
+
+def serialize_category(category_doc: dict) -> dict:
+    """Build the category summary embedded in post responses"""
+    return {
+        "id": str(category_doc["_id"]),
+        "name": category_doc["name"],
+        "description": category_doc.get("description")
+    }
+
+
+def post_list_fields(post: dict, category: Optional[dict]) -> dict:
+    """List response fields for a post document"""
+    return {
+        "id": str(post["_id"]),
+        "title": post["title"],
+        "summary": post.get("summary"),
+        "excerpt": post.get("excerpt"),
+        "content": post.get("content"),
+        "category_id": str(post["category_id"]) if post.get("category_id") else None,
+        "category": category,
+        "tags": post.get("tags", []),
+        "featured_image": post.get("featured_image"),
+        "is_published": post["is_published"],
+        "created_at": post["created_at"],
+        "views": post.get("view_count", 0) + view_counter.unflushed(post["_id"])
+    }
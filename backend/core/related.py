@@ -0,0 +1,297 @@
+import asyncio
+import heapq
+import logging
+import math
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import settings
+from core.search import FIELD_WEIGHTS, REBUILD_BATCH_SIZE, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Tags are whole terms ("#" never appears in tokenizer output) and count
+# more than any single word of the text
+TAG_PREFIX = "#"
+TAG_WEIGHT = 4.0
+
+# Terms are never treated as stop words below this document frequency
+MIN_STOP_DF = 20
+
+PROJECTION = {**{field: 1 for field in FIELD_WEIGHTS}, "tags": 1, "is_published": 1}
+
+Vector = Dict[str, float]
+Neighbors = List[Tuple[str, float]]
+PostTerms = Tuple[str, Counter]
+
+
+def post_terms(post: dict) -> Counter:
+    """Field-weighted term frequencies of a post's text and tags"""
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for term in tokenize(post.get(field)):
+            terms[term] += weight
+    for tag in post.get("tags") or []:
+        terms[TAG_PREFIX + tag.lower()] += TAG_WEIGHT
+    return terms
+
+
+def batch_terms(posts: List[dict]) -> List[PostTerms]:
+    """(post_id, terms) pairs for a batch of posts"""
+    return [(str(post["_id"]), post_terms(post)) for post in posts]
+
+
+def _rank(item: Tuple[str, float]):
+    # Best score first; ties broken by id so results are stable
+    return item[1], item[0]
+
+
+class RelatedIndex:
+    """Precomputed most similar published posts, looked up in O(1).
+
+    Posts are unit-length sparse TF-IDF vectors (sublinear tf, smoothed
+    idf) over the search tokenizer's terms plus their tags, each trimmed
+    to its `max_terms` heaviest terms so a similarity pass only walks a
+    few posting lists. Words found in more than `max_df` of the posts are
+    left out, and a pass reads at most `max_postings` (the newest) posts
+    per term, which keeps a rebuild linear in the number of posts. Writes
+    update the changed post's neighbors and
+    those of the posts it enters or leaves; idf values are refreshed by
+    rebuild() (on startup).
+    """
+
+    STATE = ("terms", "df", "vectors", "postings", "neighbors", "referrers")
+
+    def __init__(self, k: int = 10, max_terms: int = 64, max_df: float = 0.05, max_postings: int = 256):
+        self.k = k
+        self.max_terms = max_terms
+        self.max_df = max_df
+        self.max_postings = max_postings
+        self.ready = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[List[Tuple[str, Optional[dict]]]] = None
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def __contains__(self, post_id) -> bool:
+        return str(post_id) in self.vectors
+
+    def clear(self):
+        """Drop every indexed post"""
+        self.terms: Dict[str, Counter] = {}
+        self.df: Counter = Counter()
+        self.vectors: Dict[str, Vector] = {}
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.neighbors: Dict[str, Neighbors] = {}
+        # post -> posts whose neighbor list contains it
+        self.referrers: Dict[str, Set[str]] = defaultdict(set)
+
+    def related(self, post_id, limit: Optional[int] = None) -> Neighbors:
+        """(post_id, similarity) pairs for the most similar posts, best first"""
+        return self.neighbors.get(str(post_id), [])[:limit]
+
+    def index_post(self, post: dict):
+        """Add or replace a post; unpublished posts are removed instead"""
+        self._write(str(post["_id"]), post if post.get("is_published", False) else None)
+
+    def remove_post(self, post_id):
+        """Remove a post and repair the lists that referenced it"""
+        self._write(str(post_id), None)
+
+    async def rebuild(self, db):
+        """Recompute every vector and neighbor list from the published posts.
+
+        Posts are read in batches and reduced to their term counts in a
+        worker thread, so their text is never held all at once; the build
+        then runs in a worker thread on fresh structures. Writes made
+        meanwhile are applied to the live index and replayed after the
+        swap. Concurrent calls run one after the other.
+        """
+        async with self._lock:
+            self._pending = []
+            try:
+                terms: List[PostTerms] = []
+                batch = []
+                cursor = db.posts.find({"is_published": True}, PROJECTION, batch_size=REBUILD_BATCH_SIZE)
+                async for post in cursor.sort("_id", 1):
+                    batch.append(post)
+                    if len(batch) >= REBUILD_BATCH_SIZE:
+                        terms += await asyncio.to_thread(batch_terms, batch)
+                        batch = []
+                terms += await asyncio.to_thread(batch_terms, batch)
+                fresh = await asyncio.to_thread(self._build_terms, terms)
+                for name in self.STATE:
+                    setattr(self, name, getattr(fresh, name))
+                for doc_id, post in self._pending:
+                    self._apply(doc_id, post)
+            finally:
+                self._pending = None
+            self.ready = True
+
+    def start_rebuild(self, db, restart: bool = False) -> asyncio.Task:
+        """Rebuild in a background task unless one is already running.
+
+        With `restart`, a build that is already running (and may have read
+        the posts before the caller's writes) is followed by a fresh one.
+        """
+        running = self._task
+        if running is None or running.done():
+            self._task = asyncio.create_task(self._rebuild_logged(db))
+        elif restart:
+            self._task = asyncio.create_task(self._rebuild_after(running, db))
+        return self._task
+
+    async def _rebuild_after(self, running: asyncio.Task, db):
+        try:
+            await asyncio.wait([running])
+        except asyncio.CancelledError:
+            running.cancel()
+            raise
+        await self._rebuild_logged(db)
+
+    async def _rebuild_logged(self, db):
+        try:
+            await self.rebuild(db)
+        except Exception:
+            logger.exception("Failed to build the related posts index")
+
+    async def ensure_ready(self, db) -> bool:
+        """Start a background build on first use; True once lookups are served"""
+        if not self.ready and not self._lock.locked():
+            self.start_rebuild(db)
+        return self.ready
+
+    async def wait(self):
+        """Wait for a background build in progress, if any"""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def stop(self):
+        """Cancel a background build still in progress"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _build(self, posts: Iterable[dict]) -> "RelatedIndex":
+        return self._build_terms((str(post["_id"]), post_terms(post)) for post in posts)
+
+    def _build_terms(self, terms: Iterable[PostTerms]) -> "RelatedIndex":
+        fresh = RelatedIndex(self.k, self.max_terms, self.max_df, self.max_postings)
+        for doc_id, counts in terms:
+            fresh._add_terms(doc_id, counts)
+        # idf is final once every post is counted
+        for doc_id, terms in fresh.terms.items():
+            fresh._add_vector(doc_id, fresh._vectorize(terms))
+        for doc_id, vector in fresh.vectors.items():
+            fresh._set_neighbors(doc_id, fresh._top(fresh._scores(doc_id, vector)))
+        return fresh
+
+    def _write(self, doc_id: str, post: Optional[dict]):
+        if self._pending is not None:
+            self._pending.append((doc_id, post))
+        self._apply(doc_id, post)
+
+    def _apply(self, doc_id: str, post: Optional[dict]):
+        stale = self._drop(doc_id)
+        if post is not None:
+            self._add_terms(doc_id, post_terms(post))
+            vector = self._vectorize(self.terms[doc_id])
+            self._add_vector(doc_id, vector)
+            scores = self._scores(doc_id, vector)
+            self._set_neighbors(doc_id, self._top(scores))
+            # Similarity is symmetric: offer the post to everyone it scored against
+            for other, score in scores.items():
+                if other not in stale:
+                    self._offer(other, doc_id, score)
+        # Lists that held the old version are recomputed in full
+        for other in stale:
+            if other in self.vectors:
+                self._set_neighbors(other, self._top(self._scores(other, self.vectors[other])))
+
+    def _idf(self, term: str) -> float:
+        # The +1 keeps terms shared by every post (or a post indexed alone) above zero
+        return math.log((1 + len(self.terms)) / (1 + self.df[term])) + 1
+
+    def _is_stop_term(self, term: str) -> bool:
+        # Words in a large share of posts say little and make every post a candidate
+        return (
+            not term.startswith(TAG_PREFIX)
+            and self.df[term] > MIN_STOP_DF
+            and self.df[term] > self.max_df * len(self.terms)
+        )
+
+    def _vectorize(self, terms: Counter) -> Vector:
+        weighted = (
+            (term, (1 + math.log(tf)) * self._idf(term)) for term, tf in terms.items() if not self._is_stop_term(term)
+        )
+        top = heapq.nlargest(self.max_terms, ((w, term) for term, w in weighted))
+        norm = math.sqrt(sum(w * w for w, _ in top))
+        return {term: w / norm for w, term in top} if norm else {}
+
+    def _scores(self, doc_id: str, vector: Vector) -> Dict[str, float]:
+        """Cosine similarity to every post sharing a term (a sparse matrix-vector product)"""
+        scores: Dict[str, float] = defaultdict(float)
+        for term, weight in vector.items():
+            postings = self.postings.get(term, {})
+            # Popular tags: only the most recently indexed posts are candidates
+            for other, other_weight in islice(reversed(postings.items()), self.max_postings):
+                scores[other] += weight * other_weight
+        scores.pop(doc_id, None)
+        return scores
+
+    def _top(self, scores: Dict[str, float]) -> Neighbors:
+        return heapq.nlargest(self.k, scores.items(), key=_rank)
+
+    def _set_neighbors(self, doc_id: str, neighbors: Neighbors):
+        for other, _ in self.neighbors.get(doc_id, ()):
+            if other in self.referrers:
+                self.referrers[other].discard(doc_id)
+        self.neighbors[doc_id] = neighbors
+        for other, _ in neighbors:
+            self.referrers[other].add(doc_id)
+
+    def _offer(self, doc_id: str, other: str, score: float):
+        """Insert `other` into doc_id's list if it beats the current last entry"""
+        neighbors = self.neighbors[doc_id]
+        if len(neighbors) >= self.k and _rank((other, score)) <= _rank(neighbors[-1]):
+            return
+        self._set_neighbors(doc_id, sorted(neighbors + [(other, score)], key=_rank, reverse=True)[:self.k])
+
+    def _add_terms(self, doc_id: str, terms: Counter):
+        self.terms[doc_id] = terms
+        self.df.update(terms.keys())
+
+    def _add_vector(self, doc_id: str, vector: Vector):
+        self.vectors[doc_id] = vector
+        for term, weight in vector.items():
+            self.postings[term][doc_id] = weight
+
+    def _drop(self, doc_id: str) -> Set[str]:
+        """Forget a post; returns the posts whose lists referenced it"""
+        terms = self.terms.pop(doc_id, None)
+        if terms is None:
+            return set()
+
+        for term in terms:
+            self.df[term] -= 1
+            if self.df[term] <= 0:
+                del self.df[term]
+        for term in self.vectors.pop(doc_id):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+        self._set_neighbors(doc_id, [])
+        del self.neighbors[doc_id]
+        return self.referrers.pop(doc_id, set())
+
+
+related_index = RelatedIndex(k=settings.RELATED_POSTS_K)
@@ -0,0 +1,158 @@
+import hashlib
+import html
+import re
+import threading
+import xml.etree.ElementTree as etree
+from typing import Optional
+from urllib.parse import urlparse
+
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+from core.images import load_variants
+
+EXCERPT_LENGTH = 200
+
+# Bump when rendering output changes so stored HTML is regenerated
+RENDERER_VERSION = "3"
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "sane_lists"]
+SAFE_URL_SCHEMES = {"", "http", "https", "mailto"}
+UPLOADS_PATH = "/uploads/"
+# Browsers ignore these anywhere in a URL, so "java\tscript:" is still javascript:
+_IGNORED_URL_CHARS = re.compile(r"[\x00-\x20\x7f]")
+
+# Markdown syntax stripped when building plain-text excerpts
+_MARKDOWN_PATTERNS = [
+    (re.compile(r"```.*?```", re.DOTALL), " "),  # fenced code blocks
+    (re.compile(r"^#{1,6}\s+", re.MULTILINE), ""),  # headers
+    (re.compile(r"\*\*(.*?)\*\*"), r"\1"),  # bold
+    (re.compile(r"\*(.*?)\*"), r"\1"),  # italic
+    (re.compile(r"`(.*?)`"), r"\1"),  # inline code
+    (re.compile(r"!\[([^\]]*)\]\([^)]+\)"), ""),  # images (before links)
+    (re.compile(r"\[([^\]]+)\]\([^)]+\)"), r"\1"),  # links
+    (re.compile(r"^\s*>\s?", re.MULTILINE), ""),  # blockquotes
+]
+
+
+def make_excerpt(content: str, max_length: int = EXCERPT_LENGTH) -> str:
+    """Build a plain-text excerpt of markdown content for list views"""
+    text = content or ""
+    for pattern, replacement in _MARKDOWN_PATTERNS:
+        text = pattern.sub(replacement, text)
+    text = " ".join(text.split())
+
+    if len(text) <= max_length:
+        return text
+    return text[:max_length] + "..."
+
+
+def url_scheme(url: str) -> str:
+    """Scheme of a URL as a browser reads it: entities decoded, whitespace and controls dropped"""
+    return urlparse(_IGNORED_URL_CHARS.sub("", html.unescape(url))).scheme.lower()
+
+
+class _SafeUrlTreeprocessor(Treeprocessor):
+    """Drop link and image URLs with schemes such as javascript:"""
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ("href", "src"):
+                url = element.get(attribute)
+                if url is None:
+                    continue
+                if url_scheme(url) not in SAFE_URL_SCHEMES:
+                    del element.attrib[attribute]
+
+
+class SanitizeExtension(Extension):
+    """Escape raw HTML in markdown source and strip unsafe URLs"""
+
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        md.treeprocessors.register(_SafeUrlTreeprocessor(md), "safe_urls", 0)
+
+
+class _ResponsiveImageTreeprocessor(Treeprocessor):
+    """Give uploaded images a srcset of their variants, wrapped in <picture> when AVIF exists"""
+
+    def run(self, root):
+        parents = {child: parent for parent in root.iter() for child in parent}
+        for image in list(root.iter("img")):
+            url = urlparse(image.get("src") or "")
+            if url.scheme or url.netloc or not url.path.startswith(UPLOADS_PATH):
+                continue
+            variants = load_variants(url.path[len(UPLOADS_PATH):])
+            if not variants or "webp" not in variants["srcset"]:
+                continue
+
+            sizes = f"(max-width: {variants['webp'][-1]['width']}px) 100vw, {variants['webp'][-1]['width']}px"
+            image.set("srcset", variants["srcset"]["webp"])
+            image.set("sizes", sizes)
+            image.set("width", str(variants["width"]))
+            image.set("height", str(variants["height"]))
+            image.set("loading", "lazy")
+            image.set("decoding", "async")
+
+            parent = parents.get(image)
+            if "avif" not in variants["srcset"] or parent is None:
+                continue
+            picture = etree.Element("picture")
+            etree.SubElement(picture, "source", {"type": "image/avif", "srcset": variants["srcset"]["avif"], "sizes": sizes})
+            picture.tail, image.tail = image.tail, None
+            parent.insert(list(parent).index(image), picture)
+            parent.remove(image)
+            picture.append(image)
+
+
+class ResponsiveImageExtension(Extension):
+    """Emit srcset for images uploaded with responsive variants"""
+
+    def extendMarkdown(self, md):
+        md.treeprocessors.register(_ResponsiveImageTreeprocessor(md), "responsive_images", 1)
+
+
+# Markdown instances keep per-document state, so each thread gets its own
+_local = threading.local()
+
+
+def _markdown() -> markdown.Markdown:
+    md = getattr(_local, "markdown", None)
+    if md is None:
+        md = _local.markdown = markdown.Markdown(
+            extensions=MARKDOWN_EXTENSIONS + [SanitizeExtension(), ResponsiveImageExtension()]
+        )
+    return md
+
+
+def content_hash(content: str) -> str:
+    """Hash of markdown content and renderer version, used to skip re-renders"""
+    return hashlib.sha256(f"{RENDERER_VERSION}:{content}".encode("utf-8")).hexdigest()
+
+
+def render_markdown(content: str) -> str:
+    """Render markdown to sanitized HTML"""
+    md = _markdown()
+    md.reset()
+    return md.convert(content or "")
+
+
+def rendered_fields(content: str, current_hash: Optional[str] = None) -> dict:
+    """Stored HTML fields for content, or {} if the stored render is current"""
+    new_hash = content_hash(content)
+    if new_hash == current_hash:
+        return {}
+    return {"content_html": render_markdown(content), "content_hash": new_hash}
+
+
+async def rerender_stale_posts(db) -> int:
+    """Re-render stored HTML made by an older renderer version; returns the number updated"""
+    updated = 0
+    async for post in db.posts.find({}, {"content": 1, "content_hash": 1}):
+        fields = rendered_fields(post.get("content") or "", post.get("content_hash"))
+        if fields:
+            await db.posts.update_one({"_id": post["_id"]}, {"$set": fields})
+            updated += 1
+    return updated
@@ -0,0 +1,353 @@
+import asyncio
+import bisect
+import html
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Hangul syllables/jamo, kana and CJK ideographs are indexed as character bigrams
+CJK_RANGES = "\u1100-\u11ff\u3130-\u318f\uac00-\ud7a3\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff"
+TOKEN_RE = re.compile(f"([{CJK_RANGES}]+)|([^\\W{CJK_RANGES}]+)")
+
+# Field weights used when combining term frequencies (a simplified BM25F)
+FIELD_WEIGHTS = {"title": 3.0, "summary": 2.0, "content": 1.0}
+
+SNIPPET_RADIUS = 60
+
+# Posts tokenized per worker-thread hop during a rebuild
+REBUILD_BATCH_SIZE = 500
+
+# Seconds before a failed build is retried on demand; searches use a plain filter meanwhile
+REBUILD_RETRY_SECONDS = 30
+
+PROJECTION = {**{field: 1 for field in FIELD_WEIGHTS}, "is_published": 1}
+
+logger = logging.getLogger(__name__)
+
+
+def regex_query(text: str) -> dict:
+    """Case-insensitive substring filter over the indexed fields, used while the index is unavailable"""
+    pattern = {"$regex": re.escape(text), "$options": "i"}
+    return {"$or": [{field: pattern} for field in FIELD_WEIGHTS]}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into index terms.
+
+    Latin/number runs become lowercase word tokens, CJK runs become
+    overlapping character bigrams (a lone character is kept as-is).
+    """
+    if not text:
+        return []
+
+    tokens = []
+    for cjk, word in TOKEN_RE.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def _query_terms(query: str) -> Tuple[List[str], Optional[str]]:
+    """Tokenize a query, returning full terms and an optional trailing prefix.
+
+    The last word of the query is treated as a prefix so results keep
+    up while the user is still typing.
+    """
+    runs = TOKEN_RE.findall(query.lower())
+    if not runs:
+        return [], None
+
+    terms = tokenize(query)
+    cjk, word = runs[-1]
+    prefix = word or (cjk if len(cjk) == 1 else None)
+    if prefix:
+        terms.pop()
+    return terms, prefix
+
+
+class SearchIndex:
+    """In-memory inverted index over published posts with BM25 ranking.
+
+    Only term statistics are kept; highlight text is read from the posts
+    of the requested page.
+    """
+
+    STATE = ("postings", "doc_terms", "doc_lengths", "total_length", "_vocabulary")
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ready = False
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self._vocabulary: Optional[List[str]] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[List[Tuple[str, Optional[dict]]]] = None
+        self._failed_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def clear(self):
+        """Drop every indexed document"""
+        self.postings.clear()
+        self.doc_terms.clear()
+        self.doc_lengths.clear()
+        self.total_length = 0.0
+        self._vocabulary = None
+
+    def index_post(self, post: dict):
+        """Add or replace a post; unpublished posts are removed instead"""
+        self._write(str(post["_id"]), post if post.get("is_published", False) else None)
+
+    def remove_post(self, post_id):
+        """Remove a post from the index if present"""
+        self._write(str(post_id), None)
+
+    def index_posts(self, posts: Iterable[dict]):
+        """Index a batch of posts (safe to run in a worker thread on an unshared index)"""
+        for post in posts:
+            self.index_post(post)
+
+    def _write(self, doc_id: str, post: Optional[dict]):
+        # Replayed onto the fresh index once a running rebuild swaps it in
+        if self._pending is not None:
+            self._pending.append((doc_id, post))
+        self._remove(doc_id)
+        if post is not None:
+            self._add(doc_id, post)
+
+    def _add(self, doc_id: str, post: dict):
+        weighted = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(post.get(field)):
+                weighted[term] += weight
+
+        for term, freq in weighted.items():
+            self.postings[term][doc_id] = freq
+
+        length = sum(weighted.values())
+        self.doc_terms[doc_id] = dict(weighted)
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        self._vocabulary = None
+
+    def _remove(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self._vocabulary = None
+
+    async def rebuild(self, db):
+        """Rebuild the index from every published post in the database.
+
+        Batches are tokenized in a worker thread into a fresh index that is
+        swapped in at the end; writes made meanwhile are applied to the live
+        index and replayed after the swap. Concurrent calls run one after
+        the other.
+        """
+        async with self._lock:
+            fresh = SearchIndex(self.k1, self.b)
+            self._pending = []
+            try:
+                batch = []
+                async for post in db.posts.find({"is_published": True}, PROJECTION, batch_size=REBUILD_BATCH_SIZE):
+                    batch.append(post)
+                    if len(batch) >= REBUILD_BATCH_SIZE:
+                        await asyncio.to_thread(fresh.index_posts, batch)
+                        batch = []
+                await asyncio.to_thread(fresh.index_posts, batch)
+                for name in self.STATE:
+                    setattr(self, name, getattr(fresh, name))
+                for doc_id, post in self._pending:
+                    self._remove(doc_id)
+                    if post is not None:
+                        self._add(doc_id, post)
+            finally:
+                self._pending = None
+            self.ready = True
+
+    def start_rebuild(self, db, restart: bool = False) -> asyncio.Task:
+        """Rebuild in a background task unless one is already running.
+
+        With `restart`, a build that is already running (and may have read
+        the posts before the caller's writes) is followed by a fresh one.
+        """
+        running = self._task
+        if running is None or running.done():
+            self._task = asyncio.create_task(self._rebuild_logged(db))
+        elif restart:
+            self._task = asyncio.create_task(self._rebuild_after(running, db))
+        return self._task
+
+    async def _rebuild_after(self, running: asyncio.Task, db):
+        try:
+            await asyncio.wait([running])
+        except asyncio.CancelledError:
+            running.cancel()
+            raise
+        await self._rebuild_logged(db)
+
+    async def _rebuild_logged(self, db):
+        try:
+            await self.rebuild(db)
+        except Exception:
+            self._failed_at = time.monotonic()
+            logger.exception("Failed to build the search index")
+        else:
+            self._failed_at = None
+
+    async def ensure_ready(self, db) -> bool:
+        """Wait for the index, starting a build on first use; True once it can be searched.
+
+        Requests share one build. After a failed build, False is returned
+        without another attempt until REBUILD_RETRY_SECONDS have passed.
+        """
+        if self.ready:
+            return True
+        if self._failed_at is not None and time.monotonic() - self._failed_at < REBUILD_RETRY_SECONDS:
+            return False
+        await asyncio.shield(self.start_rebuild(db))
+        return self.ready
+
+    async def stop(self):
+        """Cancel a background build still in progress"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_terms) - df + 0.5) / (df + 0.5))
+
+    def _term_scores(self, terms: Iterable[str]) -> Dict[str, float]:
+        avg_length = self.total_length / len(self.doc_terms) if self.doc_terms else 0.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, freq in postings.items():
+                norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+        return scores
+
+    def search(self, query: str) -> List[Tuple[str, float]]:
+        """Return (post_id, score) pairs matching every query term, best first"""
+        terms, prefix = _query_terms(query)
+        terms = list(dict.fromkeys(terms))
+        if not terms and not prefix:
+            return []
+
+        candidates: Optional[set] = None
+        for term in terms:
+            docs = set(self.postings.get(term, ()))
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return []
+
+        scores = self._term_scores(terms)
+        if prefix:
+            expansions = self._expand_prefix(prefix)
+            prefix_docs = set()
+            for term in expansions:
+                prefix_docs.update(self.postings[term])
+            candidates = prefix_docs if candidates is None else candidates & prefix_docs
+            # Prefix expansions contribute their best single-term score
+            best: Dict[str, float] = defaultdict(float)
+            for term in expansions:
+                for doc_id, score in self._term_scores([term]).items():
+                    best[doc_id] = max(best[doc_id], score)
+            for doc_id, score in best.items():
+                scores[doc_id] += score
+
+        return sorted(
+            ((doc_id, scores[doc_id]) for doc_id in candidates),
+            key=lambda item: (-item[1], item[0])
+        )
+
+
+
+def highlight(post: dict, query: str) -> Dict[str, str]:
+    """Build HTML-escaped title and snippet with <mark>-wrapped matches"""
+    doc = {field: post.get(field) or "" for field in FIELD_WEIGHTS}
+    needles = _highlight_needles(query)
+    snippet = ""
+    for field in ("summary", "content"):
+        text = " ".join(doc[field].split())
+        match = _find_first(text, needles)
+        if match is not None:
+            start = max(0, match - SNIPPET_RADIUS)
+            end = min(len(text), match + SNIPPET_RADIUS)
+            snippet = _mark(text[start:end], needles)
+            if start > 0:
+                snippet = "…" + snippet
+            if end < len(text):
+                snippet += "…"
+            break
+    if not snippet:
+        text = " ".join((doc["summary"] or doc["content"]).split())
+        snippet = html.escape(text[:SNIPPET_RADIUS * 2])
+
+    return {"title": _mark(doc["title"], needles), "snippet": snippet}
+
+
+def _highlight_needles(query: str) -> List[str]:
+    """Words from the query to highlight, longest first"""
+    needles = {word for word in query.lower().split() if word}
+    return sorted(needles, key=len, reverse=True)
+
+
+def _find_first(text: str, needles: List[str]) -> Optional[int]:
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(needle) for needle in needles) if pos >= 0]
+    return min(positions) if positions else None
+
+
+def _mark(text: str, needles: List[str]) -> str:
+    if not needles:
+        return html.escape(text)
+
+    pattern = re.compile("|".join(re.escape(needle) for needle in needles), re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        last = match.end()
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
+
+
+search_index = SearchIndex()
@@ -0,0 +1,35 @@
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Non-string dict keys (ints, datetimes) are stringified as json.dumps would
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Convert the types orjson does not serialize natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize models, Mongo documents and plain data straight to JSON bytes.
+
+    datetimes are written natively in ISO 8601 and ObjectIds as strings.
+    """
+    return orjson.dumps(payload, default=_default, option=OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """Default API response class, rendering content with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
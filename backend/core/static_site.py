@@ -0,0 +1,297 @@
+import asyncio
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from core.pagination import POST_SORT
+from core.post_fields import CARD_FIELDS, post_list_fields, serialize_category
+from core.serialization import dumps
+
+# Bump when the page layout changes so the next run rewrites everything
+RENDER_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Posts and pages handed to each worker process per task
+CHUNK_SIZE = 500
+FETCH_BATCH_SIZE = 1000
+
+LIST_PROJECTION = {field: 1 for field in CARD_FIELDS if field not in ("id", "category", "views")}
+LIST_PROJECTION.update(updated_at=1, view_count=1)
+
+# (output paths without extension, "post" or "list", JSON payload)
+Job = Tuple[List[str], str, dict]
+
+
+def post_fingerprint(post: dict, category: Optional[dict]) -> str:
+    """Changes whenever the post or anything embedded in its pages changes.
+
+    View counts are left out: they are snapshotted when a page is rendered
+    and would otherwise make every page dirty on every run.
+    """
+    parts = [post["updated_at"].isoformat(), ",".join(post.get("tags") or [])]
+    if category:
+        parts += [category["name"], category.get("description") or ""]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def post_path(post_id: str) -> str:
+    return f"posts/{post_id}"
+
+
+def list_paths(section: str, page: int) -> List[str]:
+    paths = [f"{section}/{page}"]
+    if section == "page" and page == 1:
+        paths.append("index")
+    return paths
+
+
+def split_page_key(key: str) -> Tuple[str, int]:
+    section, page = key.rsplit("/", 1)
+    return section, int(page)
+
+
+def list_sections(posts: List[dict], categories: Dict) -> Dict[str, List[dict]]:
+    """Posts (newest first) behind the index, every category and every tag"""
+    sections: Dict[str, List[dict]] = {"page": posts}
+    sections.update({f"category/{category_id}": [] for category_id in categories})
+    for post in posts:
+        if post.get("category_id") in categories:
+            sections[f"category/{post['category_id']}"].append(post)
+        for name in post.get("tags") or []:
+            sections.setdefault(f"tag/{quote(name, safe='')}", []).append(post)
+    return sections
+
+
+def page_jobs(
+    section: str,
+    posts: List[dict],
+    fingerprints: Dict[str, str],
+    categories: Dict,
+    size: int,
+    previous: Dict[str, str]
+) -> Iterable[Tuple[str, str, Optional[Job]]]:
+    """(manifest key, signature, job) for each page of a listing; job is None when unchanged"""
+    total = len(posts)
+    pages = max(1, (total + size - 1) // size)
+    for page in range(1, pages + 1):
+        key = f"{section}/{page}"
+        page_posts = posts[(page - 1) * size:page * size]
+        signature = hashlib.sha1(
+            json.dumps([size, total, [fingerprints[str(post["_id"])] for post in page_posts]]).encode("utf-8")
+        ).hexdigest()
+        if previous.get(key) == signature:
+            yield key, signature, None
+            continue
+
+        # Same shape as /api/v1/posts/public
+        payload = {
+            "items": [
+                {name: value for name, value in post_list_fields(post, categories.get(post.get("category_id"))).items()
+                 if name in CARD_FIELDS}
+                for post in page_posts
+            ],
+            "total": total,
+            "total_exact": True,
+            "page": page,
+            "size": size,
+            "pages": pages,
+            "next_cursor": None,
+            "prev_cursor": None
+        }
+        yield key, signature, (list_paths(section, page), "list", payload)
+
+
+# Directories already created by this process
+_made_dirs = set()
+
+
+def _write(out_dir: str, path: str, body: bytes):
+    # Written beside the target and renamed so readers never see a partial file
+    target = os.path.join(out_dir, path)
+    directory = os.path.dirname(target)
+    if directory not in _made_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _made_dirs.add(directory)
+    temp = f"{target}.tmp"
+    with open(temp, "wb") as f:
+        f.write(body)
+    os.replace(temp, target)
+
+
+def _post_html(post: dict) -> str:
+    title = html.escape(post["title"])
+    return (
+        f"<!doctype html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title></head>\n"
+        f"<body><article><h1>{title}</h1>\n{post.get('content_html') or ''}\n</article></body></html>\n"
+    )
+
+
+def _list_html(payload: dict) -> str:
+    items = "\n".join(
+        f"<li><a href=\"/posts/{item['id']}.html\">{html.escape(item['title'])}</a>"
+        f"<p>{html.escape(item.get('summary') or item.get('excerpt') or '')}</p></li>"
+        for item in payload["items"]
+    )
+    return (
+        "<!doctype html>\n<html><head><meta charset=\"utf-8\"></head>\n"
+        f"<body><ul>\n{items}\n</ul><p>{payload['page']} / {payload['pages']}</p></body></html>\n"
+    )
+
+
+def render_jobs(out_dir: str, jobs: List[Job]) -> int:
+    """Write the JSON and HTML files for a chunk of jobs (runs in a worker process)"""
+    for paths, kind, payload in jobs:
+        body = dumps(payload)
+        page = _post_html(payload) if kind == "post" else _list_html(payload)
+        for path in paths:
+            _write(out_dir, f"{path}.json", body)
+            _write(out_dir, f"{path}.html", page.encode("utf-8"))
+    return len(jobs)
+
+
+def remove_files(out_dir: str, paths: Iterable[str]):
+    for path in paths:
+        for extension in ("json", "html"):
+            try:
+                os.remove(os.path.join(out_dir, f"{path}.{extension}"))
+            except FileNotFoundError:
+                pass
+
+
+def load_manifest(out_dir: str, page_size: int) -> dict:
+    """Previous run's fingerprints, or an empty manifest if the layout changed"""
+    empty = {"version": RENDER_VERSION, "page_size": page_size, "posts": {}, "pages": {}}
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return empty
+    if manifest.get("version") != RENDER_VERSION or manifest.get("page_size") != page_size:
+        return empty
+    return manifest
+
+
+async def iter_changed_posts(db, ids: List, published: int) -> AsyncIterator[dict]:
+    """Full documents of the changed posts.
+
+    A handful is fetched by _id in batches; when most posts changed (a
+    first run) one scan of the published posts is cheaper.
+    """
+    if len(ids) * 2 > published:
+        wanted = set(ids)
+        async for post in db.posts.find({"is_published": True}, batch_size=FETCH_BATCH_SIZE):
+            if post["_id"] in wanted:
+                yield post
+        return
+
+    for start in range(0, len(ids), FETCH_BATCH_SIZE):
+        batch = ids[start:start + FETCH_BATCH_SIZE]
+        async for post in db.posts.find({"_id": {"$in": batch}}, batch_size=FETCH_BATCH_SIZE):
+            yield post
+
+
+async def fetch_posts(db, ids: List, published: int, categories: Dict, tag_details: Dict) -> List[dict]:
+    """Full post payloads (/posts/public/{id} shape plus content_html) for changed posts"""
+    payloads = []
+    async for post in iter_changed_posts(db, ids, published):
+        payloads.append({
+            "id": str(post["_id"]),
+            "title": post["title"],
+            "content": post.get("content"),
+            "content_html": post.get("content_html"),
+            "summary": post.get("summary"),
+            "category_id": str(post["category_id"]) if post.get("category_id") else None,
+            "category": categories.get(post.get("category_id")),
+            "tags": post.get("tags", []),
+            "tag_details": [tag_details[name] for name in post.get("tags", []) if name in tag_details],
+            "featured_image": post.get("featured_image"),
+            "is_published": post["is_published"],
+            "created_at": post["created_at"],
+            "updated_at": post["updated_at"],
+            "views": post.get("view_count", 0)
+        })
+    return payloads
+
+
+async def run_jobs(out_dir: str, jobs: List[Job], executor: Optional[Executor]) -> int:
+    """Render jobs in chunks on the executor, or inline without one"""
+    chunks = [jobs[start:start + CHUNK_SIZE] for start in range(0, len(jobs), CHUNK_SIZE)]
+    if executor is None:
+        return sum(render_jobs(out_dir, chunk) for chunk in chunks)
+    loop = asyncio.get_running_loop()
+    done = await asyncio.gather(*(loop.run_in_executor(executor, render_jobs, out_dir, chunk) for chunk in chunks))
+    return sum(done)
+
+
+async def export_site(db, out_dir: str, page_size: int = 10, workers: Optional[int] = None, full: bool = False) -> dict:
+    """Render published posts, the paginated index, category and tag pages to out_dir.
+
+    Only posts whose fingerprint changed since the last run, and listing
+    pages whose contents changed, are rewritten; files for posts and pages
+    that no longer exist are removed. `workers=0` renders in-process.
+    """
+    manifest = {"posts": {}, "pages": {}} if full else load_manifest(out_dir, page_size)
+
+    category_docs = await db.categories.find({}).to_list(length=None)
+    categories = {category["_id"]: serialize_category(category) for category in category_docs}
+    tag_docs = await db.tags.find({}).to_list(length=None)
+    tag_details = {
+        tag["name"]: {"id": str(tag["_id"]), "name": tag["name"], "created_at": tag["created_at"]}
+        for tag in tag_docs
+    }
+
+    # One scan of the card fields decides what changed
+    posts = await db.posts.find(
+        {"is_published": True}, LIST_PROJECTION, batch_size=FETCH_BATCH_SIZE
+    ).sort(POST_SORT).to_list(length=None)
+    fingerprints = {
+        str(post["_id"]): post_fingerprint(post, categories.get(post.get("category_id"))) for post in posts
+    }
+    changed = [
+        post["_id"] for post in posts
+        if manifest["posts"].get(str(post["_id"])) != fingerprints[str(post["_id"])]
+    ]
+    removed_posts = [post_id for post_id in manifest["posts"] if post_id not in fingerprints]
+
+    jobs: List[Job] = [
+        ([post_path(payload["id"])], "post", payload)
+        for payload in await fetch_posts(db, changed, len(posts), categories, tag_details)
+    ]
+
+    signatures: Dict[str, str] = {}
+    for section, section_posts in list_sections(posts, categories).items():
+        for key, signature, job in page_jobs(
+            section, section_posts, fingerprints, categories, page_size, manifest["pages"]
+        ):
+            signatures[key] = signature
+            if job is not None:
+                jobs.append(job)
+    removed_pages = [key for key in manifest["pages"] if key not in signatures]
+
+    os.makedirs(out_dir, exist_ok=True)
+    if workers == 0 or len(jobs) <= CHUNK_SIZE:
+        await run_jobs(out_dir, jobs, None)
+    else:
+        # spawn: forking a process that runs Motor's threads is unsafe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            await run_jobs(out_dir, jobs, executor)
+
+    remove_files(out_dir, [post_path(post_id) for post_id in removed_posts])
+    remove_files(out_dir, [path for key in removed_pages for path in list_paths(*split_page_key(key))])
+
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump({"version": RENDER_VERSION, "page_size": page_size, "posts": fingerprints, "pages": signatures}, f)
+
+    return {
+        "posts": len(posts),
+        "posts_written": len(changed),
+        "posts_removed": len(removed_posts),
+        "pages": len(signatures),
+        "pages_written": len(jobs) - len(changed),
+        "pages_removed": len(removed_pages)
+    }
@@ -0,0 +1,98 @@
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+from pymongo import ReplaceOne, UpdateOne
+
+# One document per tag: {"_id": name, "count": published posts, "last_used_at": datetime}
+COLLECTION = "tag_stats"
+
+
+def published_tags(post: Optional[dict]) -> Set[str]:
+    """Tags a post contributes to the counts (only while published)"""
+    if not post or not post.get("is_published"):
+        return set()
+    return set(post.get("tags") or [])
+
+
+async def increment_tags(db, counts: Counter, used_at: Optional[datetime] = None):
+    """Apply per-tag count deltas with one unordered bulk_write"""
+    used_at = used_at or datetime.utcnow()
+    operations = []
+    for name, delta in counts.items():
+        if delta > 0:
+            operations.append(UpdateOne(
+                {"_id": name},
+                {"$inc": {"count": delta}, "$max": {"last_used_at": used_at}},
+                upsert=True
+            ))
+        elif delta < 0:
+            operations.append(UpdateOne({"_id": name}, {"$inc": {"count": delta}}))
+    if not operations:
+        return
+
+    await db[COLLECTION].bulk_write(operations, ordered=False)
+    if any(delta < 0 for delta in counts.values()):
+        await db[COLLECTION].delete_many({"count": {"$lte": 0}})
+
+
+async def apply_post_change(db, before: Optional[dict], after: Optional[dict]):
+    """Update counts for a post write; pass None for a missing side (create/delete)"""
+    old_tags, new_tags = published_tags(before), published_tags(after)
+    counts = Counter({name: 1 for name in new_tags - old_tags})
+    counts.update({name: -1 for name in old_tags - new_tags})
+    await increment_tags(db, counts)
+
+
+async def apply_posts_created(db, posts: Iterable[dict]):
+    """Count the tags of a batch of newly inserted posts"""
+    counts = Counter()
+    for post in posts:
+        counts.update(published_tags(post))
+    await increment_tags(db, counts)
+
+
+async def aggregate_stats(db, match: Optional[dict] = None) -> List[dict]:
+    """Count documents for published posts, optionally limited by an extra filter"""
+    pipeline = [
+        {"$match": {"is_published": True, **(match or {})}},
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "count": {"$sum": 1}, "last_used_at": {"$max": "$updated_at"}}}
+    ]
+    return await db.posts.aggregate(pipeline).to_list(length=None)
+
+
+async def refresh_tag(db, name: str):
+    """Recount one tag from the posts, dropping its stats once no post uses it"""
+    stat = next((stat for stat in await aggregate_stats(db, {"tags": name}) if stat["_id"] == name), None)
+    if stat:
+        await db[COLLECTION].replace_one({"_id": name}, stat, upsert=True)
+    else:
+        await db[COLLECTION].delete_one({"_id": name})
+
+
+async def popular_tags(db, limit: int = 20) -> List[dict]:
+    """Most used tags, read from the count index"""
+    stats = await db[COLLECTION].find({"count": {"$gt": 0}}).sort("count", -1).limit(limit).to_list(length=limit)
+    return [{"name": stat["_id"], "count": stat["count"]} for stat in stats]
+
+
+async def rebuild_tag_stats(db) -> int:
+    """Recompute every count from the posts collection; returns tags written.
+
+    Documents are replaced in place so readers never see an empty collection.
+    """
+    stats = await aggregate_stats(db)
+
+    if stats:
+        await db[COLLECTION].bulk_write(
+            [ReplaceOne({"_id": stat["_id"]}, stat, upsert=True) for stat in stats], ordered=False
+        )
+    await db[COLLECTION].delete_many({"_id": {"$nin": [stat["_id"] for stat in stats]}})
+    return len(stats)
+
+
+async def ensure_tag_stats(db):
+    """Build the counts once when upgrading a database that has none"""
+    if await db[COLLECTION].estimated_document_count() == 0 and await db.posts.estimated_document_count() > 0:
+        await rebuild_tag_stats(db)
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+from typing import Optional, Tuple
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from pymongo import ReturnDocument
+
+from core.config import settings
+from core.serialization import dumps
+
+# Bytes read from the spooled upload and written per step
+CHUNK_SIZE = 1024 * 1024
+MAX_FILES_PER_REQUEST = 10
+# Allowance for multipart boundaries and part headers per file
+PART_OVERHEAD = 16 * 1024
+
+UPLOAD_PREFIX = "/api/v1/upload"
+
+
+class UploadTooLarge(Exception):
+    """An upload crossed the size limit while being streamed"""
+
+
+def too_large_detail() -> str:
+    return f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes"
+
+
+def incoming_dir() -> str:
+    """Temp directory inside UPLOAD_DIR, so the final move is an atomic rename"""
+    path = os.path.join(settings.UPLOAD_DIR, ".incoming")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+async def stream_to_temp(file: UploadFile, max_bytes: int, digest=None) -> Tuple[str, int]:
+    """Copy an upload to a temp file in fixed-size chunks; returns (path, size).
+
+    Raises UploadTooLarge as soon as the running count passes max_bytes,
+    leaving nothing behind. A hashlib object passed as digest is fed every
+    chunk on the way through.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=incoming_dir(), suffix=".part")
+    os.close(fd)
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(too_large_detail())
+                if digest is not None:
+                    digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        discard(temp_path)
+        raise
+    return temp_path, size
+
+
+def commit(temp_path: str, filename: str) -> str:
+    """Move a finished temp file into UPLOAD_DIR under its final name"""
+    final_path = os.path.join(settings.UPLOAD_DIR, filename)
+    os.replace(temp_path, final_path)
+    return final_path
+
+
+def discard(path: Optional[str]):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def add_reference(db, content_hash: str, filename: str, size: int) -> Optional[dict]:
+    """Count one more upload of some content.
+
+    Returns the record as it was before, or None when this is the first
+    upload of the content and the caller has to store it.
+    """
+    return await db.uploads.find_one_and_update(
+        {"_id": content_hash},
+        {
+            "$inc": {"ref_count": 1},
+            "$setOnInsert": {"filename": filename, "size": size, "variants": None, "created_at": datetime.utcnow()}
+        },
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+
+
+async def release_reference(db, filename: str) -> Optional[int]:
+    """Drop one reference to a stored file; returns how many remain.
+
+    None means the file predates content addressing and is not counted
+    (nor removed). With the last reference the record and the file go
+    together: the file is moved aside, the record deleted only while the
+    count is still zero, and the file put back if an upload re-added the
+    content in between.
+    """
+    record = await db.uploads.find_one_and_update(
+        {"filename": filename}, {"$inc": {"ref_count": -1}}, return_document=ReturnDocument.AFTER
+    )
+    if record is None:
+        return None
+    if record["ref_count"] > 0:
+        return record["ref_count"]
+
+    path = os.path.join(settings.UPLOAD_DIR, filename)
+    fd, aside = tempfile.mkstemp(dir=incoming_dir(), suffix=".deleting")
+    os.close(fd)
+    try:
+        os.replace(path, aside)
+    except FileNotFoundError:
+        discard(aside)
+        aside = None
+    deleted = await db.uploads.find_one_and_delete({"_id": record["_id"], "ref_count": {"$lte": 0}})
+    if deleted is None:
+        # Re-added meanwhile; a new upload may have committed the same bytes already
+        if aside:
+            os.replace(aside, path)
+        return 1
+    discard(aside)
+    return 0
+
+
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def upload_slots() -> asyncio.Semaphore:
+    """Process-wide cap on uploads being saved at once (UPLOAD_CONCURRENCY)"""
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    # A semaphore binds to the loop it first waits on
+    if _slots is None or _slots_loop is not loop:
+        _slots = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+        _slots_loop = loop
+    return _slots
+
+
+def request_limit(path: str) -> int:
+    """Largest request body accepted by an upload route"""
+    files = 1 if path.endswith("/image") else MAX_FILES_PER_REQUEST
+    return files * (settings.MAX_FILE_SIZE + PART_OVERHEAD)
+
+
+class UploadSizeLimitMiddleware:
+    """Reject oversized upload requests before the multipart body is spooled.
+
+    A declared Content-Length over the limit is refused without reading
+    the body; otherwise received bytes are counted and the request fails
+    with 413 as soon as the count passes the limit.
+    """
+
+    def __init__(self, app, prefix: str = UPLOAD_PREFIX):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        limit = request_limit(scope["path"])
+        headers = dict(scope["headers"])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            await _send_too_large(send)
+            return
+
+        received = 0
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Re-raised by FastAPI's body parsing and rendered as a 413
+                    raise HTTPException(status_code=413, detail=too_large_detail())
+            return message
+
+        await self.app(scope, counting_receive, send)
+
+
+async def _send_too_large(send):
+    body = dumps({"detail": too_large_detail()})
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.config import settings
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """Write-behind aggregator for post view counts.
+
+    Views are counted in memory and written with one unordered bulk_write
+    every `flush_interval_ms` or once `flush_threshold` views are pending.
+    """
+
+    def __init__(self, flush_interval_ms: int, flush_threshold: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_threshold = flush_threshold
+        self.pending: Dict[ObjectId, int] = defaultdict(int)
+        self.in_flight: Dict[ObjectId, int] = {}
+        self._pending_events = 0
+        self._task: Optional[asyncio.Task] = None
+        # Threshold flush; kept so it is not garbage-collected mid-write
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def increment(self, post_id) -> int:
+        """Record one view and return the views not yet written for the post"""
+        post_id = ObjectId(post_id)
+        self.pending[post_id] += 1
+        self._pending_events += 1
+        if self._pending_events >= self.flush_threshold and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+        return self.unflushed(post_id)
+
+    def unflushed(self, post_id) -> int:
+        """Views recorded for a post that are not yet visible in the database"""
+        post_id = ObjectId(post_id)
+        return self.pending.get(post_id, 0) + self.in_flight.get(post_id, 0)
+
+    async def flush(self):
+        """Write all pending increments with a single bulk_write"""
+        async with self._flush_lock:
+            if not self.pending:
+                return
+
+            self.in_flight = dict(self.pending)
+            self.pending = defaultdict(int)
+            self._pending_events = 0
+
+            post_ids = list(self.in_flight)
+            operations = [
+                UpdateOne({"_id": post_id}, {"$inc": {"view_count": self.in_flight[post_id]}})
+                for post_id in post_ids
+            ]
+            try:
+                await get_database().posts.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: the other updates were applied, so only retry the failed ones
+                failed = [post_ids[error["index"]] for error in e.details.get("writeErrors", [])]
+                logger.exception("Failed to flush %d of %d view counts", len(failed), len(operations))
+                self._requeue(failed)
+            except Exception:
+                # Keep the counts so the next flush retries them
+                logger.exception("Failed to flush %d view counts", len(operations))
+                self._requeue(post_ids)
+            finally:
+                self.in_flight = {}
+
+    def _requeue(self, post_ids):
+        for post_id in post_ids:
+            count = self.in_flight[post_id]
+            self.pending[post_id] += count
+            self._pending_events += count
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("View count flush loop error")
+
+    def start(self):
+        """Start the periodic background flush"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flush and write anything still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+
+
+view_counter = ViewCounter(
+    flush_interval_ms=settings.VIEW_COUNT_FLUSH_INTERVAL_MS,
+    flush_threshold=settings.VIEW_COUNT_FLUSH_THRESHOLD
+)
@@ -5,8 +5,17 @@ from contextlib import asynccontextmanager
 import os
 
 from core.config import settings
-from core.database import connect_to_mongo, close_mongo_connection
-from api.v1.routers import auth, posts, categories, tags, upload
+from core.database import connect_to_mongo, close_mongo_connection, get_database
+from core.images import image_processor
+from core.indexes import ensure_indexes
+from core.related import related_index
+from core.search import search_index
+from core.serialization import ORJSONResponse
+from core.category_counts import ensure_category_counts
+from core.tag_stats import ensure_tag_stats
+from core.uploads import UploadSizeLimitMiddleware
+from core.view_counter import view_counter
+from api.v1.routers import auth, posts, categories, tags, upload, system, export, imports, feeds
 
 
 @asynccontextmanager
@@ -14,12 +23,33 @@ async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
     
+    # Create any missing indexes
+    await ensure_indexes(get_database())
+    
+    # Build tag and category counts when upgrading a database that has none
+    await ensure_tag_stats(get_database())
+    await ensure_category_counts(get_database())
+    
+    # Build the in-memory search and related-posts indexes in the background
+    search_index.start_rebuild(get_database())
+    related_index.start_rebuild(get_database())
+    
+    # Start flushing buffered view counts
+    view_counter.start()
+    
+    # Start the image worker processes before the first upload
+    image_processor.start()
+    
     # Create uploads directory
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     
     yield
     
     # Shutdown
+    await view_counter.stop()
+    await related_index.stop()
+    await search_index.stop()
+    image_processor.shutdown()
     await close_mongo_connection()
 
 
@@ -27,9 +57,14 @@ app = FastAPI(
     title="Blog API",
     description="Blog API with admin and reader roles",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Refuse oversized uploads before their multipart bodies are spooled. Added
+# first so CORS (added last, outermost) also wraps its 413 responses.
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +83,10 @@ app.include_router(posts.router, prefix="/api/v1/posts", tags=["posts"])
 app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
 app.include_router(tags.router, prefix="/api/v1/tags", tags=["tags"])
 app.include_router(upload.router, prefix="/api/v1/upload", tags=["upload"])
+app.include_router(system.router, prefix="/api/v1/system", tags=["system"])
+app.include_router(export.router, prefix="/api/v1/export", tags=["export"])
+app.include_router(imports.router, prefix="/api/v1/import", tags=["import"])
+app.include_router(feeds.router, tags=["feeds"])
 
 
 @app.get("/")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Backend management commands.
+
+Usage (from backend/):
+    python manage.py indexes report    # missing, unregistered and unused indexes
+    python manage.py indexes apply     # create missing indexes
+    python manage.py tag-stats rebuild # recompute popular tag counts from posts
+    python manage.py category-counts rebuild  # recompute category post counters
+    python manage.py export -o backup.ndjson.gz --compression gzip [--since 2024-01-01T00:00:00]
+    python manage.py static-export -o site/ [--page-size 10] [--workers 8] [--full]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+
+from core.database import connect_to_mongo, close_mongo_connection, get_database
+from core.export import COMPRESSIONS, EXPORT_COLLECTIONS, resolve_collections, stream_export
+from core.indexes import ensure_indexes, index_report
+from core.category_counts import rebuild_category_counts
+from core.rendering import rerender_stale_posts
+from core.static_site import export_site
+from core.tag_stats import rebuild_tag_stats
+
+
+async def indexes_command(args):
+    """Report on or apply the index registry"""
+    db = get_database()
+    if args.action == "apply":
+        created = await ensure_indexes(db)
+        print(json.dumps(created, indent=2))
+        return
+
+    report = await index_report(db)
+    print(json.dumps(report, indent=2))
+
+
+async def tag_stats_command(args):
+    """Recompute tag_stats from the posts collection"""
+    count = await rebuild_tag_stats(get_database())
+    print(f"Rebuilt counts for {count} tags")
+
+
+async def category_counts_command(args):
+    """Recompute category post counters from the posts collection"""
+    count = await rebuild_category_counts(get_database())
+    print(f"Rebuilt counters for {count} categories")
+
+
+async def render_command(args):
+    """Re-render post HTML stored by an older renderer version"""
+    count = await rerender_stale_posts(get_database())
+    print(f"Re-rendered {count} posts")
+
+
+async def export_command(args):
+    """Stream collections as NDJSON to a file or stdout"""
+    collections = resolve_collections(args.collections.split(",") if args.collections else None)
+    started_at = datetime.utcnow()
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in stream_export(get_database(), collections, args.since, args.compression):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    # Pass this as --since on the next incremental run
+    print(f"Export started at {started_at.isoformat()}Z", file=sys.stderr)
+
+
+async def static_export_command(args):
+    """Render the public site to static files, rewriting only what changed"""
+    started = time.perf_counter()
+    summary = await export_site(
+        get_database(), args.output, page_size=args.page_size, workers=args.workers, full=args.full
+    )
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(summary, indent=2))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Blog backend management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    indexes = subparsers.add_parser("indexes", help="Manage MongoDB indexes")
+    indexes.add_argument("action", choices=["report", "apply"])
+    indexes.set_defaults(handler=indexes_command)
+
+    tag_stats = subparsers.add_parser("tag-stats", help="Repair popular tag counts")
+    tag_stats.add_argument("action", choices=["rebuild"])
+    tag_stats.set_defaults(handler=tag_stats_command)
+
+    category_counts = subparsers.add_parser("category-counts", help="Repair category post counters")
+    category_counts.add_argument("action", choices=["rebuild"])
+    category_counts.set_defaults(handler=category_counts_command)
+
+    render = subparsers.add_parser("render", help="Re-render stored post HTML")
+    render.add_argument("action", choices=["rebuild"])
+    render.set_defaults(handler=render_command)
+
+    export = subparsers.add_parser("export", help="Export collections as NDJSON")
+    export.add_argument("-o", "--output", help="Output file (default: stdout)")
+    export.add_argument("--collections", help=f"Comma-separated subset of {','.join(EXPORT_COLLECTIONS)}")
+    export.add_argument("--since", type=datetime.fromisoformat, help="Only documents created or updated since (ISO 8601)")
+    export.add_argument("--compression", choices=COMPRESSIONS, default="none")
+    export.set_defaults(handler=export_command)
+
+    static_export = subparsers.add_parser("static-export", help="Render published posts and listings to static files")
+    static_export.add_argument("-o", "--output", required=True, help="Output directory (keeps manifest.json between runs)")
+    static_export.add_argument("--page-size", type=int, default=10)
+    static_export.add_argument("--workers", type=int, help="Render processes (default: CPU count, 0 renders in-process)")
+    static_export.add_argument("--full", action="store_true", help="Ignore the manifest and rewrite everything")
+    static_export.set_defaults(handler=static_export_command)
+
+    return parser
+
+
+async def run(args):
+    await connect_to_mongo()
+    try:
+        await args.handler(args)
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    args = build_parser().parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
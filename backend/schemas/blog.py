@@ -13,6 +13,22 @@ class PostCreate(BaseModel):
     is_published: bool = False
 
 
+class PostImport(PostCreate):
+    category_name: Optional[str] = None  # Used when category_id is not given
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    view_count: int = 0
+
+
+class ImportResult(BaseModel):
+    collection: str
+    total: int
+    created: int
+    existing: int
+    failed: int
+    results: List[dict]  # One {"row", "status", "id"|"error"} per input row
+
+
 class PostUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
@@ -26,7 +42,8 @@ class PostUpdate(BaseModel):
 class PostResponse(BaseModel):
     id: str
     title: str
-    content: str
+    content: Optional[str] = None  # Markdown; omitted when HTML is requested
+    content_html: Optional[str] = None  # Pre-rendered, sanitized HTML
     summary: Optional[str] = None
     category_id: Optional[str] = None
     category: Optional[dict] = None  # Category details
@@ -43,7 +60,8 @@ class PostListResponse(BaseModel):
     id: str
     title: str
     summary: Optional[str] = None
-    content: Optional[str] = None
+    excerpt: Optional[str] = None  # Plain-text preview of content
+    content: Optional[str] = None  # Only included in the full view
     category_id: Optional[str] = None
     category: Optional[dict] = None  # Category details
     tags: List[str] = []
@@ -53,6 +71,12 @@ class PostListResponse(BaseModel):
     views: int
 
 
+class PostSearchResult(PostListResponse):
+    score: float
+    highlighted_title: Optional[str] = None  # HTML-escaped, matches wrapped in <mark>
+    snippet: Optional[str] = None  # HTML-escaped, matches wrapped in <mark>
+
+
 class CategoryCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -70,6 +94,11 @@ class CategoryResponse(BaseModel):
     created_at: datetime
 
 
+class CategoryWithCountsResponse(CategoryResponse):
+    post_count: int = 0
+    published_count: int = 0
+
+
 class TagCreate(BaseModel):
     name: str
 
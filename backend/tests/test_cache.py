@@ -0,0 +1,120 @@
+"""Tests for the public response cache."""
+import json
+from bson import ObjectId
+from datetime import datetime
+from starlette.requests import Request
+
+from core.cache import ResponseCache, render_json, response_cache
+
+
+class TestResponseCache:
+    """Test LRU, TTL and tag invalidation behaviour."""
+
+    def test_hit_and_miss_counters(self):
+        """Test lookups are counted and hits return the stored bytes."""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, ttl_seconds=60)
+
+        assert cache.get("/a?") is None
+        cache.set("/a?", b'{"a":1}', {"a"})
+        response = cache.get("/a?")
+
+        assert response.body == b'{"a":1}'
+        assert response.media_type == "application/json"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2, max_bytes=1024, ttl_seconds=60)
+        cache.set("a", b"1", ())
+        cache.set("b", b"2", ())
+        cache.get("a")
+        cache.set("c", b"3", ())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_budget_eviction(self):
+        """Test entries are evicted to stay within the byte budget."""
+        cache = ResponseCache(max_entries=10, max_bytes=5, ttl_seconds=60)
+        cache.set("a", b"123", ())
+        cache.set("b", b"456", ())
+
+        assert cache.get("a") is None
+        assert cache.stats()["size_bytes"] == 3
+
+    def test_ttl_expiry(self):
+        """Test expired entries are treated as misses."""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, ttl_seconds=0)
+        cache.set("a", b"1", ())
+
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_invalidate_by_tag(self):
+        """Test invalidation only drops entries depending on the tag."""
+        cache = ResponseCache(max_entries=10, max_bytes=1024, ttl_seconds=60)
+        cache.set("post-1", b"1", {"post:1", "posts:list"})
+        cache.set("post-2", b"2", {"post:2"})
+
+        cache.invalidate("post:1")
+
+        assert cache.get("post-1") is None
+        assert cache.get("post-2") is not None
+        assert cache.stats()["invalidations"] == 1
+        assert "posts:list" not in cache.tag_index
+
+    def test_key_encodes_query_values(self):
+        """Test values containing separators cannot collide with other queries."""
+        def key(query_string):
+            return ResponseCache.make_key(Request({
+                "type": "http", "path": "/api/posts", "query_string": query_string, "headers": []
+            }))
+
+        assert key(b"q=a%26tag%3Db") != key(b"q=a&tag=b")
+        assert key(b"tag=b&q=a") == key(b"q=a&tag=b")
+
+    def test_render_json_matches_fastapi_encoding(self):
+        """Test payloads are encoded with ISO datetimes and UTF-8 text."""
+        body = render_json({"name": "기술", "at": datetime(2024, 1, 2, 3, 4, 5)})
+
+        assert json.loads(body) == {"name": "기술", "at": "2024-01-02T03:04:05"}
+
+
+class TestCategoryCaching:
+    """Test cached category listing is invalidated by writes."""
+
+    async def test_listing_cached_until_write(self, api_client):
+        """Test direct DB changes are hidden by the cache but API writes are not."""
+        client, db = api_client
+
+        first = await client.get("/api/v1/categories/")
+        assert first.json() == []
+
+        await db.categories.insert_one({"name": "Hidden", "created_at": datetime.utcnow()})
+        assert (await client.get("/api/v1/categories/")).json() == []
+
+        created = await client.post("/api/v1/categories/", json={"name": "기술"})
+        assert created.status_code == 200
+
+        names = [category["name"] for category in (await client.get("/api/v1/categories/")).json()]
+        assert names == ["Hidden", "기술"]
+
+    async def test_rename_invalidates_post_responses(self, api_client):
+        """Test renaming a category drops cached listings and its posts' pages."""
+        client, db = api_client
+        created = (await client.post("/api/v1/categories/", json={"name": "기술"})).json()
+        post = await db.posts.insert_one({"title": "t", "category_id": ObjectId(created["id"]), "category_name": "기술"})
+        other = ObjectId()
+        response_cache.set("listing", b"[]", {"posts:list"})
+        response_cache.set("post", b"{}", {f"post:{post.inserted_id}"})
+        response_cache.set("other", b"{}", {f"post:{other}"})
+
+        await client.put(f"/api/v1/categories/{created['id']}", json={"description": "설명"})
+        assert response_cache.get("listing") is not None
+
+        await client.put(f"/api/v1/categories/{created['id']}", json={"name": "개발"})
+        assert response_cache.get("listing") is None and response_cache.get("post") is None
+        assert response_cache.get("other") is not None
+        assert (await db.posts.find_one({"_id": post.inserted_id}))["category_name"] == "개발"
@@ -0,0 +1,101 @@
+"""Tests for post counters kept on category documents."""
+from bson import ObjectId
+
+from core import category_counts
+
+
+async def counts(db):
+    return {
+        category["name"]: (category["post_count"], category["published_count"])
+        async for category in db.categories.find({})
+    }
+
+
+class TestCategoryCounts:
+    """Test counters follow post writes."""
+
+    async def test_post_lifecycle(self, api_client):
+        """Test create, publish toggles, category moves and delete adjust counters."""
+        client, db = api_client
+        dev = (await client.post("/api/v1/categories/", json={"name": "dev"})).json()
+        life = (await client.post("/api/v1/categories/", json={"name": "life"})).json()
+        assert await counts(db) == {"dev": (0, 0), "life": (0, 0)}
+
+        draft = (await client.post("/api/v1/posts/", json={
+            "title": "a", "content": "x", "category_id": dev["id"]
+        })).json()
+        published = (await client.post("/api/v1/posts/", json={
+            "title": "b", "content": "y", "category_id": dev["id"], "is_published": True
+        })).json()
+        assert await counts(db) == {"dev": (2, 1), "life": (0, 0)}
+
+        await client.put(f"/api/v1/posts/{draft['id']}", json={"is_published": True})
+        await client.put(f"/api/v1/posts/{published['id']}", json={"category_id": life["id"]})
+        assert await counts(db) == {"dev": (1, 1), "life": (1, 1)}
+
+        await client.delete(f"/api/v1/posts/{published['id']}")
+        assert await counts(db) == {"dev": (1, 1), "life": (0, 0)}
+
+    async def test_with_counts(self, api_client):
+        """Test the list only includes counters when asked and reflects new posts."""
+        client, _ = api_client
+        dev = (await client.post("/api/v1/categories/", json={"name": "dev"})).json()
+
+        plain = (await client.get("/api/v1/categories/")).json()
+        assert "post_count" not in plain[0]
+
+        listed = (await client.get("/api/v1/categories/", params={"with_counts": "true"})).json()
+        assert (listed[0]["post_count"], listed[0]["published_count"]) == (0, 0)
+
+        await client.post("/api/v1/posts/", json={
+            "title": "a", "content": "x", "category_id": dev["id"], "is_published": True
+        })
+        listed = (await client.get("/api/v1/categories/", params={"with_counts": "true"})).json()
+        assert (listed[0]["post_count"], listed[0]["published_count"]) == (1, 1)
+
+    async def test_delete_reads_counter(self, api_client):
+        """Test delete_category is blocked by the counter and allowed once it drops to zero."""
+        client, db = api_client
+        dev = (await client.post("/api/v1/categories/", json={"name": "dev"})).json()
+        post = (await client.post("/api/v1/posts/", json={
+            "title": "a", "content": "x", "category_id": dev["id"]
+        })).json()
+
+        response = await client.delete(f"/api/v1/categories/{dev['id']}")
+        assert response.status_code == 400
+        assert "1 posts" in response.json()["detail"]
+
+        await client.delete(f"/api/v1/posts/{post['id']}")
+        assert (await client.delete(f"/api/v1/categories/{dev['id']}")).status_code == 200
+        assert (await client.delete(f"/api/v1/categories/{dev['id']}")).status_code == 404
+
+    async def test_import_counts(self, api_client):
+        """Test bulk imports start categories at zero and count imported posts."""
+        client, db = api_client
+        await client.post("/api/v1/import/categories", content=b'{"name": "dev"}\n')
+        await client.post("/api/v1/import/posts", content=(
+            b'{"title": "a", "content": "x", "category_name": "dev", "is_published": true}\n'
+            b'{"title": "b", "content": "y", "category_name": "dev"}\n'
+        ))
+        assert await counts(db) == {"dev": (2, 1)}
+
+    async def test_rebuild_and_ensure(self, api_client):
+        """Test the rebuild repairs drifted counters and ensure fills missing ones."""
+        _, db = api_client
+        dev, empty = ObjectId(), ObjectId()
+        await db.categories.insert_many([
+            {"_id": dev, "name": "dev", "post_count": 9, "published_count": 9},
+            {"_id": empty, "name": "empty"}
+        ])
+        await db.posts.insert_many([
+            {"category_id": dev, "is_published": True},
+            {"category_id": dev, "is_published": False},
+            {"category_id": None, "is_published": True}
+        ])
+
+        await category_counts.ensure_category_counts(db)
+        assert await counts(db) == {"dev": (2, 1), "empty": (0, 0)}
+
+        await db.categories.update_one({"_id": dev}, {"$set": {"post_count": 5}})
+        assert await category_counts.rebuild_category_counts(db) == 2
+        assert await counts(db) == {"dev": (2, 1), "empty": (0, 0)}
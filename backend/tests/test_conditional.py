@@ -0,0 +1,136 @@
+"""Tests for ETag / Last-Modified conditional GET support."""
+import pytest
+from datetime import datetime, timedelta
+from starlette.requests import Request
+
+from core.cache import response_cache
+from core.conditional import format_http_date, is_not_modified, make_etag
+
+
+def make_request(headers):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    }
+    return Request(scope)
+
+
+class TestConditionalHelpers:
+    """Test validator evaluation."""
+
+    def test_etag_is_strong_and_stable(self):
+        """Test ETags are quoted and deterministic."""
+        etag = make_etag("abc", "2024-01-01T00:00:00")
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == make_etag("abc", "2024-01-01T00:00:00")
+        assert etag != make_etag("abc", "2024-01-01T00:00:01")
+
+    def test_if_none_match(self):
+        """Test matching, weak-prefixed, listed and wildcard ETags."""
+        etag = make_etag("x")
+
+        assert is_not_modified(make_request({"If-None-Match": etag}), etag)
+        assert is_not_modified(make_request({"If-None-Match": f'"other", W/{etag}'}), etag)
+        assert is_not_modified(make_request({"If-None-Match": "*"}), etag)
+        assert not is_not_modified(make_request({"If-None-Match": '"other"'}), etag)
+
+    def test_if_modified_since(self):
+        """Test dates compare at second precision."""
+        updated_at = datetime(2024, 1, 1, 12, 0, 0, 500000)
+        etag = make_etag("x")
+
+        assert is_not_modified(make_request({"If-Modified-Since": format_http_date(updated_at)}), etag, updated_at)
+        earlier = format_http_date(updated_at - timedelta(seconds=1))
+        assert not is_not_modified(make_request({"If-Modified-Since": earlier}), etag, updated_at)
+        assert not is_not_modified(make_request({"If-Modified-Since": "garbage"}), etag, updated_at)
+
+    def test_if_none_match_takes_precedence(self):
+        """Test If-Modified-Since is ignored when If-None-Match is present."""
+        updated_at = datetime(2024, 1, 1)
+        request = make_request({
+            "If-None-Match": '"other"',
+            "If-Modified-Since": format_http_date(updated_at)
+        })
+
+        assert not is_not_modified(request, make_etag("x"), updated_at)
+
+
+class TestPostConditionalGet:
+    """Test 304 responses for post endpoints."""
+
+    @pytest.fixture
+    async def post_client(self, api_client):
+        client, db = api_client
+        now = datetime(2024, 3, 1, 9, 30)
+        result = await db.posts.insert_one({
+            "title": "Cached", "content": "body", "summary": None, "tags": [],
+            "is_published": True, "created_at": now, "updated_at": now, "view_count": 0
+        })
+        return client, db, str(result.inserted_id)
+
+    @pytest.mark.parametrize("prefix", ["/api/v1/posts/public", "/api/v1/posts"])
+    async def test_revalidation(self, post_client, prefix):
+        """Test validators are sent and matching requests get an empty 304."""
+        client, db, post_id = post_client
+        url = f"{prefix}/{post_id}"
+
+        first = await client.get(url)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert first.headers["last-modified"] == "Fri, 01 Mar 2024 09:30:00 GMT"
+
+        by_etag = await client.get(url, headers={"If-None-Match": etag})
+        assert by_etag.status_code == 304
+        assert by_etag.content == b""
+
+        by_date = await client.get(url, headers={"If-Modified-Since": first.headers["last-modified"]})
+        assert by_date.status_code == 304
+
+    async def test_update_changes_etag(self, post_client):
+        """Test a newer updated_at produces a different ETag."""
+        client, db, post_id = post_client
+        url = f"/api/v1/posts/public/{post_id}"
+        etag = (await client.get(url)).headers["etag"]
+
+        await db.posts.update_one({}, {"$set": {"updated_at": datetime(2024, 3, 2)}})
+        response_cache.invalidate(f"post:{post_id}")
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    async def test_list_etag_from_body(self, post_client):
+        """Test list responses revalidate against a body hash."""
+        client, _, _ = post_client
+
+        first = await client.get("/api/v1/posts/public")
+        second = await client.get("/api/v1/posts/public", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+
+    @pytest.mark.parametrize("change", ["rename_category", "delete_tag"])
+    async def test_admin_changes_refresh_validators(self, api_client, change):
+        """Test category renames and tag deletes change the ETag of affected posts."""
+        client, db = api_client
+        category = (await client.post("/api/v1/categories/", json={"name": "기술"})).json()
+        tag = (await client.post("/api/v1/tags/", json={"name": "python"})).json()
+        post = (await client.post("/api/v1/posts/", json={
+            "title": "t", "content": "c", "category_id": category["id"], "tags": ["python"], "is_published": True
+        })).json()
+        await db.posts.update_one({}, {"$set": {"updated_at": datetime(2024, 3, 1)}})
+        url = f"/api/v1/posts/{post['id']}"
+        etag = (await client.get(url)).headers["etag"]
+
+        if change == "rename_category":
+            await client.put(f"/api/v1/categories/{category['id']}", json={"name": "개발"})
+        else:
+            await client.delete(f"/api/v1/tags/{tag['id']}")
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
@@ -0,0 +1,86 @@
+"""Tests for the synthetic dataset generator."""
+from collections import Counter
+from httpx import AsyncClient
+
+from benchmarks.dataset import DatasetGenerator, DatasetSpec, write_to_db, write_via_api
+from core.indexes import ensure_indexes
+from main import app
+
+
+class TestDatasetGenerator:
+    """Test determinism and distributions."""
+
+    def test_same_seed_same_posts(self):
+        """Test posts depend only on the seed and index."""
+        first = DatasetGenerator(DatasetSpec(posts=20, seed=7))
+        second = DatasetGenerator(DatasetSpec(posts=20, seed=7))
+        other = DatasetGenerator(DatasetSpec(posts=20, seed=8))
+
+        assert list(first.posts()) == list(second.posts())
+        assert list(first.posts(10, 20)) == [second.post(index) for index in range(10, 20)]
+        assert first.post(0) != other.post(0)
+
+    def test_zipf_tags_and_unique_names(self):
+        """Test the first-ranked tag dominates and generated names are unique."""
+        generator = DatasetGenerator(DatasetSpec(posts=300, tags=120))
+        counts = Counter(tag for post in generator.posts() for tag in post["tags"])
+
+        assert len(set(generator.tag_names)) == 120
+        assert counts.most_common(1)[0][0] == generator.tag_names[0]
+        assert counts[generator.tag_names[0]] > 5 * counts[generator.tag_names[50]]
+
+    def test_post_shape(self):
+        """Test posts are valid markdown rows with consistent dates."""
+        generator = DatasetGenerator(DatasetSpec(posts=50))
+        for post in generator.posts():
+            assert post["content"].startswith("# ")
+            assert post["category_name"] in generator.category_names
+            assert 1 <= len(post["tags"]) == len(set(post["tags"])) <= 5
+            assert post["created_at"] <= post["updated_at"]
+            assert post["view_count"] >= 0
+
+
+class TestDatasetWriters:
+    """Test bulk and API writers."""
+
+    async def test_write_to_db(self, mock_db):
+        """Test bulk inserts store every post with its category reference."""
+        generator = DatasetGenerator(DatasetSpec(posts=25, categories=3, tags=10))
+
+        written = await write_to_db(mock_db, generator, batch_size=10, concurrency=2)
+
+        assert written == 25
+        assert await mock_db.posts.count_documents({}) == 25
+        assert await mock_db.categories.count_documents({}) == 3
+        post = await mock_db.posts.find_one({"title": generator.post(3)["title"]})
+        category = await mock_db.categories.find_one({"_id": post["category_id"]})
+        assert category["name"] == post["category_name"]
+        assert post["excerpt"] and "content_html" not in post
+
+    async def test_write_to_db_keeps_existing_names(self, mock_db):
+        """Test seeding again without dropping reuses categories and tags under unique name indexes."""
+        await ensure_indexes(mock_db)
+        generator = DatasetGenerator(DatasetSpec(posts=5, categories=3, tags=10))
+        existing = await mock_db.categories.insert_one({"name": generator.category_names[0], "description": "kept"})
+
+        await write_to_db(mock_db, generator, batch_size=5)
+        await write_to_db(mock_db, generator, batch_size=5)
+
+        assert await mock_db.categories.count_documents({}) == 3
+        assert await mock_db.tags.count_documents({}) == 10
+        assert await mock_db.posts.count_documents({
+            "category_name": generator.category_names[0], "category_id": {"$ne": existing.inserted_id}
+        }) == 0
+        assert (await mock_db.categories.find_one({"_id": existing.inserted_id}))["description"] == "kept"
+
+    async def test_write_via_api(self, mock_db, admin_headers):
+        """Test the API writer sends batches through the import endpoint."""
+        generator = DatasetGenerator(DatasetSpec(posts=12, categories=3, tags=10))
+
+        async with AsyncClient(app=app, base_url="http://test/api/v1", headers=admin_headers) as client:
+            created = await write_via_api(client, generator, batch_size=5, concurrency=3)
+
+        assert created == 12
+        stored = await mock_db.posts.find_one({"title": generator.post(0)["title"]})
+        assert stored["created_at"] == generator.post(0)["created_at"]
+        assert stored["view_count"] == generator.post(0)["view_count"]
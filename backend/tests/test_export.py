@@ -0,0 +1,86 @@
+"""Tests for streaming NDJSON exports."""
+import gzip
+import pytest
+from bson import ObjectId, json_util
+from datetime import datetime
+from httpx import AsyncClient
+
+from core import export
+from main import app
+
+
+@pytest.fixture
+async def db(mock_db):
+    """In-memory database with one category, tag and two posts."""
+    db = mock_db
+    old, new = datetime(2024, 1, 1), datetime(2024, 6, 1)
+    category_id = (await db.categories.insert_one({"name": "기술", "created_at": old})).inserted_id
+    await db.tags.insert_one({"name": "python", "created_at": old})
+    await db.posts.insert_one({
+        "title": "Old", "content": "본문", "category_id": category_id,
+        "created_at": old, "updated_at": old
+    })
+    await db.posts.insert_one({"title": "Edited", "content": "x", "created_at": old, "updated_at": new})
+    return db
+
+
+def parse(body: bytes):
+    return [json_util.loads(line) for line in body.decode("utf-8").splitlines()]
+
+
+class TestExportStream:
+    """Test the export generator."""
+
+    async def test_records_round_trip_types(self, db):
+        """Test every collection is exported in dependency order with ids and dates intact."""
+        body = b"".join([chunk async for chunk in export.stream_export(db, export.EXPORT_COLLECTIONS)])
+        records = parse(body)
+
+        assert [record["collection"] for record in records] == ["categories", "tags", "posts", "posts"]
+        post = records[2]["document"]
+        assert isinstance(post["_id"], ObjectId)
+        assert post["category_id"] == records[0]["document"]["_id"]
+        assert post["created_at"] == datetime(2024, 1, 1)
+        assert post["content"] == "본문"
+
+    async def test_since_filters_unchanged_documents(self, db):
+        """Test incremental exports only include documents changed since the cutoff."""
+        body = b"".join([chunk async for chunk in export.stream_export(db, ["posts", "tags"], datetime(2024, 3, 1))])
+
+        assert [record["document"]["title"] for record in parse(body)] == ["Edited"]
+
+    async def test_gzip_in_small_chunks(self, db, monkeypatch):
+        """Test gzip output decompresses to the plain export across chunk boundaries."""
+        monkeypatch.setattr(export, "CHUNK_BYTES", 16)
+        plain = b"".join([chunk async for chunk in export.stream_export(db, ["posts"])])
+        chunks = [chunk async for chunk in export.stream_export(db, ["posts"], compression="gzip")]
+
+        assert len(chunks) > 1
+        assert gzip.decompress(b"".join(chunks)) == plain
+
+    def test_rejects_unknown_options(self):
+        """Test unknown collections and compressions raise ValueError."""
+        with pytest.raises(ValueError):
+            export.resolve_collections(["users"])
+        with pytest.raises(ValueError):
+            export.make_compressor("brotli")
+        assert export.resolve_collections(["posts", "categories"]) == ["categories", "posts"]
+
+
+class TestExportEndpoint:
+    """Test the admin export endpoint."""
+
+    async def test_admin_download(self, db, admin_headers):
+        """Test the endpoint requires an admin and streams a gzip attachment."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            anonymous = await client.get("/api/v1/export")
+            response = await client.get("/api/v1/export", params={"compression": "gzip"}, headers=admin_headers)
+            invalid = await client.get("/api/v1/export", params={"collections": "users"}, headers=admin_headers)
+
+        assert anonymous.status_code in (401, 403)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert ".ndjson.gz" in response.headers["content-disposition"]
+        assert "x-export-started-at" in response.headers
+        assert len(parse(gzip.decompress(response.content))) == 4
+        assert invalid.status_code == 400
@@ -0,0 +1,119 @@
+"""Tests for cached feeds and sitemaps."""
+from xml.etree import ElementTree as ET
+
+from core.config import settings
+from core.feeds import ATOM_NS, SITEMAP_NS, feed_cache
+
+
+async def create_post(client, title, **fields):
+    payload = {"title": title, "content": f"{title} 본문", "is_published": True, **fields}
+    return (await client.post("/api/v1/posts/", json=payload)).json()
+
+
+def rss_titles(body: bytes):
+    return [item.findtext("title") for item in ET.fromstring(body).iter("item")]
+
+
+class TestFeeds:
+    """Test feed rendering, caching and invalidation."""
+
+    async def test_rss_and_atom(self, api_client):
+        """Test the site feed lists published posts newest first in both formats."""
+        client, _ = api_client
+        first = await create_post(client, "첫 글", tags=["python"], summary="요약 <b>")
+        await create_post(client, "초안", is_published=False)
+        await create_post(client, "둘째 글")
+
+        response = await client.get("/feed.xml")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/rss+xml")
+        assert rss_titles(response.content) == ["둘째 글", "첫 글"]
+        item = ET.fromstring(response.content).find("channel/item[2]")
+        assert item.findtext("link") == f"{settings.SITE_URL}/post/{first['id']}"
+        assert item.findtext("description") == "요약 <b>"
+
+        atom = await client.get("/atom.xml")
+        assert atom.headers["content-type"].startswith("application/atom+xml")
+        entries = ET.fromstring(atom.content).findall(f"{{{ATOM_NS}}}entry")
+        assert [entry.findtext(f"{{{ATOM_NS}}}title") for entry in entries] == ["둘째 글", "첫 글"]
+        assert "<p>" in entries[1].findtext(f"{{{ATOM_NS}}}content")
+
+    async def test_etag_and_publish_invalidation(self, api_client):
+        """Test polling gets 304s until a publish event regenerates the feed."""
+        client, _ = api_client
+        await create_post(client, "첫 글")
+        response = await client.get("/feed.xml")
+        etag = response.headers["etag"]
+
+        again = await client.get("/feed.xml", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+
+        # Drafts do not touch the feed
+        draft = await create_post(client, "초안", is_published=False)
+        assert feed_cache.get("/feed.xml?") is not None
+
+        await client.put(f"/api/v1/posts/{draft['id']}", json={"is_published": True})
+        changed = await client.get("/feed.xml", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert rss_titles(changed.content) == ["초안", "첫 글"]
+
+    async def test_category_and_tag_feeds(self, api_client):
+        """Test filtered feeds and that writes only drop the feeds they affect."""
+        client, db = api_client
+        dev = (await client.post("/api/v1/categories/", json={"name": "dev"})).json()
+        await client.post("/api/v1/tags/", json={"name": "python"})
+        await client.post("/api/v1/tags/", json={"name": "go"})
+        await create_post(client, "파이썬", category_id=dev["id"], tags=["python"])
+        await create_post(client, "고", tags=["go"])
+
+        category_feed = await client.get(f"/feeds/category/{dev['id']}.xml")
+        assert rss_titles(category_feed.content) == ["파이썬"]
+        tag_feed = await client.get("/feeds/tag/go.xml", params={"format": "atom"})
+        assert tag_feed.headers["content-type"].startswith("application/atom+xml")
+
+        await create_post(client, "또 고", tags=["go"])
+        assert feed_cache.get(f"/feeds/category/{dev['id']}.xml?") is not None
+        assert feed_cache.get("/feeds/tag/go.xml?format=atom") is None
+
+        assert (await client.get("/feeds/tag/missing.xml")).status_code == 404
+        assert (await client.get(f"/feeds/category/{'0' * 24}.xml")).status_code == 404
+        assert (await client.get("/feeds/category/bad.xml")).status_code == 400
+
+
+class TestSitemap:
+    """Test the sharded sitemap."""
+
+    async def test_shards(self, api_client, monkeypatch):
+        """Test shards follow _id order and deletes refresh later shards and the index."""
+        client, _ = api_client
+        monkeypatch.setattr(settings, "SITEMAP_SHARD_SIZE", 2)
+        posts = [await create_post(client, f"글 {i}") for i in range(3)]
+        await create_post(client, "초안", is_published=False)
+
+        index = ET.fromstring((await client.get("/sitemap.xml")).content)
+        locs = [loc.text for loc in index.iter(f"{{{SITEMAP_NS}}}loc")]
+        assert locs == [f"{settings.SITE_URL}/sitemaps/posts-{n}.xml" for n in range(2)]
+
+        def shard_urls(body):
+            return [loc.text.rsplit("/", 1)[1] for loc in ET.fromstring(body).iter(f"{{{SITEMAP_NS}}}loc")]
+
+        assert shard_urls((await client.get("/sitemaps/posts-0.xml")).content) == [posts[0]["id"], posts[1]["id"]]
+        assert shard_urls((await client.get("/sitemaps/posts-1.xml")).content) == [posts[2]["id"]]
+        assert (await client.get("/sitemaps/posts-2.xml")).status_code == 404
+
+        await client.delete(f"/api/v1/posts/{posts[0]['id']}")
+        assert shard_urls((await client.get("/sitemaps/posts-0.xml")).content) == [posts[1]["id"], posts[2]["id"]]
+        index = ET.fromstring((await client.get("/sitemap.xml")).content)
+        assert len(list(index.iter(f"{{{SITEMAP_NS}}}sitemap"))) == 1
+
+    async def test_update_only_drops_own_shard(self, api_client, monkeypatch):
+        """Test editing a published post keeps other shards cached."""
+        client, _ = api_client
+        monkeypatch.setattr(settings, "SITEMAP_SHARD_SIZE", 1)
+        posts = [await create_post(client, f"글 {i}") for i in range(2)]
+        for shard in range(2):
+            await client.get(f"/sitemaps/posts-{shard}.xml")
+
+        await client.put(f"/api/v1/posts/{posts[1]['id']}", json={"title": "수정"})
+        assert feed_cache.get("/sitemaps/posts-0.xml?") is not None
+        assert feed_cache.get("/sitemaps/posts-1.xml?") is None
@@ -0,0 +1,141 @@
+"""Tests for bulk imports."""
+import asyncio
+import json
+import pytest
+from httpx import AsyncClient
+
+from core.importer import ImportFormatError, import_rows, iter_rows
+from core.related import related_index
+from core.search import search_index
+from main import app
+
+
+async def chunked(body: bytes, size: int = 7):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+def ndjson(*rows):
+    return "\n".join(json.dumps(row, ensure_ascii=False) for row in rows).encode("utf-8")
+
+
+class TestRowParsing:
+    """Test NDJSON and JSON array bodies."""
+
+    async def test_ndjson_split_across_chunks(self):
+        """Test lines are reassembled across chunk boundaries and blanks skipped."""
+        body = ndjson({"name": "파이썬"}, {"name": "go"}) + b"\n\n"
+
+        rows = await collect(iter_rows(chunked(body)))
+
+        assert [json.loads(row) for row in rows] == [{"name": "파이썬"}, {"name": "go"}]
+
+    async def test_json_array(self):
+        """Test a JSON array body yields its elements."""
+        rows = await collect(iter_rows(chunked(b'  [{"name": "a"}, {"name": "b"}]')))
+
+        assert rows == [{"name": "a"}, {"name": "b"}]
+
+    async def test_invalid_array_rejected(self):
+        """Test a malformed array is a format error rather than per-row errors."""
+        with pytest.raises(ImportFormatError):
+            await collect(iter_rows(chunked(b'[{"name": "a"},')))
+
+
+class TestImportRows:
+    """Test batched writes and per-row results."""
+
+    async def test_named_rows_upsert(self, mock_db):
+        """Test new names are created, existing names reported and bad rows rejected."""
+        existing = (await mock_db.tags.insert_one({"name": "old"})).inserted_id
+        rows = iter_rows(chunked(ndjson({"name": "new"}, {"name": "old"}, {"title": "x"}, {"name": "new"})))
+
+        summary = await import_rows(mock_db, "tags", rows, batch_size=2)
+
+        assert (summary["created"], summary["existing"], summary["failed"]) == (1, 2, 1)
+        statuses = [result["status"] for result in summary["results"]]
+        assert statuses == ["created", "exists", "error", "exists"]
+        assert summary["results"][1]["id"] == str(existing)
+        assert summary["results"][3]["id"] == summary["results"][0]["id"]
+        assert "name" in summary["results"][2]["error"]
+        assert await mock_db.tags.count_documents({}) == 2
+
+    async def test_posts_resolve_categories_once_per_batch(self, mock_db, monkeypatch):
+        """Test posts resolve category ids and names with one lookup per batch."""
+        dev = (await mock_db.categories.insert_one({"name": "dev"})).inserted_id
+        collection_class = type(mock_db.categories)
+        original_find = collection_class.find
+        lookups = []
+
+        def counting_find(self, *args, **kwargs):
+            if self.name == "categories":
+                lookups.append(args)
+            return original_find(self, *args, **kwargs)
+
+        monkeypatch.setattr(collection_class, "find", counting_find)
+        rows = iter_rows(chunked(ndjson(
+            {"title": "by id", "content": "# 안녕", "category_id": str(dev), "is_published": True},
+            {"title": "by name", "content": "b", "category_name": "dev", "created_at": "2020-05-01T00:00:00"},
+            {"title": "unknown", "content": "c", "category_name": "nope"},
+            {"title": "none", "content": "d"}
+        ) + b"\n{broken"))
+
+        summary = await import_rows(mock_db, "posts", rows, batch_size=10)
+
+        assert len(lookups) == 1
+        assert [result["status"] for result in summary["results"]] == ["created", "created", "error", "created", "error"]
+        assert summary["results"][2]["error"] == "Category not found"
+        by_name = await mock_db.posts.find_one({"title": "by name"})
+        assert by_name["category_id"] == dev and by_name["category_name"] == "dev"
+        assert by_name["created_at"].year == 2020 and by_name["updated_at"] == by_name["created_at"]
+        by_id = await mock_db.posts.find_one({"title": "by id"})
+        assert by_id["content_html"] and by_id["excerpt"] == "안녕"
+
+    async def test_posts_indexed_by_one_rebuild(self, mock_db, monkeypatch):
+        """Test imported posts are indexed by a background rebuild queued after a running one."""
+        writes = []
+        for index in (search_index, related_index):
+            monkeypatch.setattr(index, "index_post", writes.append)
+            index.clear()
+            index.ready = False
+            index._task = None
+        await mock_db.posts.insert_one({"title": "existing", "content": "asyncio", "is_published": True})
+        running = related_index.start_rebuild(mock_db)
+        rows = iter_rows(chunked(ndjson(
+            *({"title": f"post {i}", "content": "asyncio", "is_published": True} for i in range(3))
+        )))
+
+        await import_rows(mock_db, "posts", rows)
+        await asyncio.gather(search_index._task, related_index.wait())
+
+        assert writes == []
+        assert related_index._task is not running
+        assert len(search_index) == len(related_index) == 4
+        for index in (search_index, related_index):
+            index.clear()
+            index.ready = False
+
+
+class TestImportEndpoint:
+    """Test the admin import endpoint."""
+
+    async def test_import_json_array(self, mock_db, admin_headers):
+        """Test the endpoint accepts a JSON array and rejects bad bodies."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            anonymous = await client.post("/api/v1/import/categories", content=b"[]")
+            response = await client.post(
+                "/api/v1/import/categories", content=b'[{"name": "dev", "description": "x"}]', headers=admin_headers
+            )
+            invalid = await client.post("/api/v1/import/categories", content=b'{"name": 1}', headers=admin_headers)
+            unknown = await client.post("/api/v1/import/users", content=b"[]", headers=admin_headers)
+
+        assert anonymous.status_code in (401, 403)
+        assert response.status_code == 200
+        assert response.json()["created"] == 1
+        assert (await mock_db.categories.find_one({"name": "dev"}))["description"] == "x"
+        assert invalid.json()["failed"] == 1
+        assert unknown.status_code == 422
@@ -0,0 +1,47 @@
+"""Tests for the index registry."""
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import DuplicateKeyError
+
+from core.indexes import INDEXES, ensure_indexes, index_report
+
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient()["test_indexes"]
+
+
+class TestIndexRegistry:
+    """Test applying and reporting registry indexes."""
+
+    async def test_report_lists_missing_indexes(self, db):
+        """Test a fresh database reports every registry index as missing."""
+        report = await index_report(db)
+
+        for collection_name, models in INDEXES.items():
+            assert report[collection_name]["missing"] == [model.document["name"] for model in models]
+
+    async def test_ensure_indexes_is_idempotent(self, db):
+        """Test applying twice leaves nothing missing and no duplicates."""
+        await ensure_indexes(db)
+        await ensure_indexes(db)
+
+        report = await index_report(db)
+        for collection_name in INDEXES:
+            assert report[collection_name]["missing"] == []
+            assert report[collection_name]["unregistered"] == []
+
+    async def test_unregistered_indexes_reported(self, db):
+        """Test indexes outside the registry are flagged."""
+        await ensure_indexes(db)
+        await db.posts.create_index("title", name="title_adhoc")
+
+        assert (await index_report(db))["posts"]["unregistered"] == ["title_adhoc"]
+
+    async def test_names_are_unique(self, db):
+        """Test category and tag names are enforced unique."""
+        await ensure_indexes(db)
+        await db.tags.insert_one({"name": "python"})
+
+        with pytest.raises(DuplicateKeyError):
+            await db.tags.insert_one({"name": "python"})
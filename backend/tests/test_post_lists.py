@@ -0,0 +1,276 @@
+"""Tests for post list hydration, pagination and projection."""
+import asyncio
+import pytest
+from bson import ObjectId
+from datetime import datetime
+from fastapi import HTTPException
+
+from api.v1.routers import posts as posts_router
+from api.v1.routers.posts import (
+    build_post_list_items, fetch_posts_page, get_categories_for_posts, list_projection, resolve_list_fields
+)
+from core.counts import CountCache, is_approximable
+from core.pagination import POST_SORT, decode_cursor, encode_cursor, fetch_facet_page, fetch_keyset_page
+from core.rendering import make_excerpt
+
+
+def make_post(title, category_id=None, **extra):
+    post = {
+        "title": title,
+        "content": f"{title} content",
+        "summary": f"{title} summary",
+        "category_id": category_id,
+        "tags": [],
+        "is_published": True,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "view_count": 0
+    }
+    post.update(extra)
+    return post
+
+
+class TestPostListHydration:
+    """Test batched category hydration for post lists."""
+
+    async def test_categories_fetched_once_per_page(self, mock_db, monkeypatch):
+        """Test all referenced categories are resolved from one query."""
+        tech = await mock_db.categories.insert_one({"name": "Tech", "description": "tech"})
+        life = await mock_db.categories.insert_one({"name": "Life"})
+        posts = [
+            make_post("a", tech.inserted_id),
+            make_post("b", life.inserted_id),
+            make_post("c", tech.inserted_id),
+            make_post("d"),
+        ]
+        for post in posts:
+            post["_id"] = (await mock_db.posts.insert_one(post)).inserted_id
+
+        calls = []
+        collection_class = type(mock_db.categories)
+        original_find = collection_class.find
+
+        def counting_find(self, *args, **kwargs):
+            calls.append(self.name)
+            return original_find(self, *args, **kwargs)
+
+        monkeypatch.setattr(collection_class, "find", counting_find)
+        items = await build_post_list_items(mock_db, posts)
+
+        assert calls == ["categories"]
+        assert [item.title for item in items] == ["a", "b", "c", "d"]
+        assert items[0].category == {"id": str(tech.inserted_id), "name": "Tech", "description": "tech"}
+        assert items[1].category["name"] == "Life"
+        assert items[3].category is None
+        assert items[3].category_id is None
+
+    async def test_missing_category_is_none(self, mock_db):
+        """Test posts pointing at a deleted category hydrate without one."""
+        category = await mock_db.categories.insert_one({"name": "Gone"})
+        await mock_db.categories.delete_one({"_id": category.inserted_id})
+        post = make_post("orphan", category.inserted_id, _id=ObjectId())
+
+        items = await build_post_list_items(mock_db, [post])
+
+        assert items[0].category is None
+        assert items[0].category_id == str(category.inserted_id)
+
+    async def test_no_query_without_categories(self, mock_db):
+        """Test pages without categories skip the lookup entirely."""
+        assert await get_categories_for_posts(mock_db, [make_post("a")]) == {}
+
+
+class TestKeysetPagination:
+    """Test cursor-based pagination of post lists."""
+
+    async def seed(self, db, count=7):
+        created_at = datetime(2024, 1, 1)
+        # Two posts share a timestamp to exercise the _id tie-breaker
+        for i in range(count):
+            await db.posts.insert_one(make_post(f"post {i}", created_at=created_at.replace(day=1 + i // 2)))
+        return await db.posts.find({}).sort(POST_SORT).to_list(length=None)
+
+    async def test_cursor_walk_matches_skip_pages(self, mock_db):
+        """Test following next_cursor visits the same posts as page numbers."""
+        expected = await self.seed(mock_db)
+
+        seen = []
+        cursor = None
+        while True:
+            docs, next_cursor, _ = await fetch_keyset_page(mock_db.posts, {}, 3, cursor=cursor)
+            seen.extend(doc["_id"] for doc in docs)
+            if not next_cursor:
+                break
+            cursor = next_cursor
+
+        assert seen == [doc["_id"] for doc in expected]
+
+        skip_docs, _, _ = await fetch_keyset_page(mock_db.posts, {}, 3, skip=3)
+        assert [doc["_id"] for doc in skip_docs] == seen[3:6]
+
+    async def test_prev_cursor_returns_previous_page(self, mock_db):
+        """Test prev_cursor walks back to the page before."""
+        expected = await self.seed(mock_db)
+
+        first, next_cursor, prev_cursor = await fetch_keyset_page(mock_db.posts, {}, 3)
+        assert prev_cursor is None
+        second, _, prev_cursor = await fetch_keyset_page(mock_db.posts, {}, 3, cursor=next_cursor)
+        back, next_cursor, prev_cursor = await fetch_keyset_page(mock_db.posts, {}, 3, cursor=prev_cursor)
+
+        assert [doc["_id"] for doc in second] == [doc["_id"] for doc in expected[3:6]]
+        assert [doc["_id"] for doc in back] == [doc["_id"] for doc in first]
+        assert prev_cursor is None
+        assert next_cursor is not None
+
+    async def test_cursor_respects_filters_with_or(self, mock_db):
+        """Test the keyset condition is combined with an existing $or filter."""
+        await self.seed(mock_db)
+        query = {"$or": [{"title": "post 1"}, {"title": "post 4"}, {"title": "post 5"}]}
+
+        first, next_cursor, _ = await fetch_keyset_page(mock_db.posts, query, 2)
+        rest, next_after, _ = await fetch_keyset_page(mock_db.posts, query, 2, cursor=next_cursor)
+
+        assert [doc["title"] for doc in first + rest] == ["post 5", "post 4", "post 1"]
+        assert next_after is None
+
+    def test_invalid_cursor_rejected(self):
+        """Test malformed cursors raise a 400."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor")
+
+        assert exc_info.value.status_code == 400
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode back to the position they encode."""
+        doc = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1, 12, 30)}
+
+        created_at, doc_id, direction = decode_cursor(encode_cursor(doc, "next"))
+
+        assert (created_at, doc_id, direction) == (doc["created_at"], doc["_id"], "next")
+
+
+class TestListProjection:
+    """Test card/full views and field selection for post lists."""
+
+    def test_card_view_omits_content(self):
+        """Test the default card projection never reads the body."""
+        projection = list_projection(resolve_list_fields("card", None))
+
+        assert "content" not in projection
+        assert {"_id", "title", "excerpt", "category_id", "view_count", "created_at"} <= set(projection)
+
+    def test_full_view_reads_content(self):
+        """Test the full view adds the body to the projection."""
+        assert "content" in list_projection(resolve_list_fields("full", None))
+
+    def test_fields_parameter(self):
+        """Test requested fields always include id and reject unknown names."""
+        assert resolve_list_fields("card", "title, views") == ["id", "title", "views"]
+
+        with pytest.raises(HTTPException) as exc_info:
+            resolve_list_fields("card", "title,secret")
+        assert exc_info.value.status_code == 400
+
+    def test_make_excerpt_strips_markdown(self):
+        """Test excerpts are plain text and truncated."""
+        content = "# 제목\n\n**굵게** 그리고 [링크](http://x) ![img](a.png)\n\n```py\ncode\n```\n끝"
+
+        assert make_excerpt(content) == "제목 굵게 그리고 링크 끝"
+        assert make_excerpt("a" * 250) == "a" * 200 + "..."
+
+    @pytest.fixture
+    async def list_client(self, api_client):
+        client, db = api_client
+        await db.posts.insert_one(make_post("Card", excerpt="preview"))
+        return client
+
+    async def test_public_list_views(self, list_client):
+        """Test the public list defaults to cards and honours view/fields."""
+        card = (await list_client.get("/api/v1/posts/public")).json()["items"][0]
+        full = (await list_client.get("/api/v1/posts/public", params={"view": "full"})).json()["items"][0]
+        narrow = (await list_client.get("/api/v1/posts/public", params={"fields": "title"})).json()["items"][0]
+
+        assert "content" not in card
+        assert card["excerpt"] == "preview"
+        assert full["content"] == "Card content"
+        assert narrow == {"id": narrow["id"], "title": "Card"}
+
+
+class TestPageTotals:
+    """Test facet pages and cached approximate totals."""
+
+    async def test_facet_page_matches_find(self, mock_db):
+        """Test $facet returns the same page as find plus the exact total."""
+        for i in range(5):
+            await mock_db.posts.insert_one(make_post(f"post {i}", tags=["a"] if i % 2 else ["b"]))
+        query = {"tags": {"$in": ["a"]}}
+
+        docs, total, next_cursor, prev_cursor = await fetch_facet_page(
+            mock_db.posts, query, 1, skip=1, projection={"title": 1, "created_at": 1}
+        )
+        expected = await mock_db.posts.find(query).sort(POST_SORT).skip(1).limit(1).to_list(length=1)
+
+        assert total == 2
+        assert [doc["_id"] for doc in docs] == [expected[0]["_id"]]
+        assert "content" not in docs[0]
+        assert next_cursor is None and prev_cursor is not None
+
+    async def test_facet_page_empty(self, mock_db):
+        """Test an empty match yields no items and a zero total."""
+        docs, total, next_cursor, _ = await fetch_facet_page(mock_db.posts, {"is_published": True}, 10)
+
+        assert docs == [] and total == 0 and next_cursor is None
+
+    def test_approximable_queries(self):
+        """Test only unfiltered and category-only queries are approximated."""
+        assert is_approximable({})
+        assert is_approximable({"is_published": True, "category_name": "dev"})
+        assert not is_approximable({"is_published": True, "tags": {"$in": ["a"]}})
+
+    async def test_count_cache_reuses_until_invalidated(self, mock_db):
+        """Test cached counts lag writes until invalidated."""
+        counts = CountCache(ttl_seconds=60)
+        await mock_db.posts.insert_one(make_post("one"))
+        query = {"is_published": True}
+
+        assert await counts.count(mock_db.posts, query) == 1
+        await mock_db.posts.insert_one(make_post("two"))
+        assert await counts.count(mock_db.posts, query) == 1
+
+        counts.invalidate()
+        assert await counts.count(mock_db.posts, query) == 2
+
+    async def test_cached_total_read_with_page(self, mock_db, monkeypatch):
+        """Test the count-cache branch reads the total while the page is fetched."""
+        await mock_db.posts.insert_one(make_post("one"))
+        events = []
+        keyset_page = posts_router.fetch_keyset_page
+
+        async def slow_count(collection, query):
+            await asyncio.sleep(0.01)
+            events.append("count")
+            return 1
+
+        async def tracked_page(*args, **kwargs):
+            events.append("page")
+            return await keyset_page(*args, **kwargs)
+
+        monkeypatch.setattr(posts_router.post_counts, "count", slow_count)
+        monkeypatch.setattr(posts_router, "fetch_keyset_page", tracked_page)
+        posts, total, exact, _, _ = await fetch_posts_page(mock_db, {}, 10, 0, None, list_projection([]), False)
+
+        assert events == ["page", "count"]
+        assert (len(posts), total, exact) == (1, 1, False)
+
+    async def test_exact_total_escape_hatch(self, api_client):
+        """Test the list reports whether its total is exact."""
+        client, db = api_client
+        await db.posts.insert_one(make_post("one", tags=["a"]))
+        approximate = (await client.get("/api/v1/posts/public")).json()
+        exact = (await client.get("/api/v1/posts/public", params={"exact_total": "true"})).json()
+        by_tag = (await client.get("/api/v1/posts/public", params={"tags": "a"})).json()
+
+        assert (approximate["total"], approximate["total_exact"]) == (1, False)
+        assert (exact["total"], exact["total_exact"]) == (1, True)
+        assert (by_tag["total"], by_tag["total_exact"]) == (1, True)
+        assert by_tag["items"][0]["title"] == "one"
@@ -0,0 +1,225 @@
+"""Tests for the related posts index and endpoint."""
+import pytest
+from bson import ObjectId
+from datetime import datetime
+from mongomock_motor import AsyncMongoMockClient
+
+from core import related as related_module
+from core.related import RelatedIndex, related_index
+
+
+def make_post(title, content, tags=(), is_published=True):
+    return {
+        "_id": ObjectId(), "title": title, "summary": None, "content": content,
+        "tags": list(tags), "is_published": is_published
+    }
+
+
+def related_ids(index, post):
+    return [doc_id for doc_id, _ in index.related(post["_id"])]
+
+
+class TestRelatedIndex:
+    """Test neighbor lists and their incremental maintenance."""
+
+    @pytest.fixture
+    def posts(self):
+        return {
+            "async": make_post("파이썬 비동기 프로그래밍", "asyncio 이벤트 루프와 코루틴", ["python"]),
+            "tutorial": make_post("파이썬 asyncio 입문", "코루틴과 이벤트 루프 기초", ["python"]),
+            "react": make_post("React 훅 정리", "useEffect와 상태 관리", ["frontend"]),
+            "vue": make_post("Vue 상태 관리", "컴포넌트와 반응성", ["frontend"]),
+        }
+
+    def build(self, posts):
+        index = RelatedIndex(k=2)
+        for post in posts.values():
+            index.index_post(post)
+        return index
+
+    def test_ranks_similar_posts_first(self, posts):
+        """Test shared Hangul/English terms and tags decide the neighbors."""
+        index = self.build(posts)
+
+        assert related_ids(index, posts["async"])[0] == str(posts["tutorial"]["_id"])
+        assert related_ids(index, posts["react"])[0] == str(posts["vue"]["_id"])
+        assert all(score > 0 for _, score in index.related(posts["async"]["_id"]))
+
+    def test_tags_alone_relate_posts(self, posts):
+        """Test posts with no words in common are related through a tag."""
+        index = self.build(posts)
+        cooking = make_post("김치찌개", "돼지고기 두부", ["frontend"])
+        index.index_post(cooking)
+
+        assert set(related_ids(index, cooking)) == {str(posts["react"]["_id"]), str(posts["vue"]["_id"])}
+
+    def test_incremental_updates(self, posts):
+        """Test edits, unpublishing and deletes repair other posts' lists."""
+        index = self.build(posts)
+        vue_id = str(posts["vue"]["_id"])
+        assert vue_id in related_ids(index, posts["react"])
+
+        posts["vue"]["is_published"] = False
+        index.index_post(posts["vue"])
+        assert posts["vue"]["_id"] not in index
+        assert vue_id not in related_ids(index, posts["react"])
+
+        posts["vue"].update(is_published=True, title="asyncio 코루틴", content="파이썬 이벤트 루프", tags=["python"])
+        index.index_post(posts["vue"])
+        assert vue_id in related_ids(index, posts["async"])
+        assert vue_id not in related_ids(index, posts["react"])
+
+        index.remove_post(vue_id)
+        assert vue_id not in related_ids(index, posts["async"])
+        assert not index.referrers.get(vue_id)
+
+    async def test_rebuild_replays_concurrent_writes(self, posts):
+        """Test writes made while a rebuild runs survive the swap."""
+        db = AsyncMongoMockClient()["test_related_rebuild"]
+        await db.posts.insert_many(list(posts.values()))
+        index = RelatedIndex(k=2)
+        late = make_post("파이썬 코루틴 심화", "asyncio 이벤트 루프", ["python"])
+
+        original_build = index._build_terms
+
+        def build_then_write(terms):
+            fresh = original_build(terms)
+            index.index_post(late)
+            return fresh
+
+        index._build_terms = build_then_write
+        await index.rebuild(db)
+
+        assert index.ready and len(index) == 5
+        assert str(late["_id"]) in related_ids(index, posts["tutorial"]) + related_ids(index, posts["async"])
+
+
+    async def test_rebuild_reads_in_batches(self, posts, monkeypatch):
+        """Test a rebuild reduces posts to term counts one batch at a time."""
+        monkeypatch.setattr(related_module, "REBUILD_BATCH_SIZE", 3)
+        db = AsyncMongoMockClient()["test_related_batches"]
+        await db.posts.insert_many(list(posts.values()) + [make_post(f"extra {i}", "asyncio") for i in range(3)])
+        batches = []
+        batch_terms = related_module.batch_terms
+
+        def tracked_batch_terms(batch):
+            batches.append(len(batch))
+            return batch_terms(batch)
+
+        monkeypatch.setattr(related_module, "batch_terms", tracked_batch_terms)
+        index = RelatedIndex(k=2)
+
+        await index.rebuild(db)
+
+        assert batches == [3, 3, 1]
+        assert len(index) == 7
+        assert related_ids(index, posts["async"])[0] == str(posts["tutorial"]["_id"])
+
+    def test_common_words_are_skipped(self):
+        """Test words in most posts stay out of the vectors while tags always count."""
+        index = RelatedIndex(k=3, max_df=0.5)
+        posts = [make_post(f"블로그 글 {i}", "블로그 일상", ["daily"]) for i in range(30)]
+        fresh = index._build(posts)
+
+        assert "블로그" not in fresh.postings
+        assert "#daily" in fresh.postings
+        assert len(fresh.related(posts[0]["_id"])) == 3
+
+    def test_postings_scan_is_capped(self):
+        """Test a popular term only offers its newest posts as candidates."""
+        index = RelatedIndex(k=10, max_postings=5)
+        posts = [make_post(f"post {i}", f"unique{i}", ["python"]) for i in range(20)]
+        fresh = index._build(posts)
+
+        newest = {str(post["_id"]) for post in posts[-6:]}
+        assert set(related_ids(fresh, posts[0])) <= newest
+
+    async def test_concurrent_first_use_builds_once(self, posts):
+        """Test concurrent first requests share one background build."""
+        db = AsyncMongoMockClient()["test_related_once"]
+        await db.posts.insert_many(list(posts.values()))
+        index = RelatedIndex(k=2)
+        builds = []
+        original_build = index._build_terms
+        index._build_terms = lambda terms: builds.append(1) or original_build(terms)
+
+        assert [await index.ensure_ready(db) for _ in range(5)] == [False] * 5
+        await index.wait()
+
+        assert builds == [1]
+        assert await index.ensure_ready(db)
+        assert related_ids(index, posts["async"])[0] == str(posts["tutorial"]["_id"])
+
+
+class TestRelatedEndpoint:
+    """Test /posts/public/{id}/related."""
+
+    @pytest.fixture
+    async def related_client(self, api_client):
+        related_index.clear()
+        related_index.ready = False
+        related_index._task = None
+        yield api_client
+        related_index.clear()
+        related_index.ready = False
+
+    async def test_related_cards_in_rank_order(self, related_client):
+        """Test the index is built in the background on first use and cards follow the ranking."""
+        client, db = related_client
+        now = datetime.utcnow()
+        posts = [
+            make_post("파이썬 비동기", "asyncio 코루틴", ["python"]),
+            make_post("파이썬 asyncio", "코루틴 입문", ["python"]),
+            make_post("요리", "김치찌개"),
+            make_post("파이썬 초안", "asyncio 코루틴", ["python"], is_published=False),
+        ]
+        for post in posts:
+            post.update(created_at=now, updated_at=now, view_count=0)
+        await db.posts.insert_many(posts)
+
+        building = await client.get(f"/api/v1/posts/public/{posts[0]['_id']}/related")
+        assert building.status_code == 200 and building.json() == []
+        await related_index.wait()
+
+        response = await client.get(f"/api/v1/posts/public/{posts[0]['_id']}/related")
+        assert response.status_code == 200
+        items = response.json()
+        assert [item["id"] for item in items] == [str(posts[1]["_id"])]
+        assert "content" not in items[0]
+
+        unpublished = await client.get(f"/api/v1/posts/public/{posts[3]['_id']}/related")
+        assert unpublished.status_code == 404
+        assert (await client.get("/api/v1/posts/public/invalid/related")).status_code == 400
+
+    async def test_new_posts_show_up(self, related_client):
+        """Test a created post appears in cached related lists right away."""
+        client, _ = related_client
+        first = (await client.post("/api/v1/posts/", json={
+            "title": "파이썬 비동기", "content": "asyncio 코루틴", "tags": ["python"], "is_published": True
+        })).json()
+        assert (await client.get(f"/api/v1/posts/public/{first['id']}/related")).json() == []
+        await related_index.wait()
+
+        second = (await client.post("/api/v1/posts/", json={
+            "title": "파이썬 asyncio", "content": "코루틴", "tags": ["python"], "is_published": True
+        })).json()
+        related = (await client.get(f"/api/v1/posts/public/{first['id']}/related")).json()
+        assert [item["id"] for item in related] == [second["id"]]
+
+        await client.delete(f"/api/v1/posts/{second['id']}")
+        assert (await client.get(f"/api/v1/posts/public/{first['id']}/related")).json() == []
+
+    async def test_deleted_tag_leaves_vectors(self, related_client):
+        """Test posts related only through a deleted tag stop being related."""
+        client, _ = related_client
+        tag = (await client.post("/api/v1/tags/", json={"name": "python"})).json()
+        first, second = [(await client.post("/api/v1/posts/", json={
+            "title": title, "content": content, "tags": ["python"], "is_published": True
+        })).json() for title, content in (("김치찌개", "돼지고기"), ("React", "useEffect"))]
+        await client.get(f"/api/v1/posts/public/{first['id']}/related")
+        await related_index.wait()
+        related = (await client.get(f"/api/v1/posts/public/{first['id']}/related")).json()
+        assert [item["id"] for item in related] == [second["id"]]
+
+        await client.delete(f"/api/v1/tags/{tag['id']}")
+        assert (await client.get(f"/api/v1/posts/public/{first['id']}/related")).json() == []
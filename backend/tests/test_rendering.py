@@ -0,0 +1,108 @@
+"""Tests for server-side markdown rendering."""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from mongomock_motor import AsyncMongoMockClient
+
+from core.rendering import content_hash, render_markdown, rendered_fields, rerender_stale_posts
+
+
+class TestRenderMarkdown:
+    """Test sanitized markdown rendering."""
+
+    def test_renders_common_markdown(self):
+        """Test headings, fenced code and tables are rendered."""
+        html = render_markdown("# 제목\n\n```py\nx = 1\n```\n\n| a |\n|---|\n| 1 |")
+
+        assert "<h1>제목</h1>" in html
+        assert '<code class="language-py">' in html
+        assert "<table>" in html
+
+    def test_raw_html_is_escaped(self):
+        """Test raw HTML blocks and inline tags are escaped, not passed through."""
+        html = render_markdown("<script>alert(1)</script>\n\ntext <img src=x onerror=alert(1)>")
+
+        assert "<script>" not in html
+        assert "<img" not in html
+        assert "&lt;script&gt;" in html
+
+    def test_unsafe_urls_are_dropped(self):
+        """Test javascript: links lose their href while http links keep it."""
+        html = render_markdown("[bad](javascript:alert(1)) [good](https://example.com)")
+
+        assert "javascript" not in html
+        assert 'href="https://example.com"' in html
+
+    @pytest.mark.parametrize("url", [
+        "&#106;avascript:alert(1)",
+        "&#x6A;avascript:alert(1)",
+        "javascript&colon;alert(1)",
+        "JaVaScRiPt:alert(1)",
+        "java&#x09;script:alert(1)",
+        "&#x01;javascript:alert(1)",
+    ])
+    def test_encoded_unsafe_urls_are_dropped(self, url):
+        """Test entity-encoded, mixed-case and control-padded schemes are caught."""
+        html = render_markdown(f"[bad]({url}) ![img]({url})")
+
+        assert "href" not in html
+        assert "src" not in html
+
+    async def test_stale_html_rerendered(self):
+        """Test HTML stored by an older renderer is replaced."""
+        db = AsyncMongoMockClient()["test_rerender"]
+        await db.posts.insert_many([
+            {"content": "[x](&#106;avascript:1)", "content_html": '<a href="&#106;avascript:1">x</a>',
+             "content_hash": "old"},
+            {"content": "# a", **rendered_fields("# a")},
+        ])
+
+        assert await rerender_stale_posts(db) == 1
+        stale = await db.posts.find_one({"content_hash": content_hash("[x](&#106;avascript:1)")})
+        assert "href" not in stale["content_html"]
+
+    def test_concurrent_renders(self):
+        """Test threads rendering at the same time each get their own output."""
+        contents = [f"# Title {i}\n\n" + f"paragraph {i} with **bold** text\n\n" * 50 for i in range(8)]
+        expected = [render_markdown(content) for content in contents]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            rendered = list(executor.map(render_markdown, contents * 30))
+
+        assert rendered == expected * 30
+
+    def test_unchanged_content_is_not_rerendered(self):
+        """Test rendered_fields skips work when the stored hash matches."""
+        fields = rendered_fields("# a")
+
+        assert fields["content_hash"] == content_hash("# a")
+        assert rendered_fields("# a", fields["content_hash"]) == {}
+        assert rendered_fields("# b", fields["content_hash"])["content_html"] == "<h1>b</h1>"
+
+
+class TestHtmlFormat:
+    """Test serving pre-rendered HTML from the public post endpoint."""
+
+    @pytest.fixture
+    async def html_client(self, api_client):
+        client, db = api_client
+        now = datetime.utcnow()
+        result = await db.posts.insert_one({
+            "title": "Legacy", "content": "**bold**", "summary": None, "tags": [],
+            "is_published": True, "created_at": now, "updated_at": now, "view_count": 0
+        })
+        return client, db, result.inserted_id
+
+    async def test_format_html_renders_and_stores(self, html_client):
+        """Test posts without stored HTML are rendered once and persisted."""
+        client, db, post_id = html_client
+
+        html = await client.get(f"/api/v1/posts/public/{post_id}", params={"format": "html"})
+        markdown = await client.get(f"/api/v1/posts/public/{post_id}")
+
+        assert html.json()["content_html"] == "<p><strong>bold</strong></p>"
+        assert html.json()["content"] is None
+        assert markdown.json()["content"] == "**bold**"
+        assert markdown.json()["content_html"] is None
+        assert html.headers["etag"] != markdown.headers["etag"]
+        assert (await db.posts.find_one({"_id": post_id}))["content_html"] == "<p><strong>bold</strong></p>"
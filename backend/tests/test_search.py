@@ -0,0 +1,187 @@
+"""Tests for the full-text search index."""
+import asyncio
+import pytest
+from datetime import datetime
+from mongomock_motor import AsyncMongoMockClient
+
+from core import search as search_module
+from core.search import SearchIndex, highlight, search_index, tokenize
+
+
+def make_post(doc_id, title, content="", summary="", is_published=True):
+    return {
+        "_id": doc_id,
+        "title": title,
+        "content": content,
+        "summary": summary,
+        "is_published": is_published
+    }
+
+
+class TestTokenizer:
+    """Test Hangul-aware tokenization."""
+
+    def test_latin_words_lowercased(self):
+        """Test Latin text is split into lowercase words."""
+        assert tokenize("FastAPI and MongoDB 7.0") == ["fastapi", "and", "mongodb", "7", "0"]
+
+    def test_hangul_bigrams(self):
+        """Test Hangul runs become overlapping bigrams."""
+        assert tokenize("파이썬으로") == ["파이", "이썬", "썬으", "으로"]
+
+    def test_mixed_script(self):
+        """Test mixed Korean/English text splits at script boundaries."""
+        assert tokenize("React로 웹") == ["react", "로", "웹"]
+
+    def test_empty(self):
+        """Test empty input yields no tokens."""
+        assert tokenize(None) == []
+        assert tokenize("  ") == []
+
+
+class TestSearchIndex:
+    """Test indexing, ranking and highlighting."""
+
+    @pytest.fixture
+    def index(self):
+        index = SearchIndex()
+        index.index_post(make_post("1", "FastAPI 튜토리얼", "파이썬으로 웹 서버를 만듭니다"))
+        index.index_post(make_post("2", "React 입문", "자바스크립트 프론트엔드 개발", "빠른 시작"))
+        index.index_post(make_post("3", "데이터베이스", "MongoDB와 파이썬 연동, 파이썬 드라이버"))
+        return index
+
+    def test_hangul_query_matches_substring(self, index):
+        """Test a Korean word matches posts containing it inside longer words."""
+        assert {doc_id for doc_id, _ in index.search("파이썬")} == {"1", "3"}
+
+    def test_all_terms_required(self, index):
+        """Test every query term must match."""
+        assert [doc_id for doc_id, _ in index.search("파이썬 mongodb")] == ["3"]
+
+    def test_prefix_matching(self, index):
+        """Test the last query word matches as a prefix."""
+        assert [doc_id for doc_id, _ in index.search("fast")] == ["1"]
+        assert [doc_id for doc_id, _ in index.search("튜토")] == ["1"]
+
+    def test_title_matches_rank_higher(self):
+        """Test title matches outrank body matches via field weights."""
+        index = SearchIndex()
+        index.index_post(make_post("body", "Notes", "a long post about python and other things"))
+        index.index_post(make_post("title", "Python", "a long post about other things entirely"))
+
+        assert [doc_id for doc_id, _ in index.search("python")] == ["title", "body"]
+
+    def test_incremental_updates(self, index):
+        """Test reindexing, unpublishing and removal keep postings in sync."""
+        index.index_post(make_post("2", "Vue 입문", "자바스크립트"))
+        assert index.search("react") == []
+        assert [doc_id for doc_id, _ in index.search("vue")] == ["2"]
+
+        index.index_post(make_post("1", "FastAPI 튜토리얼", "", is_published=False))
+        assert {doc_id for doc_id, _ in index.search("파이썬")} == {"3"}
+
+        index.remove_post("3")
+        assert index.search("파이썬") == []
+        assert "mongodb" not in index.postings
+        assert len(index) == 1
+
+    def test_highlight_escapes_html(self):
+        """Test highlights escape markup and wrap matches."""
+        marked = highlight(make_post("1", "<Fast> API", "use <b>fast</b> paths"), "fast")
+
+        assert marked["title"] == "&lt;<mark>Fast</mark>&gt; API"
+        assert marked["snippet"] == "use &lt;b&gt;<mark>fast</mark>&lt;/b&gt; paths"
+
+    async def test_rebuild_off_loop_and_shared(self, monkeypatch):
+        """Test concurrent first uses share one batched rebuild and keep writes made meanwhile."""
+        monkeypatch.setattr(search_module, "REBUILD_BATCH_SIZE", 2)
+        db = AsyncMongoMockClient()["test_search_rebuild"]
+        await db.posts.insert_many([
+            {"_id": str(i), "title": f"post {i}", "summary": None, "content": "asyncio", "is_published": True}
+            for i in range(5)
+        ])
+        index = SearchIndex()
+        batches = []
+        late = make_post("late", "asyncio late", "")
+        real_index_posts = SearchIndex.index_posts
+
+        def tracked_index_posts(self, posts):
+            batches.append(len(posts))
+            real_index_posts(self, posts)
+            if len(batches) == 1:
+                index.index_post(late)
+
+        monkeypatch.setattr(SearchIndex, "index_posts", tracked_index_posts)
+        await asyncio.gather(*(index.ensure_ready(db) for _ in range(4)))
+
+        assert index.ready
+        assert batches == [2, 2, 1]
+        assert len(index) == 6
+        assert {doc_id for doc_id, _ in index.search("asyncio")} == {"0", "1", "2", "3", "4", "late"}
+
+
+class TestSearchEndpoint:
+    """Test the /posts/search endpoint."""
+
+    @pytest.fixture
+    async def search_client(self, api_client):
+        client, db = api_client
+        now = datetime.utcnow()
+        for title, content, is_published in [
+            ("파이썬 비동기", "asyncio와 파이썬", True),
+            ("파이썬 초안", "파이썬 draft", False),
+            ("React", "프론트엔드", True),
+        ]:
+            await db.posts.insert_one({
+                "title": title, "content": content, "summary": None, "tags": [],
+                "is_published": is_published, "created_at": now, "updated_at": now, "view_count": 0
+            })
+        search_index.clear()
+        search_index.ready = False
+        search_index._task = None
+        search_index._failed_at = None
+        yield client
+        search_index.clear()
+        search_index.ready = False
+        search_index._failed_at = None
+
+    async def test_search_returns_ranked_published_posts(self, search_client):
+        """Test search only returns published posts with highlights."""
+        response = await search_client.get("/api/v1/posts/search", params={"q": "파이썬"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        item = data["items"][0]
+        assert item["title"] == "파이썬 비동기"
+        assert item["highlighted_title"] == "<mark>파이썬</mark> 비동기"
+        assert item["score"] > 0
+
+    async def test_public_list_search_uses_index(self, search_client):
+        """Test the public list search parameter is served from the index."""
+        response = await search_client.get("/api/v1/posts/public", params={"search": "프론트"})
+
+        assert response.status_code == 200
+        assert [item["title"] for item in response.json()["items"]] == ["React"]
+
+    async def test_failed_build_backs_off_to_filter(self, search_client, monkeypatch):
+        """Test a failed build is not retried per request and searches fall back to a filter."""
+        builds = []
+
+        async def failing_rebuild(db):
+            builds.append(1)
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(search_index, "rebuild", failing_rebuild)
+        first = (await search_client.get("/api/v1/posts/search", params={"q": "파이썬"})).json()
+        listed = (await search_client.get("/api/v1/posts/public", params={"search": "프론트"})).json()
+
+        assert builds == [1]
+        assert first["total"] == 1
+        assert first["items"][0]["highlighted_title"] == "<mark>파이썬</mark> 비동기"
+        assert first["items"][0]["score"] == 0
+        assert [item["title"] for item in listed["items"]] == ["React"]
+
+        monkeypatch.setattr(search_module, "REBUILD_RETRY_SECONDS", 0)
+        await search_client.get("/api/v1/posts/search", params={"q": "asyncio"})
+        assert builds == [1, 1]
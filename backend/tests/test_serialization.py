@@ -0,0 +1,48 @@
+"""Tests for the orjson response serializer."""
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from core.serialization import ORJSONResponse, dumps
+from schemas.blog import PostListResponse
+
+
+class TestDumps:
+    """Test serialization of Mongo and model values."""
+
+    def test_mongo_types(self):
+        """Test ObjectIds become strings, datetimes ISO 8601 and int keys strings."""
+        oid = ObjectId()
+        payload = {"_id": oid, "at": datetime(2024, 1, 2, 3, 4, 5, 600000), "ids": {oid}, 1: "key"}
+
+        assert json.loads(dumps(payload)) == {
+            "_id": str(oid), "at": "2024-01-02T03:04:05.600000", "ids": [str(oid)], "1": "key"
+        }
+
+    def test_matches_jsonable_encoder(self):
+        """Test constructed models serialize exactly like the validated ones did."""
+        fields = {
+            "id": str(ObjectId()), "title": "제목", "tags": ["a"], "is_published": True,
+            "created_at": datetime(2024, 5, 1, 12, 0), "views": 3, "category": {"id": "x", "name": "기술"}
+        }
+        constructed = PostListResponse.model_construct(**fields)
+        validated = PostListResponse(**fields)
+
+        assert json.loads(dumps({"items": [constructed]})) == jsonable_encoder({"items": [validated]})
+        assert "제목".encode("utf-8") in dumps(constructed)
+
+    def test_unknown_type_rejected(self):
+        """Test unsupported values raise instead of being silently dropped."""
+        with pytest.raises(TypeError):
+            dumps({"value": object()})
+
+    def test_response_class(self):
+        """Test the response class renders with dumps."""
+        oid = ObjectId()
+        response = ORJSONResponse({"id": oid})
+
+        assert response.body == dumps({"id": oid})
+        assert response.media_type == "application/json"
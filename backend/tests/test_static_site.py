@@ -0,0 +1,93 @@
+"""Tests for the static site exporter."""
+import json
+import os
+import pytest
+from datetime import datetime, timedelta
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from core import static_site
+from core.static_site import export_site
+
+
+@pytest.fixture
+async def site_db():
+    db = AsyncMongoMockClient()["test_static_site"]
+    dev = ObjectId()
+    await db.categories.insert_one({"_id": dev, "name": "dev", "description": None, "created_at": datetime(2024, 1, 1)})
+    await db.tags.insert_one({"name": "python", "created_at": datetime(2024, 1, 1)})
+    start = datetime(2024, 1, 1)
+    await db.posts.insert_many([
+        {
+            "title": f"글 {i}", "content": f"본문 {i}", "content_html": f"<p>본문 {i}</p>", "summary": None,
+            "excerpt": f"본문 {i}", "category_id": dev if i % 2 == 0 else None, "tags": ["python"] if i < 2 else [],
+            "featured_image": None, "is_published": i != 4, "created_at": start + timedelta(days=i),
+            "updated_at": start + timedelta(days=i), "view_count": i
+        }
+        for i in range(5)
+    ])
+    return db, dev
+
+
+def read_json(out_dir, path):
+    with open(os.path.join(out_dir, path)) as f:
+        return json.load(f)
+
+
+class TestStaticExport:
+    """Test rendered files and incremental runs."""
+
+    async def test_full_export(self, site_db, tmp_path):
+        """Test posts, listings, categories and tags are written in the API shapes."""
+        db, dev = site_db
+        summary = await export_site(db, str(tmp_path), page_size=2, workers=0)
+        assert summary["posts"] == summary["posts_written"] == 4
+
+        index = read_json(tmp_path, "page/1.json")
+        assert [item["title"] for item in index["items"]] == ["글 3", "글 2"]
+        assert (index["total"], index["pages"], index["page"]) == (4, 2, 1)
+        assert "content" not in index["items"][0]
+        assert index["items"][1]["category"]["name"] == "dev"
+        assert (tmp_path / "index.html").read_text() == (tmp_path / "page/1.html").read_text()
+
+        post_id = index["items"][1]["id"]
+        post = read_json(tmp_path, f"posts/{post_id}.json")
+        assert post["content"] == "본문 2"
+        assert "<p>본문 2</p>" in (tmp_path / f"posts/{post_id}.html").read_text()
+
+        assert [item["title"] for item in read_json(tmp_path, f"category/{dev}/1.json")["items"]] == ["글 2", "글 0"]
+        assert read_json(tmp_path, "tag/python/1.json")["total"] == 2
+
+    async def test_incremental_runs(self, site_db, tmp_path):
+        """Test later runs only rewrite changed posts and the pages listing them."""
+        db, _ = site_db
+        await export_site(db, str(tmp_path), page_size=2, workers=0)
+
+        unchanged = await export_site(db, str(tmp_path), page_size=2, workers=0)
+        assert unchanged["posts_written"] == unchanged["pages_written"] == 0
+
+        oldest = await db.posts.find_one({"title": "글 0"})
+        await db.posts.update_one(
+            {"_id": oldest["_id"]}, {"$set": {"title": "수정", "updated_at": datetime(2024, 2, 1)}}
+        )
+        edited = await export_site(db, str(tmp_path), page_size=2, workers=0)
+        # page/2, the category page and the tag page hold the post
+        assert (edited["posts_written"], edited["pages_written"]) == (1, 3)
+        assert read_json(tmp_path, "page/2.json")["items"][1]["title"] == "수정"
+
+        await db.posts.delete_one({"_id": oldest["_id"]})
+        removed = await export_site(db, str(tmp_path), page_size=2, workers=0)
+        assert removed["posts_removed"] == 1
+        assert not (tmp_path / f"posts/{oldest['_id']}.json").exists()
+        assert read_json(tmp_path, "page/2.json")["items"][0]["title"] == "글 1"
+
+    async def test_process_pool(self, site_db, tmp_path, monkeypatch):
+        """Test rendering through worker processes writes the same files."""
+        db, _ = site_db
+        monkeypatch.setattr(static_site, "CHUNK_SIZE", 2)
+        summary = await export_site(db, str(tmp_path), page_size=2, workers=2)
+
+        manifest = read_json(tmp_path, "manifest.json")
+        assert len(manifest["posts"]) == summary["posts"] == 4
+        for key in manifest["pages"]:
+            assert (tmp_path / f"{key}.json").exists()
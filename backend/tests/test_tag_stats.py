@@ -0,0 +1,90 @@
+"""Tests for maintained popular tag counts."""
+from datetime import datetime
+
+from api.v1.routers import tags as tags_router
+from core import tag_stats
+
+
+async def counts(db):
+    return {stat["_id"]: stat["count"] async for stat in db.tag_stats.find({})}
+
+
+class TestTagStats:
+    """Test counts follow post writes."""
+
+    async def test_post_lifecycle(self, api_client):
+        """Test create, tag edits, publish toggles and delete adjust counts."""
+        client, db = api_client
+
+        draft = (await client.post("/api/v1/posts/", json={"title": "a", "content": "x", "tags": ["py"]})).json()
+        published = (await client.post("/api/v1/posts/", json={
+            "title": "b", "content": "y", "tags": ["py", "go"], "is_published": True
+        })).json()
+        assert await counts(db) == {"py": 1, "go": 1}
+
+        await client.put(f"/api/v1/posts/{draft['id']}", json={"is_published": True})
+        assert await counts(db) == {"py": 2, "go": 1}
+
+        await client.put(f"/api/v1/posts/{published['id']}", json={"tags": ["py", "rust"]})
+        assert await counts(db) == {"py": 2, "rust": 1}
+
+        await client.put(f"/api/v1/posts/{draft['id']}", json={"is_published": False})
+        await client.delete(f"/api/v1/posts/{published['id']}")
+        assert await counts(db) == {}
+
+    async def test_popular_and_delete_tag(self, api_client):
+        """Test /tags/popular reads the counts and delete_tag drops the tag."""
+        client, db = api_client
+        for tags in (["py", "go"], ["py"]):
+            await client.post("/api/v1/posts/", json={"title": "t", "content": "c", "tags": tags, "is_published": True})
+        tag = (await client.post("/api/v1/tags/", json={"name": "go"})).json()
+
+        popular = (await client.get("/api/v1/tags/popular")).json()
+        assert popular == [{"name": "py", "count": 2}, {"name": "go", "count": 1}]
+
+        await client.delete(f"/api/v1/tags/{tag['id']}")
+        assert (await client.get("/api/v1/tags/popular")).json() == [{"name": "py", "count": 2}]
+
+    async def test_delete_tag_keeps_remaining_uses(self, api_client, monkeypatch):
+        """Test deleting a tag leaves the count a rebuild would give for posts still using it"""
+        client, db = api_client
+        await client.post("/api/v1/posts/", json={"title": "t", "content": "c", "tags": ["go"], "is_published": True})
+        tag = (await client.post("/api/v1/tags/", json={"name": "go"})).json()
+
+        # A post tagged while the delete runs, after the $pull
+        async def tag_then_refresh(db, name):
+            await db.posts.insert_one({"tags": [name], "is_published": True, "updated_at": datetime(2024, 1, 1)})
+            await tag_stats.refresh_tag(db, name)
+
+        monkeypatch.setattr(tags_router, "refresh_tag", tag_then_refresh)
+        await client.delete(f"/api/v1/tags/{tag['id']}")
+
+        refreshed = await counts(db)
+        await tag_stats.rebuild_tag_stats(db)
+        assert refreshed == await counts(db) == {"go": 1}
+
+    async def test_rebuild_matches_posts(self, api_client):
+        """Test the rebuild replaces drifted counts and removes stale tags."""
+        _, db = api_client
+        used_at = datetime(2024, 2, 1)
+        await db.posts.insert_many([
+            {"tags": ["py", "go"], "is_published": True, "updated_at": used_at},
+            {"tags": ["py"], "is_published": True, "updated_at": datetime(2024, 1, 1)},
+            {"tags": ["draft"], "is_published": False, "updated_at": used_at}
+        ])
+        await db.tag_stats.insert_many([{"_id": "py", "count": 99}, {"_id": "stale", "count": 3}])
+
+        assert await tag_stats.rebuild_tag_stats(db) == 2
+        assert await counts(db) == {"py": 2, "go": 1}
+        assert (await db.tag_stats.find_one({"_id": "py"}))["last_used_at"] == used_at
+
+    async def test_ensure_builds_once(self, api_client):
+        """Test startup only rebuilds when the collection is empty."""
+        _, db = api_client
+        await db.posts.insert_one({"tags": ["py"], "is_published": True, "updated_at": datetime(2024, 1, 1)})
+
+        await tag_stats.ensure_tag_stats(db)
+        await db.posts.insert_one({"tags": ["go"], "is_published": True, "updated_at": datetime(2024, 1, 1)})
+        await tag_stats.ensure_tag_stats(db)
+
+        assert await counts(db) == {"py": 1}
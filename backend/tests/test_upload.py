@@ -0,0 +1,392 @@
+"""Tests for streamed uploads."""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from api.v1.routers import upload as upload_router
+from core.config import settings
+from core.images import image_processor
+from core.rendering import render_markdown
+from core import uploads
+from core.uploads import UploadTooLarge, incoming_dir, stream_to_temp
+
+
+def png_bytes(width=40, height=30) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upload_client(monkeypatch, tmp_path, api_client):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    client, _ = api_client
+    return client, tmp_path
+
+
+VARIANT_FILE = re.compile(r"-(\d+w|placeholder)\.\w+$|\.variants\.json$")
+
+
+def stored_files(upload_dir):
+    """Uploaded originals, leaving out temp files and image variants"""
+    return sorted(
+        name for name in os.listdir(upload_dir) if not name.startswith(".") and not VARIANT_FILE.search(name)
+    )
+
+
+class TestStreamedUpload:
+    """Test uploads are streamed to disk and moved into place."""
+
+    async def test_image_upload(self, upload_client):
+        """Test the file lands in UPLOAD_DIR with nothing left in the temp directory."""
+        client, upload_dir = upload_client
+        body = png_bytes()
+        response = await client.post("/api/v1/upload/image", files={"file": ("a.png", body, "image/png")})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["size"] == len(body)
+        assert data["url"] == f"/uploads/{data['filename']}"
+        assert stored_files(upload_dir) == [data["filename"]]
+        assert os.listdir(incoming_dir()) == []
+
+    async def test_disallowed_type(self, upload_client):
+        """Test unknown extensions are refused before anything is written."""
+        client, upload_dir = upload_client
+        response = await client.post("/api/v1/upload/image", files={"file": ("a.exe", b"MZ", "application/octet-stream")})
+
+        assert response.status_code == 400
+        assert stored_files(upload_dir) == []
+
+    async def test_declared_length_rejected(self, upload_client, monkeypatch):
+        """Test a Content-Length over the limit is refused with a CORS-readable 413."""
+        client, upload_dir = upload_client
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+        response = await client.post(
+            "/api/v1/upload/image", files={"file": ("a.png", b"x" * 50_000, "image/png")},
+            headers={"Origin": settings.ALLOWED_ORIGINS[0]}
+        )
+
+        assert response.status_code == 413
+        # Readable by the frontend: CORS wraps the early rejection
+        assert response.headers["access-control-allow-origin"] == settings.ALLOWED_ORIGINS[0]
+        assert stored_files(upload_dir) == []
+
+    async def test_streamed_body_rejected(self, upload_client, monkeypatch):
+        """Test a body without Content-Length is cut off once it passes the limit."""
+        client, _ = upload_client
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+        boundary = "bound"
+
+        async def body():
+            yield (
+                f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n"
+                "Content-Type: image/png\r\n\r\n"
+            ).encode()
+            for _ in range(10):
+                yield b"x" * 10_000
+            yield f"\r\n--{boundary}--\r\n".encode()
+
+        response = await client.post(
+            "/api/v1/upload/image", content=body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+        assert response.status_code == 413
+
+    async def test_stream_to_temp_stops_at_limit(self, upload_client):
+        """Test the per-file counter raises and removes the partial temp file."""
+        upload = UploadFile(file=io.BytesIO(b"x" * 3000), filename="a.png")
+
+        with pytest.raises(UploadTooLarge):
+            await stream_to_temp(upload, 1000)
+        assert os.listdir(incoming_dir()) == []
+
+    async def test_multiple_isolates_failures(self, upload_client, monkeypatch):
+        """Test each file gets its own result and oversized files fail alone."""
+        client, upload_dir = upload_client
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 2000)
+        response = await client.post("/api/v1/upload/multiple", files=[
+            ("files", ("a.png", png_bytes(), "image/png")),
+            ("files", ("b.txt", b"text", "text/plain")),
+            ("files", ("c.png", b"x" * 3000, "image/png")),
+        ])
+
+        results = response.json()
+        assert [result["success"] for result in results] == [True, False, False]
+        assert results[1]["error"] == "File type not allowed"
+        assert results[2]["error"].startswith("File too large")
+        assert stored_files(upload_dir) == [results[0]["filename"]]
+
+
+class TestImageProcessing:
+    """Test images get responsive variants from the worker pool, falling back to the original."""
+
+    async def test_variants_generated(self, upload_client):
+        """Test the original is kept and WebP widths plus a placeholder are stored beside it."""
+        client, upload_dir = upload_client
+        completed = image_processor.completed
+        body = png_bytes(1000, 500)
+        response = await client.post("/api/v1/upload/image", files={"file": ("big.png", body, "image/png")})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert (upload_dir / data["filename"]).read_bytes() == body
+        variants = data["variants"]
+        assert (variants["width"], variants["height"]) == (1000, 500)
+        assert [entry["width"] for entry in variants["webp"]] == [320, 640, 960, 1000]
+        assert variants["webp"][0]["height"] == 160
+        assert variants["srcset"]["webp"].startswith(f"{variants['webp'][0]['url']} 320w, ")
+        assert variants["placeholder"]["data_uri"].startswith("data:image/webp;base64,")
+        for entry in variants["webp"] + [variants["placeholder"]]:
+            with Image.open(upload_dir / entry["url"].rsplit("/", 1)[1]) as img:
+                assert img.format == "WEBP"
+        assert image_processor.completed == completed + 1
+        assert os.listdir(incoming_dir()) == []
+
+    async def test_transparency_kept(self, upload_client):
+        """Test variants of a transparent PNG keep their alpha channel."""
+        client, upload_dir = upload_client
+        buffer = io.BytesIO()
+        Image.new("RGBA", (400, 200), (255, 0, 0, 0)).save(buffer, "PNG")
+        response = await client.post(
+            "/api/v1/upload/image", files={"file": ("clear.png", buffer.getvalue(), "image/png")}
+        )
+
+        variant = response.json()["variants"]["webp"][0]["url"].rsplit("/", 1)[1]
+        with Image.open(upload_dir / variant) as img:
+            assert img.mode == "RGBA"
+
+    async def test_post_html_srcset(self, upload_client):
+        """Test rendered markdown points uploaded images at their variants."""
+        client, upload_dir = upload_client
+        response = await client.post(
+            "/api/v1/upload/image", files={"file": ("big.png", png_bytes(1000, 500), "image/png")}
+        )
+        data = response.json()
+
+        html = render_markdown(f"![diagram]({data['url']})")
+        assert f'srcset="{data["variants"]["srcset"]["webp"]}"' in html
+        assert 'width="1000"' in html and 'loading="lazy"' in html
+        assert "srcset" not in render_markdown("![missing](/uploads/missing.png)")
+
+    async def test_delete_removes_variants(self, upload_client):
+        """Test deleting an upload removes its variants and sidecar."""
+        client, upload_dir = upload_client
+        response = await client.post(
+            "/api/v1/upload/image", files={"file": ("big.png", png_bytes(1000, 500), "image/png")}
+        )
+        filename = response.json()["filename"]
+
+        response = await client.delete(f"/api/v1/upload/{filename}")
+        assert response.status_code == 200
+        assert [name for name in os.listdir(upload_dir) if not name.startswith(".")] == []
+
+    async def test_timeout_keeps_original(self, upload_client, monkeypatch):
+        """Test a job that outlives the timeout leaves the original without variants."""
+        client, upload_dir = upload_client
+        monkeypatch.setattr(image_processor, "timeout", 0.000001)
+        timeouts = image_processor.timeouts
+        body = png_bytes(2400, 1000)
+        response = await client.post("/api/v1/upload/image", files={"file": ("big.png", body, "image/png")})
+        assert response.status_code == 200
+
+        assert response.json()["variants"] == {}
+        assert (upload_dir / response.json()["filename"]).read_bytes() == body
+        assert image_processor.timeouts == timeouts + 1
+
+    async def test_full_queue_keeps_original(self, upload_client, monkeypatch):
+        """Test a full queue rejects the job instead of making the request wait."""
+        client, upload_dir = upload_client
+        monkeypatch.setattr(image_processor, "max_queue", 0)
+        body = png_bytes(2400, 1000)
+        response = await client.post("/api/v1/upload/image", files={"file": ("big.png", body, "image/png")})
+        assert response.status_code == 200
+        assert response.json()["variants"] == {}
+        assert stored_files(upload_dir) == [response.json()["filename"]]
+        assert os.listdir(incoming_dir()) == []
+
+        stats = (await client.get("/api/v1/system/images")).json()
+        assert stats["rejected"] >= 1
+        assert stats["max_queue"] == 0
+        assert set(stats["processing_ms"]) == {"mean", "p50", "p95", "max"}
+
+
+class TestContentAddressedStorage:
+    """Test uploads are stored by content hash and reference counted."""
+
+    async def test_named_by_hash(self, upload_client):
+        """Test the stored name is the SHA-256 of the bytes."""
+        client, upload_dir = upload_client
+        body = png_bytes()
+        response = await client.post("/api/v1/upload/image", files={"file": ("a.png", body, "image/png")})
+
+        data = response.json()
+        assert data["filename"] == f"{hashlib.sha256(body).hexdigest()}.png"
+        assert data["deduplicated"] is False
+
+    async def test_repeat_upload_reuses_file(self, upload_client, mock_db):
+        """Test the same bytes under another name return the stored file without processing."""
+        client, upload_dir = upload_client
+        body = png_bytes(1000, 500)
+        first = (await client.post("/api/v1/upload/image", files={"file": ("a.png", body, "image/png")})).json()
+        submitted = image_processor.submitted
+        second = (await client.post("/api/v1/upload/image", files={"file": ("copy.png", body, "image/png")})).json()
+
+        assert second["url"] == first["url"]
+        assert second["variants"] == first["variants"]
+        assert second["deduplicated"] is True
+        assert second["original_filename"] == "copy.png"
+        assert image_processor.submitted == submitted
+        assert stored_files(upload_dir) == [first["filename"]]
+        record = await mock_db.uploads.find_one({"filename": first["filename"]})
+        assert record["ref_count"] == 2
+
+    async def test_delete_waits_for_last_reference(self, upload_client, mock_db):
+        """Test bytes and variants stay until every reference is deleted."""
+        client, upload_dir = upload_client
+        body = png_bytes(1000, 500)
+        for name in ("a.png", "b.png"):
+            data = (await client.post("/api/v1/upload/image", files={"file": (name, body, "image/png")})).json()
+
+        assert (await client.delete(f"/api/v1/upload/{data['filename']}")).status_code == 200
+        assert stored_files(upload_dir) == [data["filename"]]
+        assert (upload_dir / data["variants"]["webp"][0]["url"].rsplit("/", 1)[1]).exists()
+
+        assert (await client.delete(f"/api/v1/upload/{data['filename']}")).status_code == 200
+        assert [name for name in os.listdir(upload_dir) if not name.startswith(".")] == []
+        assert await mock_db.uploads.count_documents({}) == 0
+        assert (await client.delete(f"/api/v1/upload/{data['filename']}")).status_code == 404
+
+    async def test_delete_racing_reupload_keeps_file(self, upload_client, mock_db):
+        """Test an upload re-adding the content while its last reference is released keeps the bytes."""
+        client, upload_dir = upload_client
+        body = png_bytes()
+        data = (await client.post("/api/v1/upload/image", files={"file": ("a.png", body, "image/png")})).json()
+        content_hash = hashlib.sha256(body).hexdigest()
+
+        class RacingUploads:
+            def __getattr__(self, name):
+                return getattr(mock_db.uploads, name)
+
+            async def find_one_and_delete(self, *args, **kwargs):
+                await uploads.add_reference(mock_db, content_hash, data["filename"], len(body))
+                return await mock_db.uploads.find_one_and_delete(*args, **kwargs)
+
+        remaining = await uploads.release_reference(SimpleNamespace(uploads=RacingUploads()), data["filename"])
+
+        assert remaining == 1
+        assert stored_files(upload_dir) == [data["filename"]]
+        assert (await mock_db.uploads.find_one({"_id": content_hash}))["ref_count"] == 1
+
+    async def test_failed_first_upload_fails_duplicates(self, upload_client, mock_db, monkeypatch):
+        """Test uploads waiting on the first copy of some bytes get its error and store nothing."""
+        client, upload_dir = upload_client
+
+        async def failing_variants(file_path, filename):
+            await asyncio.sleep(0.05)
+            raise HTTPException(status_code=500, detail="Image processing failed")
+
+        monkeypatch.setattr(upload_router, "create_variants", failing_variants)
+        body = png_bytes()
+        responses = await asyncio.gather(*(
+            client.post("/api/v1/upload/image", files={"file": (name, body, "image/png")})
+            for name in ("a.png", "b.png")
+        ))
+
+        assert [response.status_code for response in responses] == [500, 500]
+        assert {response.json()["detail"] for response in responses} == {"Image processing failed"}
+        assert stored_files(upload_dir) == []
+        assert await mock_db.uploads.count_documents({}) == 0
+
+    async def test_untracked_file_deleted(self, upload_client):
+        """Test files stored before content addressing are still deleted outright."""
+        client, upload_dir = upload_client
+        (upload_dir / "legacy.png").write_bytes(png_bytes())
+
+        assert (await client.delete("/api/v1/upload/legacy.png")).status_code == 200
+        assert stored_files(upload_dir) == []
+
+
+class TestConcurrentMultipleUpload:
+    """Test /upload/multiple saves files concurrently within its limits."""
+
+    @pytest.fixture
+    def track_saves(self, monkeypatch):
+        """Slow down store_upload and record the most saves running at once."""
+        stats = {"running": 0, "max": 0}
+        store_upload = upload_router.store_upload
+
+        async def tracked(file):
+            stats["running"] += 1
+            stats["max"] = max(stats["max"], stats["running"])
+            try:
+                await asyncio.sleep(0.05)
+                return await store_upload(file)
+            finally:
+                stats["running"] -= 1
+
+        monkeypatch.setattr(upload_router, "store_upload", tracked)
+        monkeypatch.setattr(uploads, "_slots", None)
+        return stats
+
+    async def test_per_request_limit_and_order(self, upload_client, monkeypatch, track_saves):
+        """Test results keep input order while at most the per-request limit run together."""
+        client, upload_dir = upload_client
+        monkeypatch.setattr(settings, "UPLOAD_REQUEST_CONCURRENCY", 2)
+        files = [("files", (f"{i}.png", png_bytes(10 + i, 10), "image/png")) for i in range(5)]
+        files.insert(2, ("files", ("notes.txt", b"text", "text/plain")))
+        response = await client.post("/api/v1/upload/multiple", files=files)
+
+        results = response.json()
+        assert [result.get("original_filename") for result in results] == [
+            "0.png", "1.png", None, "2.png", "3.png", "4.png"
+        ]
+        assert results[2] == {"filename": "notes.txt", "success": False, "error": "File type not allowed"}
+        assert track_saves["max"] == 2
+
+    async def test_global_limit(self, upload_client, monkeypatch, track_saves):
+        """Test the process-wide limit caps saves below the per-request limit."""
+        client, upload_dir = upload_client
+        monkeypatch.setattr(settings, "UPLOAD_CONCURRENCY", 1)
+        files = [("files", (f"{i}.png", png_bytes(10 + i, 10), "image/png")) for i in range(3)]
+        response = await client.post("/api/v1/upload/multiple", files=files)
+
+        assert all(result["success"] for result in response.json())
+        assert track_saves["max"] == 1
+
+    async def test_duplicates_processed_once(self, upload_client):
+        """Test the same bytes twice in one request are stored and processed once."""
+        client, upload_dir = upload_client
+        body = png_bytes(400, 200)
+        submitted = image_processor.submitted
+        response = await client.post("/api/v1/upload/multiple", files=[
+            ("files", ("a.png", body, "image/png")),
+            ("files", ("b.png", body, "image/png")),
+        ])
+
+        first, second = response.json()
+        assert first["url"] == second["url"]
+        assert first["variants"] == second["variants"] != {}
+        assert sorted([first["deduplicated"], second["deduplicated"]]) == [False, True]
+        assert image_processor.submitted == submitted + 1
+
+    async def test_streamed_progress(self, upload_client, monkeypatch):
+        """Test stream=true sends one NDJSON line per file tagged with its index."""
+        client, upload_dir = upload_client
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 2000)
+        response = await client.post("/api/v1/upload/multiple", params={"stream": "true"}, files=[
+            ("files", ("a.png", png_bytes(), "image/png")),
+            ("files", ("b.png", b"x" * 3000, "image/png")),
+        ])
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+        assert [(line["index"], line["success"]) for line in lines] == [(0, True), (1, False)]
+        assert lines[1]["error"].startswith("File too large")
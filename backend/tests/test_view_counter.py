@@ -0,0 +1,105 @@
+"""Tests for the write-behind view counter."""
+import asyncio
+from types import SimpleNamespace
+from pymongo.errors import BulkWriteError
+
+from core import database
+from core.view_counter import ViewCounter
+
+
+async def insert_post(db, views=0):
+    result = await db.posts.insert_one({"title": "post", "view_count": views})
+    return result.inserted_id
+
+
+class TestViewCounter:
+    """Test buffering and flushing of view counts."""
+
+    async def test_increments_are_buffered_until_flush(self, mock_db):
+        """Test views accumulate in memory and land in one flush."""
+        first = await insert_post(mock_db, views=5)
+        second = await insert_post(mock_db)
+        counter = ViewCounter(flush_interval_ms=60000, flush_threshold=100)
+
+        assert counter.increment(first) == 1
+        assert counter.increment(str(first)) == 2
+        assert counter.increment(second) == 1
+        assert (await mock_db.posts.find_one({"_id": first}))["view_count"] == 5
+
+        await counter.flush()
+
+        assert (await mock_db.posts.find_one({"_id": first}))["view_count"] == 7
+        assert (await mock_db.posts.find_one({"_id": second}))["view_count"] == 1
+        assert counter.unflushed(first) == 0
+
+    async def test_threshold_triggers_flush(self, mock_db):
+        """Test reaching the event threshold schedules a flush."""
+        post_id = await insert_post(mock_db)
+        counter = ViewCounter(flush_interval_ms=60000, flush_threshold=3)
+
+        for _ in range(3):
+            counter.increment(post_id)
+        await asyncio.sleep(0)
+        await counter.flush()
+
+        assert (await mock_db.posts.find_one({"_id": post_id}))["view_count"] == 3
+
+    async def test_failed_flush_keeps_counts(self, mock_db, monkeypatch):
+        """Test increments survive a failed write and are retried."""
+        post_id = await insert_post(mock_db)
+        counter = ViewCounter(flush_interval_ms=60000, flush_threshold=100)
+        counter.increment(post_id)
+
+        monkeypatch.setattr(database.db, "database", None)
+        await counter.flush()
+        assert counter.unflushed(post_id) == 1
+
+        monkeypatch.setattr(database.db, "database", mock_db)
+        await counter.flush()
+        assert (await mock_db.posts.find_one({"_id": post_id}))["view_count"] == 1
+
+    async def test_stop_flushes_pending(self, mock_db):
+        """Test shutdown cancels the loop and writes remaining views."""
+        post_id = await insert_post(mock_db)
+        counter = ViewCounter(flush_interval_ms=60000, flush_threshold=100)
+        counter.start()
+        counter.increment(post_id)
+
+        await counter.stop()
+
+        assert (await mock_db.posts.find_one({"_id": post_id}))["view_count"] == 1
+
+    async def test_threshold_schedules_one_flush(self, mock_db):
+        """Test views past the threshold share the flush task that is already scheduled."""
+        post_id = await insert_post(mock_db)
+        counter = ViewCounter(flush_interval_ms=60000, flush_threshold=2)
+
+        for _ in range(5):
+            counter.increment(post_id)
+        task = counter._flush_task
+        await task
+
+        assert counter._flush_task is task
+        assert (await mock_db.posts.find_one({"_id": post_id}))["view_count"] == 5
+
+    async def test_partial_failure_requeues_failed_posts(self, mock_db, monkeypatch):
+        """Test only the updates reported as failed are retried after a partial bulk_write."""
+        first, second = await insert_post(mock_db), await insert_post(mock_db)
+        counter = ViewCounter(flush_interval_ms=60000, flush_threshold=100)
+        counter.increment(first)
+        counter.increment(second)
+        counter.increment(second)
+
+        class PartialPosts:
+            async def bulk_write(self, operations, ordered):
+                await mock_db.posts.bulk_write(operations[:1], ordered=ordered)
+                raise BulkWriteError({"writeErrors": [{"index": 1, "code": 1, "errmsg": "failed"}]})
+
+        monkeypatch.setattr(database.db, "database", SimpleNamespace(posts=PartialPosts()))
+        await counter.flush()
+        assert (counter.unflushed(first), counter.unflushed(second)) == (0, 2)
+
+        monkeypatch.setattr(database.db, "database", mock_db)
+        await counter.flush()
+        assert (await mock_db.posts.find_one({"_id": first}))["view_count"] == 1
+        assert (await mock_db.posts.find_one({"_id": second}))["view_count"] == 2
@@ -149,7 +149,7 @@ const FeaturedPost: React.FC<{ post: PostWithDetails }> = ({ post }) => {
           </Link>
         </h1>
         <div className="text-gray-600 mb-4">
-          {generateExcerpt(post.content, 200)}
+          {post.excerpt ?? generateExcerpt(post.content ?? '', 200)}
         </div>
         <div className="flex flex-wrap gap-2">
           {post.tag_details?.map((tag) => (
@@ -200,7 +200,7 @@ const PostCard: React.FC<{ post: PostWithDetails }> = ({ post }) => {
             </Link>
           </h2>
           <p className="text-gray-600 mb-3">
-            {generateExcerpt(post.content, 150)}
+            {post.excerpt ?? generateExcerpt(post.content ?? '', 150)}
           </p>
           <div className="flex flex-wrap gap-2">
             {post.tag_details?.slice(0, 3).map((tag) => (
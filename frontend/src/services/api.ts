@@ -12,7 +12,8 @@ import {
   CreateCategoryRequest,
   CreateTagRequest,
   PaginatedResponse,
-  PostWithDetails
+  PostWithDetails,
+  UploadResponse
 } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1';
@@ -109,6 +110,11 @@ export const postsApi = {
     return response.data;
   },
 
+  getRelatedPosts: async (id: string, limit: number = 5): Promise<PostWithDetails[]> => {
+    const response = await api.get(`/posts/public/${id}/related?limit=${limit}`);
+    return response.data;
+  },
+
   // Admin endpoints
   getAllPosts: async (
     page: number = 1,
@@ -194,7 +200,7 @@ export const tagsApi = {
 
 // Upload API
 export const uploadApi = {
-  uploadFile: async (file: File): Promise<{ filename: string; url: string }> => {
+  uploadFile: async (file: File): Promise<UploadResponse> => {
     const formData = new FormData();
     formData.append('file', file);
 
@@ -12,6 +12,8 @@ export interface Category {
   name: string;
   description?: string;
   created_at: string;
+  post_count?: number;
+  published_count?: number;
 }
 
 export interface Tag {
@@ -37,6 +39,7 @@ export interface Post {
 export interface PostWithDetails extends Post {
   category?: Category;
   tag_details?: Tag[];
+  excerpt?: string; // Plain-text preview returned by list endpoints
 }
 
 export interface LoginCredentials {
@@ -81,7 +84,34 @@ export interface ApiError {
 export interface PaginatedResponse<T> {
   items: T[];
   total: number;
+  total_exact?: boolean;
   page: number;
   size: number;
   pages: number;
+  next_cursor?: string | null;
+  prev_cursor?: string | null;
+}
+
+export interface ImageVariant {
+  width: number;
+  height: number;
+  url: string;
+}
+
+// Responsive versions of an uploaded image; empty when none were generated
+export interface ImageVariants {
+  width?: number;
+  height?: number;
+  webp?: ImageVariant[];
+  avif?: ImageVariant[];
+  srcset?: { webp?: string; avif?: string };
+  placeholder?: { url: string; data_uri: string };
+}
+
+export interface UploadResponse {
+  filename: string;
+  url: string;
+  original_filename: string;
+  size: number;
+  variants: ImageVariants;
 }
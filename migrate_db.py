@@ -11,6 +11,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
 from core.config import settings
+from core.rendering import make_excerpt, rendered_fields
 
 async def migrate_database():
     """Update database field names for consistency"""
@@ -35,6 +36,25 @@ async def migrate_database():
         )
         print("Ensured all posts have view_count field")
         
+        # Backfill plain-text excerpts used by the card list view
+        excerpt_count = 0
+        async for post in db.posts.find({"excerpt": {"$exists": False}}, {"content": 1}):
+            await db.posts.update_one(
+                {"_id": post["_id"]},
+                {"$set": {"excerpt": make_excerpt(post.get("content", ""))}}
+            )
+            excerpt_count += 1
+        print(f"Backfilled excerpts for {excerpt_count} posts")
+        
+        # Pre-render HTML for posts that lack it or were rendered by an older renderer
+        render_count = 0
+        async for post in db.posts.find({}, {"content": 1, "content_hash": 1}):
+            rendered = rendered_fields(post.get("content", ""), post.get("content_hash"))
+            if rendered:
+                await db.posts.update_one({"_id": post["_id"]}, {"$set": rendered})
+                render_count += 1
+        print(f"Rendered HTML for {render_count} posts")
+        
         # Update any categories or tags if needed
         # (These should already be using _id correctly)
         